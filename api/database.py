@@ -33,6 +33,10 @@ async def init_db() -> None:
             "ALTER TABLE sessions ADD COLUMN research_json TEXT",
             "ALTER TABLE sessions ADD COLUMN analyst_json TEXT",
             "ALTER TABLE sessions ADD COLUMN failed_stage TEXT",
+            "ALTER TABLE sessions ADD COLUMN budget_json TEXT",
+            "ALTER TABLE sessions ADD COLUMN stage_history_json TEXT",
+            "ALTER TABLE sessions ADD COLUMN engine TEXT",
+            "ALTER TABLE sessions ADD COLUMN planner INTEGER",
         ]:
             try:
                 await db.execute(col_def)
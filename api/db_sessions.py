@@ -15,17 +15,23 @@ async def insert_session(
     session_id: str,
     query: str,
     timestamp: datetime | None = None,
+    engine: str = "lead",
+    planner: bool = True,
 ) -> None:
-    """Insert a new session row with status='running'."""
+    """Insert a new session row with status='running'.
+
+    `engine` and `planner` are the run's engine selection, kept so a retry
+    runs on the same engine.
+    """
     ts = (timestamp or datetime.now()).isoformat()
     db = await get_db()
     try:
         await db.execute(
             """
-            INSERT INTO sessions (session_id, timestamp, query, status, events_json, usage_json)
-            VALUES (?, ?, ?, 'running', '[]', '{}')
+            INSERT INTO sessions (session_id, timestamp, query, status, events_json, usage_json, engine, planner)
+            VALUES (?, ?, ?, 'running', '[]', '{}', ?, ?)
             """,
-            (session_id, ts, query),
+            (session_id, ts, query, engine, int(planner)),
         )
         await db.commit()
     finally:
@@ -154,6 +160,32 @@ async def save_analyst_checkpoint(session_id: str, analyst_json: str) -> None:
         await db.close()
 
 
+async def save_budget(session_id: str, budget_json: str) -> None:
+    """Persist the run's RunBudget JSON (query classification and stage budgets)."""
+    db = await get_db()
+    try:
+        await db.execute(
+            "UPDATE sessions SET budget_json=? WHERE session_id=?",
+            (budget_json, session_id),
+        )
+        await db.commit()
+    finally:
+        await db.close()
+
+
+async def save_stage_history(session_id: str, stage_history_json: str) -> None:
+    """Persist the resume points of unfinished sub-agent stages (see app.stage_history)."""
+    db = await get_db()
+    try:
+        await db.execute(
+            "UPDATE sessions SET stage_history_json=? WHERE session_id=?",
+            (stage_history_json, session_id),
+        )
+        await db.commit()
+    finally:
+        await db.close()
+
+
 async def update_events(session_id: str, events_json: str) -> None:
     """Update the events_json column for a running session."""
     db = await get_db()
@@ -13,12 +13,20 @@ from api.routes.config import router as config_router
 from api.routes.export import router as export_router
 from api.routes.run import router as run_router
 from api.routes.sessions import router as sessions_router
+from app.tools.browser_pool import start_crawler_pool, stop_crawler_pool
+from app.tools.http_client import close_http_client
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_db()
-    yield
+    # Warm, shared Chromium browsers for deep_scrape across concurrent sessions.
+    await start_crawler_pool()
+    try:
+        yield
+    finally:
+        await stop_crawler_pool()
+        await close_http_client()
 
 
 def create_app() -> FastAPI:
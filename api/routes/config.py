@@ -7,7 +7,11 @@ from typing import Any
 
 from fastapi import APIRouter
 
+from app.output_repair import repair_stats
 from app.scenarios import SCENARIOS
+from app.tools.browser_pool import get_crawler_pool
+from app.tools.circuit_breaker import breaker_stats
+from app.tools.rate_limit import get_rate_limiter
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -28,6 +32,8 @@ async def health_check() -> dict[str, Any]:
     model = os.environ.get("LLM_MODEL") or "qwen3.5:latest"
     base_url = os.environ.get("OLLAMA_BASE_URL") or "http://localhost:11434/v1"
     tavily_configured = bool(os.environ.get("TAVILY_API_KEY", "").strip())
+    pool = get_crawler_pool()
+    limiter = get_rate_limiter()
 
     return {
         "status": "ok",
@@ -35,4 +41,8 @@ async def health_check() -> dict[str, Any]:
         "llm_model": model,
         "ollama_base_url": base_url if provider == "ollama" else None,
         "tavily_configured": tavily_configured,
+        "crawler_pool": pool.stats() if pool is not None else None,
+        "rate_limits": limiter.stats() if limiter is not None else None,
+        "circuit_breakers": breaker_stats(),
+        "output_repair": repair_stats(),
     }
@@ -4,13 +4,13 @@ from __future__ import annotations
 
 import asyncio
 import json
+import logging
 import os
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Literal
 
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from pydantic_ai import UsageLimits
 
 from api.database import init_db
 from app.cli_resume import _SYNTHESIS_PROMPT
@@ -20,11 +20,19 @@ from api.db_sessions import (
     mark_complete,
     mark_error,
     save_analyst_checkpoint,
+    save_budget,
     save_research_checkpoint,
+    save_stage_history,
 )
 from api.stream import StreamingResearchContext
+from app.budget import apply_budget, stage_budget
+from app.distill import distill_stage
+from app.findings_format import format_findings
 from app.history import UsageStats, generate_session_id
 from app.schema import WorkflowEvent
+from app.stage_history import dump_stage_history, load_stage_history
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -35,6 +43,11 @@ _active_streams: dict[str, StreamingResearchContext] = {}
 class RunRequest(BaseModel):
     query: str
     tavily_api_key: str = ""
+    # 'lead': the lead agent orchestrates the stages. 'pipeline': the stages
+    # run as a fixed DAG in code (app.pipeline), with the planner agent only
+    # classifying the question — unless `planner` is false.
+    engine: Literal["lead", "pipeline"] = "lead"
+    planner: bool = True
 
 
 class RunResponse(BaseModel):
@@ -46,19 +59,29 @@ async def _run_pipeline(
     session_id: str,
     query: str,
     ctx: StreamingResearchContext,
+    engine: str = "lead",
+    planner: bool = True,
 ) -> None:
-    """Execute the lead agent pipeline in the background."""
-    # Import inside function to respect .env loading order (lead.py calls get_model() at import)
-    from app.agents.lead import lead_agent
-
+    """Execute the research pipeline in the background with the chosen engine."""
+    ctx.on_stage_complete = lambda stage, findings: _save_checkpoint(session_id, stage, findings)
     try:
-        result = await lead_agent.run(
-            query,
-            deps=ctx,
-            usage_limits=UsageLimits(request_limit=20, tool_calls_limit=15),
-        )
-        report = result.output
-        usage_data = result.usage()
+        # The pipeline engine re-allocates once its planner has classified the question.
+        await apply_budget(ctx, query)
+        # Import inside function to respect .env loading order (agents call get_model() at import)
+        if engine == "pipeline":
+            from app.pipeline import run_pipeline
+
+            report, usage_data = await run_pipeline(query, ctx, planner=planner)
+        else:
+            from app.agents.lead import lead_agent
+
+            result = await lead_agent.run(
+                query,
+                deps=ctx,
+                usage_limits=stage_budget(ctx, "lead").usage_limits(),
+            )
+            report = result.output
+            usage_data = result.usage()
 
         usage = UsageStats(
             requests=usage_data.requests if usage_data else 0,
@@ -77,76 +100,73 @@ async def _run_pipeline(
         events_json = json.dumps([e.model_dump(mode="json") for e in ctx.events])
         await mark_error(session_id, str(exc), events_json, failed_stage="pipeline")
     finally:
-        # Persist any intermediate findings that were captured
+        if ctx.budget is not None:
+            await save_budget(session_id, ctx.budget.model_dump_json())
+        # Persist any intermediate findings that were captured (stages also
+        # checkpoint themselves on completion; this catches a failed early save)
         if ctx.research_findings is not None:
             await save_research_checkpoint(session_id, ctx.research_findings.model_dump_json())
         if ctx.analyst_findings is not None:
             await save_analyst_checkpoint(session_id, ctx.analyst_findings.model_dump_json())
+        # Unfinished sub-agent stages keep their completed tool calls for a retry.
+        stage_history = dump_stage_history(ctx)
+        if stage_history:
+            await save_stage_history(session_id, json.dumps(stage_history))
         ctx.close_stream()
         _active_streams.pop(session_id, None)
 
 
+async def _save_checkpoint(session_id: str, stage: str, findings: BaseModel) -> None:
+    """Persist one stage's findings the moment it finishes (ctx.on_stage_complete).
+
+    A failed write is logged, not raised — the run's `finally` block retries
+    the save, and a checkpoint must never turn good findings into a failure.
+    """
+    try:
+        if stage == "research":
+            await save_research_checkpoint(session_id, findings.model_dump_json())
+        elif stage == "analyst":
+            await save_analyst_checkpoint(session_id, findings.model_dump_json())
+    except Exception as e:
+        logger.warning("Checkpoint save failed for %s/%s: %s", session_id, stage, e)
+
+
 async def _run_reporter_only(
     session_id: str,
     query: str,
     ctx: StreamingResearchContext,
 ) -> None:
     """Run only the reporter agent using pre-loaded findings stored in ctx."""
-    from app.agents.lead import run_reporter
-    from pydantic_ai.usage import Usage
-
     try:
-        research = ctx.research_findings
-        analyst = ctx.analyst_findings
+        from pydantic_ai.usage import RunUsage
+
+        await apply_budget(ctx, query)
+        usage_data = RunUsage()
+        research, analyst = await distill_stage(
+            ctx, query, ctx.research_findings, ctx.analyst_findings, usage_data
+        )
 
         synthesis_prompt = _SYNTHESIS_PROMPT.format(
             query=query,
             question_archetype="multi-dimensional",
             primary_dimensions="market access, payer coverage, market sizing, competitive landscape",
-            research=research.model_dump_json(indent=2) if research else "Not available",
-            analyst=analyst.model_dump_json(indent=2) if analyst else "Not available",
+            research=format_findings(research),
+            analyst=format_findings(analyst),
         )
 
-        # Build a minimal RunContext-like object to call run_reporter tool directly
-        # Instead, use reporter_agent directly
-        from app.agents.reporter import reporter_agent, stream_reporter_text
-        from pydantic_ai import UsageLimits
-        from pydantic_ai.exceptions import UnexpectedModelBehavior, UsageLimitExceeded
+        from app.agents.reporter import write_report
 
-        # Part 4: stream the draft narrative first (best-effort), then run the
-        # structured `reporter_agent`. The four-branch discrimination is
-        # preserved on the structured call; the streaming call is best-effort
-        # and never aborts the run.
+        # The draft streams out as reporter_token frames while the same run
+        # yields the canonical report. Failures propagate to mark_error below
+        # (unlike the lead path, no placeholder report).
         await ctx.add_event("agent_start", "Reporter", "Starting report synthesis (retry)")
-        try:
-            await stream_reporter_text(synthesis_prompt, ctx)
-        except asyncio.TimeoutError:
-            await ctx.add_event(
-                "info", "Reporter", "Streaming draft timed out (retry path)"
-            )
-        except UnexpectedModelBehavior as _e:
-            await ctx.add_event(
-                "info", "Reporter", f"Streaming draft model behavior issue (retry): {_e}"
-            )
-        except UsageLimitExceeded as _e:
-            await ctx.add_event(
-                "info", "Reporter", f"Streaming draft usage limit (retry): {_e}"
-            )
-        except Exception as _e:  # noqa: BLE001 — best-effort streaming
-            await ctx.add_event(
-                "info", "Reporter", f"Streaming draft failed non-fatally (retry): {_e}"
-            )
-        finally:
-            ctx.close_token_stream()
-
-        result = await reporter_agent.run(
+        report = await write_report(
             synthesis_prompt,
-            deps=ctx,
-            usage_limits=UsageLimits(request_limit=8, tool_calls_limit=0),
+            ctx,
+            usage=usage_data,
+            usage_limits=stage_budget(ctx, "reporter").usage_limits(),
         )
         await ctx.add_event("agent_end", "Reporter", "Completed report synthesis (retry)")
-        report = result.output
-        usage_data = result.usage()
 
         usage = UsageStats(
             requests=usage_data.requests if usage_data else 0,
@@ -165,6 +185,8 @@ async def _run_reporter_only(
         events_json = json.dumps([e.model_dump(mode="json") for e in ctx.events])
         await mark_error(session_id, str(exc), events_json, failed_stage="reporter_retry")
     finally:
+        if ctx.budget is not None:
+            await save_budget(session_id, ctx.budget.model_dump_json())
         if ctx.research_findings is not None:
             await save_research_checkpoint(session_id, ctx.research_findings.model_dump_json())
         if ctx.analyst_findings is not None:
@@ -187,11 +209,11 @@ async def start_run(body: RunRequest) -> RunResponse:
         session_state=None,
     )
 
-    await insert_session(session_id, body.query)
+    await insert_session(session_id, body.query, engine=body.engine, planner=body.planner)
     _active_streams[session_id] = ctx
 
     # Fire and forget — runs in the event loop alongside SSE
-    asyncio.create_task(_run_pipeline(session_id, body.query, ctx))
+    asyncio.create_task(_run_pipeline(session_id, body.query, ctx, body.engine, body.planner))
 
     return RunResponse(
         session_id=session_id,
@@ -261,6 +283,9 @@ async def retry_session(session_id: str) -> dict:
     research_json: str | None = original.get("research_json")
     analyst_json: str | None = original.get("analyst_json")
     tavily_key = os.environ.get("TAVILY_API_KEY", "")
+    # Sessions from before the engine was recorded ran on the lead engine.
+    engine = original.get("engine") or "lead"
+    planner = original.get("planner") is None or bool(original["planner"])
 
     new_session_id = generate_session_id()
 
@@ -279,7 +304,11 @@ async def retry_session(session_id: str) -> dict:
         from app.schema import AnalystFindings
         ctx.analyst_findings = AnalystFindings.model_validate_json(analyst_json)
 
-    await insert_session(new_session_id, query)
+    # A stage that failed mid-run continues after its completed tool calls.
+    if original.get("stage_history_json"):
+        load_stage_history(ctx, json.loads(original["stage_history_json"]))
+
+    await insert_session(new_session_id, query, engine=engine, planner=planner)
     _active_streams[new_session_id] = ctx
 
     if research_json and analyst_json:
@@ -287,7 +316,7 @@ async def retry_session(session_id: str) -> dict:
         asyncio.create_task(_run_reporter_only(new_session_id, query, ctx))
     else:
         # Full run (missing one or both checkpoints)
-        asyncio.create_task(_run_pipeline(new_session_id, query, ctx))
+        asyncio.create_task(_run_pipeline(new_session_id, query, ctx, engine, planner))
 
     return {
         "session_id": new_session_id,
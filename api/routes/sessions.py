@@ -64,6 +64,14 @@ async def get_session_detail(session_id: str) -> dict[str, Any]:
     else:
         result["usage"] = {}
 
+    if row.get("budget_json"):
+        try:
+            result["budget"] = json.loads(row["budget_json"])
+        except Exception:
+            result["budget"] = None
+    else:
+        result["budget"] = None
+
     result["research_json"] = row.get("research_json")
     result["analyst_json"] = row.get("analyst_json")
 
@@ -45,6 +45,8 @@ class StreamingResearchContext(ResearchContext):
         )
         self._session_id: str | None = session_id
         self._token_stream_closed: bool = False
+        # Reporter draft sent so far; a retried reporter call only streams past it.
+        self.streamed_draft: str = ""
         self.research_findings: MarketAccessFindings | None = None
         self.analyst_findings: AnalystFindings | None = None
 
@@ -89,11 +91,11 @@ class StreamingResearchContext(ResearchContext):
             pass
 
     def close_token_stream(self) -> None:
-        """Idempotent marker that the streaming text agent is done.
+        """Idempotent marker that the streamed reporter run is done.
 
         Does NOT enqueue a sentinel — the overall stream sentinel is still
         `close_stream()` which is called once per run. This method exists so
-        the `stream_reporter_text` helper has a clean `try/finally` symmetry
+        the `stream_report` helper has a clean `try/finally` symmetry
         and to harden against stragglers (see put_token).
         """
         self._token_stream_closed = True
@@ -1,13 +1,15 @@
-"""PydanticAI agents: Lead (orchestrator), Market Access, Data Analyst, Reporter."""
+"""PydanticAI agents: Lead (orchestrator), Planner, Market Access, Data Analyst, Reporter."""
 
 from app.agents.analyst import analyst_agent
 from app.agents.lead import lead_agent
+from app.agents.planner import planner_agent
 from app.agents.reporter import reporter_agent
 from app.agents.researcher import researcher_agent
 
 __all__ = [
     "analyst_agent",
     "lead_agent",
+    "planner_agent",
     "reporter_agent",
     "researcher_agent",
 ]
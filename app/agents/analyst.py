@@ -5,10 +5,19 @@ from pydantic_ai import Agent, ModelRetry, RunContext
 from app.context import ResearchContext
 from app.llm import get_model, get_retries
 from app.schema import AnalystFindings
-from app.tools import deep_scrape, tavily_search
+from app.tools import (
+    deep_scrape_many_with_events,
+    deep_scrape_with_events,
+    tavily_batch_search,
+    tavily_search,
+)
+from app.tools.saturation import observe_result, refuse_when_saturated
 
 model = get_model()
 
+# Withdraws the search/scrape tools once this stage's evidence is saturated (SATURATION_MODE=refuse).
+_saturation_gate = refuse_when_saturated("analyst")
+
 analyst_agent = Agent(
     model,
     deps_type=ResearchContext,
@@ -26,6 +35,8 @@ analyst_agent = Agent(
         "3. Which competitive products need TRx/NBRx or market share characterization?\n"
         "4. What channel mix story exists for this drug class?\n\n"
         "TOOL USE GUIDELINES:\n"
+        "- tavily_batch_search: PREFERRED — pass the queries below as one list in a single "
+        "call; they run concurrently and come back merged and de-duplicated.\n"
         "- tavily_search query 1: prescription volume — e.g. 'IQVIA [drug] TRx NBRx weekly "
         "prescriptions [year]' or '[drug class] total prescription market share by product'.\n"
         "- tavily_search query 2: competitive landscape — market share by product, NBRx "
@@ -35,6 +46,8 @@ analyst_agent = Agent(
         "- deep_scrape: ONLY for specific URLs pointing to market research data tables, drug "
         "channel blog posts with prescription data, or earnings transcripts with volume "
         "guidance. Limit to 1-2 scrapes.\n"
+        "- deep_scrape_many: when 2+ such URLs are worth reading, pass them together (up to "
+        "6) in ONE call instead of several deep_scrape calls; they are fetched in parallel.\n"
         "- STOP after 4-5 total tool calls. Synthesize what you have.\n\n"
         "OUTPUT FIELD GUIDANCE:\n"
         "- market_sizes: one MarketSize entry per distinct estimate found (different region, "
@@ -78,7 +91,7 @@ async def validate_analyst_output(
     return output
 
 
-@analyst_agent.tool
+@analyst_agent.tool(prepare=_saturation_gate)
 async def tavily_search_tool(
     ctx: RunContext[ResearchContext],
     query: str,
@@ -92,10 +105,28 @@ async def tavily_search_tool(
     - Channel mix: "[drug] specialty pharmacy retail dispensing split percent"
     - Competitive payer positioning: "[drug class] formulary tier commercial payers comparison"
     Returns concatenated search result summaries with source URLs."""
-    return await tavily_search(ctx, query, max_results=max_results)
+    result = await tavily_search(ctx, query, max_results=max_results, stage="analyst")
+    return await observe_result(ctx.deps, "analyst", "tavily_search", result)
+
+
+@analyst_agent.tool(prepare=_saturation_gate)
+async def tavily_batch_search_tool(
+    ctx: RunContext[ResearchContext],
+    queries: list[str],
+    max_results: int = 5,
+) -> str:
+    """Run several web searches at once (up to 8 queries) in a single call — prefer this over
+    repeated tavily_search calls. Pass the Rx volume, market size, competitive share, analogue
+    and channel mix query patterns from tavily_search together, e.g.
+    ["IQVIA [drug] TRx NBRx weekly prescriptions [year]",
+     "[drug] vs [competitor] market share NBRx",
+     "[drug] specialty pharmacy retail dispensing split percent"].
+    Returns one merged block of results, de-duplicated by URL, with the queries each result matched."""
+    result = await tavily_batch_search(ctx, queries, max_results=max_results, stage="analyst")
+    return await observe_result(ctx.deps, "analyst", "tavily_batch_search", result)
 
 
-@analyst_agent.tool
+@analyst_agent.tool(prepare=_saturation_gate)
 async def deep_scrape_tool(
     ctx: RunContext[ResearchContext],
     url: str,
@@ -105,8 +136,22 @@ async def deep_scrape_tool(
     - Market research report previews or data tables (GlobalData, EvaluatePharma, etc.)
     - Drug channel blog posts or analyst pages containing prescription volume data
     - Company earnings transcript pages with specific volume or share guidance
-    Limit to 1-2 scrapes. Do not scrape generic search result landing pages."""
-    await ctx.deps.add_event("tool_call", "Crawl4AI", f"Scraping: {url}")
-    res = await deep_scrape(url, query)
-    await ctx.deps.add_event("tool_result", "Crawl4AI", f"Scraped {len(res)} characters")
-    return res
+    Limit to 1-2 scrapes. Do not scrape generic search result landing pages.
+    Pass query (e.g. "prior authorization criteria") to get only the most relevant passages."""
+    result = await deep_scrape_with_events(ctx, url, query, stage="analyst")
+    return await observe_result(ctx.deps, "analyst", "deep_scrape", result)
+
+
+@analyst_agent.tool(prepare=_saturation_gate)
+async def deep_scrape_many_tool(
+    ctx: RunContext[ResearchContext],
+    urls: list[str],
+    query: str | None = None,
+) -> str:
+    """Scrape several URLs (up to 6) in parallel in a single call — prefer this over repeated
+    deep_scrape calls when search results point to more than one market data table, drug
+    channel post or earnings transcript. Pages that do not finish in time come back as a short
+    "Not finished" marker; use what did arrive.
+    Pass query (e.g. "weekly TRx") to get only the most relevant passages."""
+    result = await deep_scrape_many_with_events(ctx, urls, query, stage="analyst")
+    return await observe_result(ctx.deps, "analyst", "deep_scrape_many", result)
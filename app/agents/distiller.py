@@ -0,0 +1,28 @@
+"""Findings Distiller: condenses oversized free-text findings fields before synthesis."""
+
+import os
+
+from pydantic_ai import Agent
+
+from app.context import ResearchContext
+from app.llm import get_model, get_retries
+
+# A cheaper model on the same provider can be set with DISTILL_MODEL.
+model = get_model(os.environ.get("DISTILL_MODEL") or None)
+
+distiller_agent = Agent(
+    model,
+    deps_type=ResearchContext,
+    output_type=str,
+    retries=get_retries(),
+    instructions=(
+        "You condense one free-text field of healthcare market research findings so a "
+        "report writer can use it. Stay within the token budget you are given.\n\n"
+        "- Keep every number, date, product, payer, and regulatory name exactly as written.\n"
+        "- Keep every URL verbatim — never shorten, merge, or drop a source URL.\n"
+        "- Prefer facts relevant to the research question; drop repetition, boilerplate, "
+        "and narration about how the research was done.\n"
+        "- Never add facts, estimates, or interpretation that are not in the text.\n"
+        "Return only the condensed text."
+    ),
+)
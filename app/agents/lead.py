@@ -2,32 +2,52 @@
 
 import asyncio
 import os
-from typing import Union
+from collections.abc import Coroutine
+from typing import Any, TypeVar, Union
 
 from pydantic import BaseModel, Field
-from pydantic_ai import Agent, RunContext, UsageLimits
+from pydantic_ai import Agent, RunContext
 from pydantic_ai.exceptions import UnexpectedModelBehavior, UsageLimitExceeded
 from pydantic_ai.usage import RunUsage
 
 from app.agents.analyst import analyst_agent
-from app.agents.reporter import reporter_agent
 from app.agents.researcher import researcher_agent
+from app.budget import stage_budget
 from app.context import ResearchContext
+from app.distill import distill_findings
 from app.llm import get_model, get_retries
+from app.retry import stage_retry_policy
 from app.schema import AnalystFindings, MarketAccessFindings, MarketReport
+from app.stage_history import run_resumable, stage_resume_point
+from app.tools.dedup import stage_deduper
+from app.tools.saturation import stage_monitor
 
 model = get_model()
 
-# Timeout (seconds) for research/analyst sub-agent calls — configurable via AGENT_TIMEOUT env var.
+# Timeout (seconds) for the planner call — configurable via AGENT_TIMEOUT env var.
+# Research, analyst and reporter limits (timeouts included) come from the
+# run's budget; see app.budget.
 _AGENT_TIMEOUT = float(os.environ.get("AGENT_TIMEOUT", "120"))
 
-# Reporter gets more time — pure synthesis with no tool calls, generation can be longer.
-_REPORTER_TIMEOUT = float(os.environ.get("REPORTER_TIMEOUT", "600"))
+# 'parallel' (default): the lead runs researcher and analyst together via
+# run_research_and_analysis. 'sequential': one tool call per sub-agent.
+_ORCHESTRATION = os.environ.get("LEAD_ORCHESTRATION", "parallel").strip().lower()
 
-# Number of additional retry attempts on UnexpectedModelBehavior per stage.
-# Default 2 means: initial attempt + up to 2 retries = 3 total attempts.
-# Configurable via STAGE_RETRIES env var.
-_STAGE_RETRIES = int(os.environ.get("STAGE_RETRIES", "2"))
+if _ORCHESTRATION == "sequential":
+    _STAGE_STEPS = (
+        "You receive a research query and must execute exactly three tool calls in sequence:\n"
+        "1. Call run_market_access_research.\n"
+        "2. Call run_analyst_research.\n"
+        "3. Call run_reporter with a detailed synthesis prompt.\n\n"
+    )
+else:
+    _STAGE_STEPS = (
+        "You receive a research query and must execute exactly two tool calls in sequence:\n"
+        "1. Call run_research_and_analysis with one briefing for the Market Access agent "
+        "(research_query) and one for the Analyst agent (analyst_query). Both agents run "
+        "concurrently. Do NOT also call run_market_access_research or run_analyst_research.\n"
+        "2. Call run_reporter with a detailed synthesis prompt.\n\n"
+    )
 
 
 # Define "Limited" versions of findings to allow the workflow to continue on limit errors
@@ -39,6 +59,14 @@ class LimitedAnalystFindings(BaseModel):
     warning: str = Field(default="Tool call limit reached. Analysis is incomplete.")
     partial_data: str = "The Analyst agent was unable to complete its full analysis cycle."
 
+class ParallelFindings(BaseModel):
+    """Both research stages' outputs from `run_research_and_analysis`."""
+
+    market_access: Union[MarketAccessFindings, LimitedMarketAccessFindings]
+    analyst: Union[AnalystFindings, LimitedAnalystFindings]
+
+T = TypeVar("T")
+
 lead_agent = Agent(
     model,
     deps_type=ResearchContext,
@@ -48,11 +76,8 @@ lead_agent = Agent(
         "You are the orchestrator of a healthcare market intelligence pipeline. Your "
         "outputs serve pharmaceutical commercial teams, market access leads, and payer "
         "strategy professionals.\n\n"
-        "You receive a research query and must execute exactly three tool calls in sequence:\n"
-        "1. Call run_market_access_research.\n"
-        "2. Call run_analyst_research.\n"
-        "3. Call run_reporter with a detailed synthesis prompt.\n\n"
-        "PRE-TOOL REASONING (before calling any tool, reason through these steps):\n"
+        + _STAGE_STEPS
+        + "PRE-TOOL REASONING (before calling any tool, reason through these steps):\n"
         "A. QUESTION ARCHETYPE — classify the question as one of:\n"
         "   - 'coverage/formulary': focuses on payer coverage, formulary tier, prior auth, "
         "step therapy, or market basket access\n"
@@ -70,12 +95,13 @@ lead_agent = Agent(
         "answering the question (e.g. 'payer coverage, step therapy, formulary tier').\n\n"
         "TOOL CALL CONSTRUCTION:\n"
         "Pass structured briefings to each sub-agent — not just the raw query. The "
-        "query argument you send to run_market_access_research should include:\n"
+        "Market Access briefing (research_query, or the query argument of "
+        "run_market_access_research) should include:\n"
         "  QUESTION: [original query]\n"
         "  QUESTION TYPE: [archetype]\n"
         "  KEY PRODUCT/DRUG CLASS: [extracted]\n"
         "  PRIMARY DIMENSIONS: [dimensions]\n"
-        "Similarly for run_analyst_research.\n\n"
+        "Similarly for the Analyst briefing.\n\n"
         "SYNTHESIS PROMPT CONSTRUCTION:\n"
         "The synthesis_prompt you pass to run_reporter must include:\n"
         "  RESEARCH QUESTION: [original query]\n"
@@ -92,9 +118,9 @@ lead_agent = Agent(
         "5. Populate sources with every URL present in the findings.\n"
         "6. Executive summary: paragraph 1 = headline answer, paragraph 2 = key commercial "
         "findings, paragraph 3 = primary caveat or risk.\n"
-        "7. Populate markdown_content with the complete formatted report.\n\n"
+        "7. Write each section's content as well-formatted Markdown.\n\n"
         "GRACEFUL ERROR HANDLING:\n"
-        "If run_market_access_research or run_analyst_research returns a 'Limited' finding "
+        "If either research stage returns a 'Limited' finding "
         "object, do NOT stop. Pass the warning and partial data to run_reporter. The final "
         "report should acknowledge that some data may be limited.\n\n"
         "IMPORTANT: Call each tool exactly once. Do NOT call the same tool multiple times."
@@ -102,6 +128,126 @@ lead_agent = Agent(
 )
 
 
+async def market_access_stage(
+    deps: ResearchContext,
+    query: str,
+    usage: RunUsage,
+) -> Union[MarketAccessFindings, LimitedMarketAccessFindings]:
+    """Run the Market Access agent as a pipeline stage.
+
+    Token usage is added to `usage`; successful findings are handed to
+    `deps.complete_stage` so they can be checkpointed immediately.
+
+    UnexpectedModelBehavior is retried under the stage retry policy (see
+    app.retry). Other failure modes (TimeoutError, UsageLimitExceeded, generic
+    Exception) are NOT retried and return a LimitedMarketAccessFindings fallback.
+    A retry — or a later run with the stage's saved history — continues after
+    the tool calls already completed (see app.stage_history).
+    """
+    await deps.add_event("agent_start", "Researcher", f"Starting research for: {query}")
+    budget = stage_budget(deps, "researcher")
+    policy = stage_retry_policy()
+
+    async def attempt(model: Any) -> Any:
+        if not stage_resume_point(deps, "researcher"):
+            # A fresh agent run: nothing earlier runs were shown is in its history.
+            stage_monitor(deps, "researcher", reset=True)
+            stage_deduper(deps, "researcher", reset=True)
+        return await asyncio.wait_for(
+            run_resumable(
+                researcher_agent,
+                deps,
+                "researcher",
+                f"Research market access for: {query}",
+                model=model,
+                usage_limits=budget.usage_limits(),
+            ),
+            timeout=budget.timeout,
+        )
+
+    try:
+        result = await policy.run(deps, "Researcher", attempt)
+
+        usage.input_tokens += result.usage().input_tokens
+        usage.output_tokens += result.usage().output_tokens
+
+        await deps.add_event("agent_end", "Researcher", "Completed research", details={"attempts": policy.attempts})
+        await deps.complete_stage("research", result.output)
+        return result.output
+
+    except asyncio.TimeoutError:
+        await deps.add_event(
+            "agent_limit", "Researcher", f"Timeout after {budget.timeout}s", details={"attempts": policy.attempts}
+        )
+        return LimitedMarketAccessFindings(
+            warning=f"Market Access research timed out after {budget.timeout}s"
+        )
+    except Exception as e:
+        # UnexpectedModelBehavior once retries run out, UsageLimitExceeded, anything else.
+        await deps.add_event(
+            "agent_limit", "Researcher", f"Limit reached: {str(e)}", details={"attempts": policy.attempts}
+        )
+        return LimitedMarketAccessFindings(
+            warning=f"Market Access research hit a limit: {str(e)}"
+        )
+
+
+async def analyst_stage(
+    deps: ResearchContext,
+    query: str,
+    usage: RunUsage,
+) -> Union[AnalystFindings, LimitedAnalystFindings]:
+    """Run the Data Analyst agent as a pipeline stage (see `market_access_stage`).
+
+    UnexpectedModelBehavior is retried under the stage retry policy (see
+    app.retry). Other failure modes (TimeoutError, UsageLimitExceeded, generic
+    Exception) are NOT retried and return a LimitedAnalystFindings fallback.
+    """
+    await deps.add_event("agent_start", "Analyst", "Starting analyst research")
+    budget = stage_budget(deps, "analyst")
+    policy = stage_retry_policy()
+
+    async def attempt(model: Any) -> Any:
+        if not stage_resume_point(deps, "analyst"):
+            # A fresh agent run: nothing earlier runs were shown is in its history.
+            stage_monitor(deps, "analyst", reset=True)
+            stage_deduper(deps, "analyst", reset=True)
+        return await asyncio.wait_for(
+            run_resumable(
+                analyst_agent,
+                deps,
+                "analyst",
+                f"Analyze market for: {query}",
+                model=model,
+                usage_limits=budget.usage_limits(),
+            ),
+            timeout=budget.timeout,
+        )
+
+    try:
+        result = await policy.run(deps, "Analyst", attempt)
+
+        usage.input_tokens += result.usage().input_tokens
+        usage.output_tokens += result.usage().output_tokens
+
+        await deps.add_event("agent_end", "Analyst", "Completed analyst research", details={"attempts": policy.attempts})
+        await deps.complete_stage("analyst", result.output)
+        return result.output
+
+    except asyncio.TimeoutError:
+        await deps.add_event(
+            "agent_limit", "Analyst", f"Timeout after {budget.timeout}s", details={"attempts": policy.attempts}
+        )
+        return LimitedAnalystFindings(
+            warning=f"Analyst timed out after {budget.timeout}s"
+        )
+    except Exception as e:
+        await deps.add_event(
+            "agent_limit", "Analyst", f"Limit reached: {str(e)}", details={"attempts": policy.attempts}
+        )
+        return LimitedAnalystFindings(warning=f"Analyst hit a limit: {str(e)}")
+
+
 @lead_agent.tool
 async def run_market_access_research(
     ctx: RunContext[ResearchContext],
@@ -109,69 +255,14 @@ async def run_market_access_research(
 ) -> Union[MarketAccessFindings, LimitedMarketAccessFindings]:
     """Delegate to the Market Access agent.
 
-    Retries on UnexpectedModelBehavior up to _STAGE_RETRIES additional attempts.
+    Retries on UnexpectedModelBehavior under the stage retry policy.
     Other failure modes (TimeoutError, UsageLimitExceeded, generic Exception)
     are NOT retried and return a LimitedMarketAccessFindings fallback.
+    Oversized free-text fields are distilled (FINDINGS_DISTILL) before the
+    findings are returned.
     """
-    await ctx.deps.add_event("agent_start", "Researcher", f"Starting research for: {query}")
-
-    last_unexpected: UnexpectedModelBehavior | None = None
-    for attempt in range(_STAGE_RETRIES + 1):
-        try:
-            result = await asyncio.wait_for(
-                researcher_agent.run(
-                    f"Research market access for: {query}",
-                    deps=ctx.deps,
-                    usage_limits=UsageLimits(request_limit=10, tool_calls_limit=12),
-                ),
-                timeout=_AGENT_TIMEOUT,
-            )
-
-            ctx.usage.input_tokens += result.usage().input_tokens
-            ctx.usage.output_tokens += result.usage().output_tokens
-
-            await ctx.deps.add_event("agent_end", "Researcher", "Completed research")
-            ctx.deps.research_findings = result.output
-            return result.output
-
-        except asyncio.TimeoutError:
-            await ctx.deps.add_event("agent_limit", "Researcher", f"Timeout after {_AGENT_TIMEOUT}s")
-            return LimitedMarketAccessFindings(
-                warning=f"Market Access research timed out after {_AGENT_TIMEOUT}s"
-            )
-        except UnexpectedModelBehavior as e:
-            last_unexpected = e
-            if attempt < _STAGE_RETRIES:
-                await ctx.deps.add_event(
-                    "info",
-                    "Researcher",
-                    f"Retry {attempt + 1}/{_STAGE_RETRIES}: {e}",
-                )
-                continue
-            await ctx.deps.add_event(
-                "agent_limit",
-                "Researcher",
-                f"Limit reached: {str(e)}",
-            )
-            return LimitedMarketAccessFindings(
-                warning=f"Market Access research hit a limit: {str(e)}"
-            )
-        except UsageLimitExceeded as e:
-            await ctx.deps.add_event("agent_limit", "Researcher", f"Limit reached: {str(e)}")
-            return LimitedMarketAccessFindings(
-                warning=f"Market Access research hit a limit: {str(e)}"
-            )
-        except Exception as e:
-            await ctx.deps.add_event("agent_limit", "Researcher", f"Limit reached: {str(e)}")
-            return LimitedMarketAccessFindings(
-                warning=f"Market Access research hit a limit: {str(e)}"
-            )
-
-    # Defensive fallback — should not be reachable because the final
-    # UnexpectedModelBehavior attempt returns inside the loop.
-    return LimitedMarketAccessFindings(
-        warning=f"Market Access research hit a limit: {last_unexpected}"
-    )
+    findings = await market_access_stage(ctx.deps, query, ctx.usage)
+    return await distill_findings(findings, "research", query, ctx.deps, ctx.usage)
 
 
 @lead_agent.tool
@@ -181,55 +272,55 @@ async def run_analyst_research(
 ) -> Union[AnalystFindings, LimitedAnalystFindings]:
     """Delegate to the Data Analyst agent.
 
-    Retries on UnexpectedModelBehavior up to _STAGE_RETRIES additional attempts.
+    Retries on UnexpectedModelBehavior under the stage retry policy.
     Other failure modes (TimeoutError, UsageLimitExceeded, generic Exception)
     are NOT retried and return a LimitedAnalystFindings fallback.
+    Oversized free-text fields are distilled (FINDINGS_DISTILL) before the
+    findings are returned.
+    """
+    findings = await analyst_stage(ctx.deps, query, ctx.usage)
+    return await distill_findings(findings, "analyst", query, ctx.deps, ctx.usage)
+
+
+@lead_agent.tool
+async def run_research_and_analysis(
+    ctx: RunContext[ResearchContext],
+    research_query: str,
+    analyst_query: str,
+) -> ParallelFindings:
+    """Run the Market Access and Data Analyst agents at the same time.
+
+    Pass the structured briefing for each agent. Both run concurrently (the
+    analyst does not need the researcher's output), so this takes as long as
+    the slower of the two instead of their sum. Each returns its findings or a
+    'Limited' fallback exactly as the individual tools do, distilled likewise.
+    """
+    market_access, analyst = await run_stages_concurrently(
+        market_access_stage(ctx.deps, research_query, ctx.usage),
+        analyst_stage(ctx.deps, analyst_query, ctx.usage),
+    )
+    market_access, analyst = await asyncio.gather(
+        distill_findings(market_access, "research", research_query, ctx.deps, ctx.usage),
+        distill_findings(analyst, "analyst", analyst_query, ctx.deps, ctx.usage),
+    )
+    return ParallelFindings(market_access=market_access, analyst=analyst)
+
+
+async def run_stages_concurrently(*stages: Coroutine[Any, Any, T]) -> list[T]:
+    """Await stage coroutines concurrently with shared cancellation.
+
+    If the caller is cancelled, or any stage raises, every stage still running
+    is cancelled before the error propagates — no orphaned sub-agent keeps
+    spending tokens after the run has failed.
     """
-    await ctx.deps.add_event("agent_start", "Analyst", "Starting analyst research")
-
-    last_unexpected: UnexpectedModelBehavior | None = None
-    for attempt in range(_STAGE_RETRIES + 1):
-        try:
-            result = await asyncio.wait_for(
-                analyst_agent.run(
-                    f"Analyze market for: {query}",
-                    deps=ctx.deps,
-                    usage_limits=UsageLimits(request_limit=10, tool_calls_limit=12),
-                ),
-                timeout=_AGENT_TIMEOUT,
-            )
-
-            ctx.usage.input_tokens += result.usage().input_tokens
-            ctx.usage.output_tokens += result.usage().output_tokens
-
-            ctx.deps.analyst_findings = result.output
-            return result.output
-
-        except asyncio.TimeoutError:
-            await ctx.deps.add_event("agent_limit", "Analyst", f"Timeout after {_AGENT_TIMEOUT}s")
-            return LimitedAnalystFindings(
-                warning=f"Analyst timed out after {_AGENT_TIMEOUT}s"
-            )
-        except UnexpectedModelBehavior as e:
-            last_unexpected = e
-            if attempt < _STAGE_RETRIES:
-                await ctx.deps.add_event(
-                    "info",
-                    "Analyst",
-                    f"Retry {attempt + 1}/{_STAGE_RETRIES}: {e}",
-                )
-                continue
-            await ctx.deps.add_event("agent_limit", "Analyst", f"Limit reached: {str(e)}")
-            return LimitedAnalystFindings(warning=f"Analyst hit a limit: {str(e)}")
-        except UsageLimitExceeded as e:
-            await ctx.deps.add_event("agent_limit", "Analyst", f"Limit reached: {str(e)}")
-            return LimitedAnalystFindings(warning=f"Analyst hit a limit: {str(e)}")
-        except Exception as e:
-            await ctx.deps.add_event("agent_limit", "Analyst", f"Limit reached: {str(e)}")
-            return LimitedAnalystFindings(warning=f"Analyst hit a limit: {str(e)}")
-
-    # Defensive fallback — should not be reachable.
-    return LimitedAnalystFindings(warning=f"Analyst hit a limit: {last_unexpected}")
+    tasks = [asyncio.ensure_future(stage) for stage in stages]
+    try:
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
 
 
 @lead_agent.tool
@@ -239,78 +330,82 @@ async def run_reporter(
 ) -> MarketReport:
     """Delegate to the Reporter agent. Pass a detailed prompt that includes findings so it can synthesize the final report.
 
-    Part 4: If the deps is a `StreamingResearchContext`, stream the draft
-    narrative text first (via `stream_reporter_text`) to populate the SSE
-    token queue, then run the structured `reporter_agent` to produce the
-    canonical `MarketReport`. The streaming call is best-effort: failures
-    are logged but do NOT abort the run — the structured call still fires.
+    The report is produced by `write_report` in the configured REPORTER_MODE.
+    If the deps is a `StreamingResearchContext`, the growing draft fills the
+    SSE token queue while the same call produces the canonical `MarketReport`.
     """
-    await ctx.deps.add_event("agent_start", "Reporter", "Starting report synthesis")
-
-    # Best-effort streaming draft pass (Part 4). Only fires when the deps is a
-    # StreamingResearchContext (production route path); ignored for plain
-    # ResearchContext (CLI / unit tests that do not need SSE token frames).
-    from api.stream import StreamingResearchContext as _SRC
-    from app.agents.reporter import stream_reporter_text
-
-    if isinstance(ctx.deps, _SRC):
-        try:
-            await asyncio.wait_for(
-                stream_reporter_text(synthesis_prompt, ctx.deps),
-                timeout=_REPORTER_TIMEOUT,
-            )
-        except asyncio.TimeoutError:
-            await ctx.deps.add_event(
-                "info", "Reporter", f"Streaming draft timed out after {_REPORTER_TIMEOUT}s"
-            )
-        except UnexpectedModelBehavior as e:
-            await ctx.deps.add_event(
-                "info", "Reporter", f"Streaming draft model behavior issue: {e}"
-            )
-        except UsageLimitExceeded as e:
-            await ctx.deps.add_event(
-                "info", "Reporter", f"Streaming draft usage limit: {e}"
-            )
-        except Exception as e:  # noqa: BLE001 — best-effort streaming, see docstring
-            await ctx.deps.add_event(
-                "info", "Reporter", f"Streaming draft failed (non-fatal): {e}"
-            )
-        finally:
-            # Ensure token-stream sentinel is set even if stream_reporter_text
-            # itself failed to reach its own finally block.
-            ctx.deps.close_token_stream()
+    return await reporter_stage(ctx.deps, synthesis_prompt, ctx.usage)
 
-    try:
-        result = await asyncio.wait_for(
-            reporter_agent.run(
+
+async def reporter_stage(
+    deps: ResearchContext,
+    synthesis_prompt: str,
+    usage: RunUsage,
+) -> MarketReport:
+    """Run the Reporter agent as a pipeline stage (see `run_reporter`).
+
+    Each attempt runs on its own usage, and only the successful one is added
+    to `usage`: the reporter's token and request limits cover one report, not
+    the tokens the lead, the research stages or a failed attempt already spent.
+
+    UnexpectedModelBehavior is retried under the stage retry policy. The
+    token stream stays open across attempts, so a retry keeps streaming once
+    its draft grows past what earlier attempts sent. Never raises for model
+    failures: a timeout or error degrades to a placeholder MarketReport
+    pointing at the retry endpoint.
+    """
+    await deps.add_event("agent_start", "Reporter", "Starting report synthesis")
+
+    from app.agents.reporter import write_report
+
+    budget = stage_budget(deps, "reporter")
+    policy = stage_retry_policy()
+
+    async def attempt(model: Any) -> MarketReport:
+        attempt_usage = RunUsage()
+        report = await asyncio.wait_for(
+            write_report(
                 synthesis_prompt,
-                deps=ctx.deps,
-                usage=ctx.usage,
-                usage_limits=UsageLimits(request_limit=8, tool_calls_limit=0),
+                deps,
+                usage=attempt_usage,
+                usage_limits=budget.usage_limits(),
+                model=model,
+                close_stream=False,
             ),
-            timeout=_REPORTER_TIMEOUT,
+            timeout=budget.timeout,
         )
-        await ctx.deps.add_event("agent_end", "Reporter", "Completed report synthesis")
-        return result.output
+        usage.incr(attempt_usage)
+        return report
+
+    try:
+        report = await policy.run(deps, "Reporter", attempt)
+        await deps.add_event(
+            "agent_end", "Reporter", "Completed report synthesis", details={"attempts": policy.attempts}
+        )
+        return report
 
     except asyncio.TimeoutError:
-        await ctx.deps.add_event("agent_limit", "Reporter", f"Timeout after {_AGENT_TIMEOUT}s")
+        await deps.add_event(
+            "agent_limit", "Reporter", f"Timeout after {budget.timeout}s", details={"attempts": policy.attempts}
+        )
         return MarketReport(
             title="Report Generation Timed Out",
             executive_summary=(
-                f"The reporter agent timed out after {_AGENT_TIMEOUT}s. "
+                f"The reporter agent timed out after {budget.timeout}s. "
                 "Research and analyst findings were captured and are available for retry."
             ),
             sections=[],
             sources=[],
             markdown_content=(
                 f"# Report Timed Out\n\nThe reporter agent did not complete within "
-                f"{_AGENT_TIMEOUT}s. Research and analyst findings are stored in the session "
+                f"{budget.timeout}s. Research and analyst findings are stored in the session "
                 "and can be accessed via the retry endpoint."
             ),
         )
     except (UsageLimitExceeded, UnexpectedModelBehavior, Exception) as e:
-        await ctx.deps.add_event("agent_limit", "Reporter", f"Reporter failed: {str(e)}")
+        await deps.add_event(
+            "agent_limit", "Reporter", f"Reporter failed: {str(e)}", details={"attempts": policy.attempts}
+        )
         return MarketReport(
             title="Report Generation Failed",
             executive_summary=(
@@ -324,4 +419,8 @@ async def run_reporter(
                 "stored in the session and can be accessed via the retry endpoint."
             ),
         )
+    finally:
+        close_token_stream = getattr(deps, "close_token_stream", None)
+        if close_token_stream is not None:
+            close_token_stream()
 
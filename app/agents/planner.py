@@ -0,0 +1,33 @@
+"""Research Planner: classifies the question for the deterministic pipeline engine."""
+
+from pydantic_ai import Agent
+
+from app.context import ResearchContext
+from app.llm import get_model, get_retries
+from app.schema import ResearchPlan
+
+model = get_model()
+
+planner_agent = Agent(
+    model,
+    deps_type=ResearchContext,
+    output_type=ResearchPlan,
+    retries=get_retries(),
+    instructions=(
+        "You plan healthcare market intelligence research. You do NOT research or answer "
+        "the question — you only classify it so specialist agents can be briefed.\n\n"
+        "1. QUESTION ARCHETYPE — classify the question as one of:\n"
+        "   - 'coverage/formulary': payer coverage, formulary tier, prior auth, step therapy, "
+        "or market basket access\n"
+        "   - 'volume/prescribing': TRx, NBRx, patient share, or prescription trends\n"
+        "   - 'care-delivery': site of care, administration route, specialty pharmacy, home "
+        "infusion, or REMS\n"
+        "   - 'regulatory/pipeline': FDA/EMA approval status, clinical trials, or pipeline\n"
+        "   - 'market-sizing/competitive': market size, revenue forecasts, competitive "
+        "landscape or market share\n"
+        "   - 'multi-dimensional': spans two or more of the above\n"
+        "2. KEY PRODUCT — the primary product(s) or drug class, or null if none is named.\n"
+        "3. PRIMARY DIMENSIONS — 2-3 specific information areas most central to answering "
+        "the question (e.g. 'payer coverage', 'step therapy', 'formulary tier')."
+    ),
+)
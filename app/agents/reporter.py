@@ -1,34 +1,129 @@
 """Reporter Agent: synthesize findings into a publication-ready Markdown report.
 
-Part 4: Adds a parallel streaming-only agent (`_reporter_stream_agent`) with
-`output_type=str` and a `stream_reporter_text` helper. The streaming agent
-emits free-form Markdown text via `stream_text(delta=True)` so the Run-screen
-"Emerging draft" panel can show word-by-word output. The structured
-`reporter_agent` (`output_type=MarketReport`) still runs after streaming —
-it is the authoritative producer of the typed `MarketReport`, gated by
-`output_validator`. Pydantic-ai's `stream_text()` is incompatible with
-structured outputs (hard-coded UserError), so the two-call hybrid is required.
+`stream_report` runs the structured `reporter_agent` once and streams the
+partially-validated `MarketReport` as it is generated, so the Run-screen
+"Emerging draft" panel shows the report word-by-word while the same call
+produces the canonical typed report (gated by `output_validator`).
+
+By default the model only fills the structured fields; `markdown_content` is
+rendered from them locally (`app.report_markdown`). Set
+REPORTER_MARKDOWN=llm to have the model write it as well.
 """
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+import os
+from typing import TYPE_CHECKING, Any
 
-from pydantic_ai import Agent, ModelRetry, RunContext
+from pydantic_ai import Agent, ModelRetry, RunContext, UsageLimits
+from pydantic_ai.usage import RunUsage
 
 from app.context import ResearchContext
 from app.llm import get_model, get_retries
-from app.schema import AnalystFindings, MarketAccessFindings, MarketReport
+from app.report_markdown import render_markdown
+from app.schema import AnalystFindings, MarketAccessFindings, MarketReport, MarketReportContent
 
 if TYPE_CHECKING:
     from api.stream import StreamingResearchContext
 
 model = get_model()
 
+# 'single' (default): one reporter call writes the whole report, streamed when
+# the context supports it. 'sectioned': sections are written concurrently and
+# the executive summary last (app.agents.section_writer).
+_REPORTER_MODE = os.environ.get("REPORTER_MODE", "single").strip().lower()
+
+# 'render' (default): the model fills the structured fields only and
+# markdown_content is rendered from them in code. 'llm': the model writes
+# markdown_content too — roughly double the output tokens.
+_MARKDOWN_MODE = os.environ.get("REPORTER_MARKDOWN", "render").strip().lower()
+
+if _MARKDOWN_MODE == "llm":
+    _MARKDOWN_REQUIREMENT = (
+        "4. Populate markdown_content with the FULL report as a single well-formatted "
+        "Markdown string (title, all sections, sources appendix).\n"
+    )
+else:
+    _MARKDOWN_REQUIREMENT = (
+        "4. Do NOT write a separate Markdown copy of the report — it is rendered "
+        "automatically from title, executive_summary, sections, country_mix, "
+        "scenario_probabilities and sources. Format section content itself as Markdown "
+        "(bullets, tables).\n"
+    )
+
+
+# Section menus by question archetype (the sectioned reporter plans from these too).
+SECTION_MENUS: dict[str, list[str]] = {
+    "coverage/formulary": [
+        "Executive Summary",
+        "Payer Coverage Landscape",
+        "Formulary Tier & Positioning",
+        "Prior Authorization & Step Therapy Requirements",
+        "Access Barriers & Utilization Management",
+        "Competitive Payer Positioning",
+        "Gaps & Data Confidence",
+        "Key Takeaways & Implications",
+    ],
+    "volume/prescribing": [
+        "Executive Summary",
+        "Prescription Volume Overview (TRx/NBRx Trends)",
+        "Patient Share & Market Share Analysis",
+        "Channel Mix (Retail vs Specialty Pharmacy)",
+        "Analogue Launch Benchmarks",
+        "Competitive Rx Landscape",
+        "Payer Access Context",
+        "Gaps & Data Confidence",
+        "Key Takeaways & Implications",
+    ],
+    "care-delivery": [
+        "Executive Summary",
+        "Administration Route & Care Setting",
+        "Specialty Pharmacy & REMS Requirements",
+        "Site-of-Care Economics",
+        "Payer Site-of-Care Restrictions",
+        "Channel Mix & Dispensing Data",
+        "Competitive Site-of-Care Landscape",
+        "Gaps & Data Confidence",
+        "Key Takeaways & Implications",
+    ],
+    "regulatory/pipeline": [
+        "Executive Summary",
+        "Regulatory Status (FDA/EMA/other)",
+        "Clinical Pipeline",
+        "HEOR & Real-World Evidence",
+        "Market Access & Payer Readiness",
+        "Competitive Regulatory Landscape",
+        "Gaps & Data Confidence",
+        "Key Takeaways & Implications",
+    ],
+    "market-sizing/competitive": [
+        "Executive Summary",
+        "Market Size & Growth Forecast",
+        "Competitive Landscape & Market Share",
+        "Prescription Volume Benchmarks (TRx/NBRx)",
+        "Analogue Launch Comparisons",
+        "Payer & Access Dynamics",
+        "Regulatory & Pipeline Context",
+        "Gaps & Data Confidence",
+        "Key Takeaways & Implications",
+    ],
+}
+
+_SECTION_STRUCTURE = "".join(
+    f"{archetype}:\n" + "".join(f"  {i}. {heading}\n" for i, heading in enumerate(headings, 1)) + "\n"
+    for archetype, headings in SECTION_MENUS.items()
+)
+
+
+def render_report(report: MarketReportContent) -> MarketReport:
+    """Submit the final report; its Markdown is rendered from these fields."""
+    return MarketReport(**dict(report), markdown_content=render_markdown(report))
+
+
 reporter_agent = Agent(
     model,
     deps_type=ResearchContext,
-    output_type=MarketReport,
+    output_type=MarketReport if _MARKDOWN_MODE == "llm" else render_report,
     retries=get_retries(),
     instructions=(
         "You are a Healthcare Commercial Intelligence Reporter. Your audience is "
@@ -39,55 +134,8 @@ reporter_agent = Agent(
         "You will receive a synthesis prompt that includes a QUESTION ARCHETYPE. Use it "
         "to select the appropriate section structure from the menus below.\n\n"
         "SECTION STRUCTURE BY ARCHETYPE:\n\n"
-        "coverage/formulary:\n"
-        "  1. Executive Summary\n"
-        "  2. Payer Coverage Landscape\n"
-        "  3. Formulary Tier & Positioning\n"
-        "  4. Prior Authorization & Step Therapy Requirements\n"
-        "  5. Access Barriers & Utilization Management\n"
-        "  6. Competitive Payer Positioning\n"
-        "  7. Gaps & Data Confidence\n"
-        "  8. Key Takeaways & Implications\n\n"
-        "volume/prescribing:\n"
-        "  1. Executive Summary\n"
-        "  2. Prescription Volume Overview (TRx/NBRx Trends)\n"
-        "  3. Patient Share & Market Share Analysis\n"
-        "  4. Channel Mix (Retail vs Specialty Pharmacy)\n"
-        "  5. Analogue Launch Benchmarks\n"
-        "  6. Competitive Rx Landscape\n"
-        "  7. Payer Access Context\n"
-        "  8. Gaps & Data Confidence\n"
-        "  9. Key Takeaways & Implications\n\n"
-        "care-delivery:\n"
-        "  1. Executive Summary\n"
-        "  2. Administration Route & Care Setting\n"
-        "  3. Specialty Pharmacy & REMS Requirements\n"
-        "  4. Site-of-Care Economics\n"
-        "  5. Payer Site-of-Care Restrictions\n"
-        "  6. Channel Mix & Dispensing Data\n"
-        "  7. Competitive Site-of-Care Landscape\n"
-        "  8. Gaps & Data Confidence\n"
-        "  9. Key Takeaways & Implications\n\n"
-        "regulatory/pipeline:\n"
-        "  1. Executive Summary\n"
-        "  2. Regulatory Status (FDA/EMA/other)\n"
-        "  3. Clinical Pipeline\n"
-        "  4. HEOR & Real-World Evidence\n"
-        "  5. Market Access & Payer Readiness\n"
-        "  6. Competitive Regulatory Landscape\n"
-        "  7. Gaps & Data Confidence\n"
-        "  8. Key Takeaways & Implications\n\n"
-        "market-sizing/competitive:\n"
-        "  1. Executive Summary\n"
-        "  2. Market Size & Growth Forecast\n"
-        "  3. Competitive Landscape & Market Share\n"
-        "  4. Prescription Volume Benchmarks (TRx/NBRx)\n"
-        "  5. Analogue Launch Comparisons\n"
-        "  6. Payer & Access Dynamics\n"
-        "  7. Regulatory & Pipeline Context\n"
-        "  8. Gaps & Data Confidence\n"
-        "  9. Key Takeaways & Implications\n\n"
-        "multi-dimensional:\n"
+        + _SECTION_STRUCTURE
+        + "multi-dimensional:\n"
         "  Use Executive Summary + a hybrid of the two most relevant archetype structures "
         "above, then Gaps & Data Confidence, then Key Takeaways & Implications.\n\n"
         "MANDATORY SECTIONS (every report, every archetype):\n"
@@ -105,9 +153,8 @@ reporter_agent = Agent(
         "1. Populate sections with the archetype-appropriate structure above.\n"
         "2. Every section must draw only from the provided findings — no external facts.\n"
         "3. Cite sources; include all URLs from the findings in the sources list.\n"
-        "4. Populate markdown_content with the FULL report as a single well-formatted "
-        "Markdown string (title, all sections, sources appendix).\n"
-        "5. country_mix (OPTIONAL): if and ONLY if the findings contain country-level "
+        + _MARKDOWN_REQUIREMENT
+        + "5. country_mix (OPTIONAL): if and ONLY if the findings contain country-level "
         "share or spend data (e.g. EU5, US, regional breakdowns), populate country_mix "
         "with one CountryMixEntry per country. Otherwise leave country_mix as null.\n"
         "6. scenario_probabilities (OPTIONAL): if and ONLY if the findings contain "
@@ -129,7 +176,10 @@ reporter_agent = Agent(
 async def validate_reporter_output(
     ctx: RunContext[ResearchContext], output: MarketReport
 ) -> MarketReport:
-    """Reject skeleton reports — require title, summary, sections, and markdown content."""
+    """Reject skeleton reports — require title, summary, sections, and (in llm mode) markdown content."""
+    if ctx.partial_output:
+        # Streamed partial reports are incomplete by definition; validate only the final one.
+        return output
     if not output.title or not output.executive_summary:
         raise ModelRetry(
             "Your report is missing essentials. Both 'title' and 'executive_summary' "
@@ -141,7 +191,7 @@ async def validate_reporter_output(
             "the question archetype, plus the mandatory 'Gaps & Data Confidence' and "
             "'Key Takeaways & Implications' sections."
         )
-    if not output.markdown_content:
+    if _MARKDOWN_MODE == "llm" and not output.markdown_content:
         raise ModelRetry(
             "markdown_content must be populated with the full formatted report as a "
             "single Markdown string including all sections and a sources appendix."
@@ -150,66 +200,106 @@ async def validate_reporter_output(
 
 
 # ---------------------------------------------------------------------------
-# Part 4: streaming-only text agent + helper
+# Single-pass streaming
 #
-# `stream_text()` is incompatible with `output_type=MarketReport`
-# (UserError raised in pydantic-ai source). This separate agent emits
-# free-form Markdown text token-by-token via `stream_text(delta=True)`
-# purely for UX — the structured `reporter_agent` above remains the
-# authoritative producer of the typed `MarketReport`.
+# `reporter_agent` is driven with `iter()` so each model request can be
+# streamed: `stream_output()` partially validates `MarketReport` as the JSON
+# arrives, and the growing draft is forwarded to the SSE token queue. Output
+# validation and retries still run through the normal agent graph, so one
+# call yields both the live draft and the canonical report.
 # ---------------------------------------------------------------------------
 
-_reporter_stream_agent = Agent(
-    model,
-    deps_type=ResearchContext,
-    output_type=str,
-    retries=get_retries(),
-    instructions=(
-        "You are a Healthcare Commercial Intelligence Reporter writing a draft for "
-        "live streaming display. Synthesize the provided market access and analyst "
-        "findings into a well-structured Markdown report.\n\n"
-        "Begin with the title (as a # H1 heading), then the executive summary "
-        "(3 paragraphs: headline answer; key commercial findings; primary risk/caveat), "
-        "then the body sections appropriate to the question archetype, then a "
-        "'Gaps & Data Confidence' section, then 'Key Takeaways & Implications'.\n\n"
-        "Write only narrative prose and headings. Do NOT call any tools. Do NOT emit "
-        "JSON. Every claim must be supported by the provided findings — no external "
-        "facts. Where findings are null, empty, or 'data not available', write "
-        "'Data not available' rather than guessing.\n\n"
-        "Cite sources inline using [N] markers where N is the 1-based index into the "
-        "sources URL list. The full report is your output as plain Markdown text."
-    ),
-)
 
+def draft_markdown(report: MarketReport) -> str:
+    """Render the streamed part of a (possibly partial) report as Markdown.
+
+    Only title, executive summary and sections are rendered — the fields the
+    model writes first — so the draft grows by appending as more of the
+    report arrives, and is a prefix of the final rendered `markdown_content`.
+    """
+    return render_markdown(report, appendices=False)
 
-async def stream_reporter_text(
+
+async def stream_report(
     synthesis_prompt: str,
     ctx: "StreamingResearchContext",
-) -> str:
-    """Stream the reporter's narrative text into the SSE token queue.
-
-    For each delta chunk emitted by pydantic-ai's `stream_text(delta=True)`,
-    call `ctx.put_token(chunk)` to enqueue it for the SSE writer. Always
-    calls `ctx.close_token_stream()` in `finally` so the token-stream
-    sentinel is set even if the streaming agent raises mid-run.
+    usage: RunUsage | None = None,
+    usage_limits: UsageLimits | None = None,
+    model: Any = None,
+    close_stream: bool = True,
+) -> MarketReport:
+    """Run `reporter_agent` once, streaming its draft into the SSE token queue.
 
-    Returns the accumulated text (concatenation of all chunks) — currently
-    unused by the route but kept for symmetry with the structured call.
+    Each partial `MarketReport` is rendered with `draft_markdown`; whenever
+    the draft extends what was already sent (`ctx.streamed_draft`, which
+    carries over between calls), the new suffix goes out via
+    `ctx.put_token`. A retried request — or a retried call — that rewrites
+    earlier text only streams once it grows past the sent draft. Calls
+    `ctx.close_token_stream()` in `finally` unless `close_stream` is False
+    (the caller retries and closes the stream itself).
 
-    Caller is responsible for the four-branch exception discrimination
-    (TimeoutError / UnexpectedModelBehavior / UsageLimitExceeded / Exception).
-    This helper only handles the queue lifecycle.
+    Returns the validated report. Caller is responsible for the four-branch
+    exception discrimination (TimeoutError / UnexpectedModelBehavior /
+    UsageLimitExceeded / Exception).
     """
-    accumulated: list[str] = []
+    sent = ctx.streamed_draft
     try:
-        async with _reporter_stream_agent.run_stream(
+        async with reporter_agent.iter(
             synthesis_prompt,
             deps=ctx,
-        ) as stream_result:
-            async for chunk in stream_result.stream_text(delta=True, debounce_by=0.01):
-                if chunk:
-                    accumulated.append(chunk)
-                    ctx.put_token(chunk)
+            model=model,
+            usage=usage,
+            usage_limits=usage_limits,
+        ) as run:
+            async for node in run:
+                if not Agent.is_model_request_node(node):
+                    continue
+                async with node.stream(run.ctx) as stream:
+                    async for partial in stream.stream_output(debounce_by=0.05):
+                        draft = draft_markdown(partial)
+                        if len(draft) > len(sent) and draft.startswith(sent):
+                            ctx.put_token(draft[len(sent):])
+                            sent = ctx.streamed_draft = draft
+        assert run.result is not None
+        return run.result.output
     finally:
-        ctx.close_token_stream()
-    return "".join(accumulated)
+        if close_stream:
+            ctx.close_token_stream()
+
+
+async def write_report(
+    synthesis_prompt: str,
+    deps: ResearchContext,
+    usage: RunUsage | None = None,
+    usage_limits: UsageLimits | None = None,
+    model: Any = None,
+    close_stream: bool = True,
+) -> MarketReport:
+    """Produce the report in the configured REPORTER_MODE.
+
+    `usage_limits` are the reporter stage's limits (applied per call in
+    sectioned mode) and `model` overrides the reporter model, as a stage
+    retry's fallback model does. A `StreamingResearchContext` has its token stream
+    closed on return unless `close_stream` is False. Exceptions propagate
+    to the caller.
+    """
+    from api.stream import StreamingResearchContext
+
+    if _REPORTER_MODE == "sectioned":
+        from app.agents.section_writer import write_sectioned_report
+
+        try:
+            return await write_sectioned_report(
+                synthesis_prompt, deps, usage, usage_limits=usage_limits, model=model
+            )
+        finally:
+            if close_stream and isinstance(deps, StreamingResearchContext):
+                deps.close_token_stream()
+    if isinstance(deps, StreamingResearchContext):
+        return await stream_report(
+            synthesis_prompt, deps, usage=usage, usage_limits=usage_limits, model=model, close_stream=close_stream
+        )
+    result = await reporter_agent.run(
+        synthesis_prompt, deps=deps, model=model, usage=usage, usage_limits=usage_limits
+    )
+    return result.output
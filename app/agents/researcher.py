@@ -5,10 +5,21 @@ from pydantic_ai import Agent, ModelRetry, RunContext
 from app.context import ResearchContext
 from app.llm import get_model, get_retries
 from app.schema import ClinicalTrialSummary, MarketAccessFindings
-from app.tools import deep_scrape, search_clinical_trials, tavily_search
+from app.tools import (
+    deep_scrape_many_with_events,
+    deep_scrape_with_events,
+    search_clinical_trials,
+    tavily_batch_search,
+    tavily_search,
+)
+from app.tools.saturation import observe_result, refuse_when_saturated
+from app.tools.shaping import shape_items
 
 model = get_model()
 
+# Withdraws the search/scrape tools once this stage's evidence is saturated (SATURATION_MODE=refuse).
+_saturation_gate = refuse_when_saturated("researcher")
+
 researcher_agent = Agent(
     model,
     deps_type=ResearchContext,
@@ -32,6 +43,8 @@ researcher_agent = Agent(
         "- search_clinical_trials: use for regulatory/pipeline or efficacy/safety questions. "
         "SKIP ENTIRELY if the question is purely about payer coverage, formulary, or market "
         "share with no clinical component.\n"
+        "- tavily_batch_search: PREFERRED — pass the queries below as one list in a single "
+        "call; they run concurrently and come back merged and de-duplicated.\n"
         "- tavily_search query 1: regulatory status OR efficacy/HEOR context (if relevant).\n"
         "- tavily_search query 2: payer/formulary landscape — target specific queries such as "
         "'[drug] formulary tier commercial payers prior authorization 2024' or '[drug class] "
@@ -41,6 +54,8 @@ researcher_agent = Agent(
         "- deep_scrape: ONLY for specific URLs returned by search results pointing to payer "
         "medical policy pages, CMS coverage pages, FDA label/REMS pages, or specialty pharmacy "
         "hub pages. Limit to 1-2 scrapes. Do NOT scrape generic search landing pages.\n"
+        "- deep_scrape_many: when 2+ such URLs are worth reading, pass them together (up to "
+        "6) in ONE call instead of several deep_scrape calls; they are fetched in parallel.\n"
         "- STOP after 5-6 total tool calls. Synthesize what you have.\n\n"
         "OUTPUT FIELD GUIDANCE:\n"
         "- regulatory_snapshots: one entry per authority (FDA, EMA, etc.) with approval status, "
@@ -91,7 +106,7 @@ async def validate_researcher_output(
     return output
 
 
-@researcher_agent.tool
+@researcher_agent.tool(prepare=_saturation_gate)
 async def deep_scrape_tool(
     ctx: RunContext[ResearchContext],
     url: str,
@@ -102,14 +117,28 @@ async def deep_scrape_tool(
     - CMS coverage database or Medicare formulary search pages
     - FDA drug label, drug approval, or REMS program pages
     - Specialty pharmacy hub or REMS enrollment pages
-    Limit to 1-2 scrapes. Do not scrape generic search result landing pages — use tavily_search for those."""
-    await ctx.deps.add_event("tool_call", "Crawl4AI", f"Scraping: {url}")
-    res = await deep_scrape(url, query)
-    await ctx.deps.add_event("tool_result", "Crawl4AI", f"Scraped {len(res)} characters")
-    return res
+    Limit to 1-2 scrapes. Do not scrape generic search result landing pages — use tavily_search for those.
+    Pass query (e.g. "prior authorization criteria") to get only the most relevant passages."""
+    result = await deep_scrape_with_events(ctx, url, query, stage="researcher")
+    return await observe_result(ctx.deps, "researcher", "deep_scrape", result)
+
+
+@researcher_agent.tool(prepare=_saturation_gate)
+async def deep_scrape_many_tool(
+    ctx: RunContext[ResearchContext],
+    urls: list[str],
+    query: str | None = None,
+) -> str:
+    """Scrape several URLs (up to 6) in parallel in a single call — prefer this over repeated
+    deep_scrape calls when search results point to more than one payer policy, CMS coverage,
+    FDA label/REMS or specialty pharmacy hub page. Pages that do not finish in time come back
+    as a short "Not finished" marker; use what did arrive.
+    Pass query (e.g. "prior authorization criteria") to get only the most relevant passages."""
+    result = await deep_scrape_many_with_events(ctx, urls, query, stage="researcher")
+    return await observe_result(ctx.deps, "researcher", "deep_scrape_many", result)
 
 
-@researcher_agent.tool
+@researcher_agent.tool(prepare=_saturation_gate)
 async def search_clinical_trials_tool(
     ctx: RunContext[ResearchContext],
     search_expr: str,
@@ -125,11 +154,22 @@ async def search_clinical_trials_tool(
     search_expr: drug name, condition name, or NCT ID."""
     await ctx.deps.add_event("tool_call", "ClinicalTrials", f"Searching trials for: {search_expr}")
     res = await search_clinical_trials(search_expr, max_studies=max_studies)
-    await ctx.deps.add_event("tool_result", "ClinicalTrials", f"Found {len(res)} trials")
-    return res
+    kept, shaped = shape_items("search_clinical_trials", res)
+    message = f"Found {len(res)} trials"
+    if len(kept) < len(res):
+        message += f" (returning {len(kept)} within token budget)"
+    await ctx.deps.add_event("tool_result", "ClinicalTrials", message, details=shaped.details())
+    await observe_result(
+        ctx.deps,
+        "researcher",
+        "search_clinical_trials",
+        "\n".join(f"{t.nct_id} {t.title} {t.phase or ''} {t.status or ''}" for t in kept),
+        sources=[t.nct_id for t in kept],
+    )
+    return kept
 
 
-@researcher_agent.tool
+@researcher_agent.tool(prepare=_saturation_gate)
 async def tavily_search_tool(
     ctx: RunContext[ResearchContext],
     query: str,
@@ -144,4 +184,22 @@ async def tavily_search_tool(
     - REMS: "[drug] REMS program enrollment requirements"
     - Reimbursement: "[drug] Medicare Part D specialty tier coverage CMS"
     Returns concatenated search result summaries with source URLs."""
-    return await tavily_search(ctx, query, max_results=max_results)
+    result = await tavily_search(ctx, query, max_results=max_results, stage="researcher")
+    return await observe_result(ctx.deps, "researcher", "tavily_search", result)
+
+
+@researcher_agent.tool(prepare=_saturation_gate)
+async def tavily_batch_search_tool(
+    ctx: RunContext[ResearchContext],
+    queries: list[str],
+    max_results: int = 5,
+) -> str:
+    """Run several web searches at once (up to 8 queries) in a single call — prefer this over
+    repeated tavily_search calls. Pass the regulatory, payer/formulary, site-of-care and HEOR
+    query patterns from tavily_search together, e.g.
+    ["[drug] FDA approval date indication label",
+     "[drug] formulary tier commercial payers prior authorization 2024",
+     "[drug] cost-effectiveness ICER budget impact study"].
+    Returns one merged block of results, de-duplicated by URL, with the queries each result matched."""
+    result = await tavily_batch_search(ctx, queries, max_results=max_results, stage="researcher")
+    return await observe_result(ctx.deps, "researcher", "tavily_batch_search", result)
@@ -0,0 +1,296 @@
+"""Sectioned reporter: write report sections concurrently, then the summary.
+
+The single-pass reporter generates the whole report as one long sequential
+output, so its latency grows with the document. In sectioned mode
+(REPORTER_MODE=sectioned) `write_sectioned_report` instead:
+
+1. plans the section headings — taken straight from `SECTION_MENUS` for a
+   single-archetype question, or picked by a short outline call for
+   'multi-dimensional' ones;
+2. writes every `ReportSection` concurrently (plus the optional country-mix
+   and scenario tables), at most REPORTER_SECTION_CONCURRENCY LLM calls at a
+   time;
+3. writes the title and executive summary last, from the section digests.
+
+Sources are collected from the findings in code and numbered up front, so
+every section writer cites the same `[N]` markers. Latency then scales with
+the longest section rather than the whole document.
+
+Each LLM call runs under per-call limits derived from the reporter stage's
+budget (see `_call_limits`): the token cap applies to every call, while the
+request limit is capped at a few requests per call, since a report makes one
+call per section. The stage's wall-clock limit still covers the whole report.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+from typing import Any, TypeVar
+
+from pydantic import BaseModel, Field
+from pydantic_ai import Agent, UsageLimits
+from pydantic_ai.exceptions import UnexpectedModelBehavior
+from pydantic_ai.usage import RunUsage
+
+from app.agents.reporter import SECTION_MENUS
+from app.context import ResearchContext
+from app.llm import get_model, get_retries
+from app.report_markdown import render_markdown
+from app.schema import CountryMixEntry, MarketReport, ReportSection, ScenarioEntry
+
+model = get_model()
+
+T = TypeVar("T")
+
+_MANDATORY = ["Gaps & Data Confidence", "Key Takeaways & Implications"]
+_URL = re.compile(r"https?://[^\s\"'<>)\]\\,]+")
+_DIGEST_CHARS = 600
+_CALL_REQUESTS = 3
+_FAILED_SECTION = "_This section could not be generated._"
+
+_GROUNDING = (
+    "Every claim must come from the provided findings — no external facts. Where a "
+    "finding is null, empty, or 'data not available', write 'Data not available' and "
+    "never present estimates as confirmed data. Cite sources inline as [N], where N is "
+    "the number of the source in the NUMBERED SOURCES list."
+)
+
+
+class ReportOutline(BaseModel):
+    """Section headings chosen for a multi-dimensional question."""
+
+    headings: list[str] = Field(description="Body section headings in report order")
+
+
+class ReportTables(BaseModel):
+    """The optional tabular fields of a MarketReport."""
+
+    country_mix: list[CountryMixEntry] | None = Field(
+        default=None,
+        description="Country-level share/spend rows; null unless present in the findings",
+    )
+    scenario_probabilities: list[ScenarioEntry] | None = Field(
+        default=None,
+        description="Scenario assessments; null unless present in the findings",
+    )
+
+
+class ReportSummary(BaseModel):
+    """Title and executive summary, written after the sections."""
+
+    title: str = Field(description="Report title")
+    executive_summary: str = Field(description="Three-paragraph executive summary")
+
+
+outline_agent = Agent(
+    model,
+    deps_type=ResearchContext,
+    output_type=ReportOutline,
+    retries=get_retries(),
+    instructions=(
+        "You plan the section structure of a healthcare market intelligence report. "
+        "The question spans several dimensions: choose 4-7 body section headings as a "
+        "hybrid of the two most relevant archetype structures below, in report order. "
+        "Do NOT include 'Executive Summary', 'Gaps & Data Confidence' or 'Key Takeaways "
+        "& Implications' — they are added automatically.\n\n"
+        + "".join(f"{archetype}: {', '.join(headings)}\n" for archetype, headings in SECTION_MENUS.items())
+    ),
+)
+
+section_agent = Agent(
+    model,
+    deps_type=ResearchContext,
+    output_type=ReportSection,
+    retries=get_retries(),
+    instructions=(
+        "You are a Healthcare Commercial Intelligence Reporter writing ONE section of a "
+        "report whose other sections are being written in parallel by colleagues. Write "
+        "like a senior analyst at a healthcare consulting firm — precise, commercially "
+        "actionable, and evidence-grounded. Cover only your section's topic; do not "
+        "repeat material that belongs to other sections in the outline. Use the exact "
+        "heading you are given. Format content as Markdown (bullets, tables).\n\n"
+        "For 'Gaps & Data Confidence': list every null, empty, or 'data not available' "
+        "field in the findings — what was searched for, what was not found, and any "
+        "staleness. For 'Key Takeaways & Implications': 3-5 bulleted commercial "
+        "insights.\n\n" + _GROUNDING
+    ),
+)
+
+tables_agent = Agent(
+    model,
+    deps_type=ResearchContext,
+    output_type=ReportTables,
+    retries=get_retries(),
+    instructions=(
+        "Extract tabular data for a market report. Populate country_mix ONLY if the "
+        "findings contain country-level share or spend data, and scenario_probabilities "
+        "ONLY if they contain scenario-style assessments (base/bull/bear, etc.). "
+        "Otherwise leave each as null. Never invent shares, spend figures, or "
+        "probabilities."
+    ),
+)
+
+summary_agent = Agent(
+    model,
+    deps_type=ResearchContext,
+    output_type=ReportSummary,
+    retries=get_retries(),
+    instructions=(
+        "You write the title and executive summary of a finished healthcare market "
+        "intelligence report from digests of its sections. Executive summary, 3 "
+        "paragraphs: (1) headline answer to the research question in 1-2 sentences; "
+        "(2) the most commercially important findings across access, volume, and "
+        "competitive dimensions; (3) the primary risk, gap, or caveat a decision-maker "
+        "must know. Use only what the digests say. " + _GROUNDING
+    ),
+)
+
+
+def collect_sources(synthesis_prompt: str) -> list[str]:
+    """Every URL in the findings, de-duplicated in first-seen order."""
+    return list(dict.fromkeys(url.rstrip(".;:") for url in _URL.findall(synthesis_prompt)))
+
+
+def _prompt_header(synthesis_prompt: str) -> str:
+    """The question/archetype lines of a synthesis prompt (everything before the findings)."""
+    head, found, _ = synthesis_prompt.partition("MARKET ACCESS FINDINGS")
+    return head.strip() if found else synthesis_prompt
+
+
+def _archetype(synthesis_prompt: str) -> str:
+    match = re.search(r"QUESTION ARCHETYPE:\s*([\w/-]+)", synthesis_prompt)
+    return match.group(1).strip().lower() if match else "multi-dimensional"
+
+
+def _with_mandatory(headings: list[str]) -> list[str]:
+    """Drop the executive summary (written last) and ensure the mandatory sections close the report."""
+    body = [
+        h.strip()
+        for h in headings
+        if h.strip() and h.strip().lower() not in {"executive summary", *(m.lower() for m in _MANDATORY)}
+    ]
+    return list(dict.fromkeys(body)) + _MANDATORY
+
+
+def _call_limits(stage_limits: UsageLimits | None) -> UsageLimits:
+    """Limits for one section-writer call, derived from the reporter stage's limits."""
+    if stage_limits is None:
+        return UsageLimits(request_limit=_CALL_REQUESTS, tool_calls_limit=0)
+    return UsageLimits(
+        request_limit=min(_CALL_REQUESTS, stage_limits.request_limit or _CALL_REQUESTS),
+        tool_calls_limit=0,
+        total_tokens_limit=stage_limits.total_tokens_limit,
+    )
+
+
+def _digest(section: ReportSection) -> str:
+    content = section.content.strip()
+    if len(content) > _DIGEST_CHARS:
+        content = content[:_DIGEST_CHARS].rsplit(" ", 1)[0] + " …"
+    return f"## {section.heading}\n{content}"
+
+
+async def write_sectioned_report(
+    synthesis_prompt: str,
+    deps: ResearchContext,
+    usage: RunUsage | None = None,
+    usage_limits: UsageLimits | None = None,
+    model: Any = None,
+) -> MarketReport:
+    """Write a MarketReport section by section (see module docstring).
+
+    `usage_limits` are the reporter stage's limits, applied per call (see
+    `_call_limits`); `model` overrides the model of every call, as a stage
+    retry's fallback model does. A section whose writer fails is kept as a
+    fixed 'could not be generated' note in the report, with the error in an
+    `agent_limit` event, rather than failing the whole report. If the streaming context
+    supports it, each section is forwarded as reporter_token frames, in
+    outline order, as soon as it and every section before it are done.
+
+    Environment variables:
+        REPORTER_SECTION_CONCURRENCY: Maximum concurrent LLM calls (default 4).
+
+    Raises:
+        UnexpectedModelBehavior: No section could be written.
+    """
+    usage = usage if usage is not None else RunUsage()
+    limit = asyncio.Semaphore(max(1, int(os.environ.get("REPORTER_SECTION_CONCURRENCY", "4"))))
+    call_limits = _call_limits(usage_limits)
+
+    async def call(agent: Agent[ResearchContext, T], prompt: str) -> T:
+        async with limit:
+            result = await agent.run(prompt, deps=deps, model=model, usage_limits=call_limits)
+        usage.incr(result.usage())
+        return result.output
+
+    archetype = _archetype(synthesis_prompt)
+    if archetype in SECTION_MENUS:
+        headings = _with_mandatory(SECTION_MENUS[archetype])
+    else:
+        outline = await call(outline_agent, _prompt_header(synthesis_prompt))
+        headings = _with_mandatory(outline.headings)
+    await deps.add_event(
+        "info",
+        "Reporter",
+        f"Writing {len(headings)} sections concurrently",
+        details={"archetype": archetype, "headings": headings},
+    )
+
+    sources = collect_sources(synthesis_prompt)
+    context = (
+        f"{synthesis_prompt}\n\n"
+        "REPORT OUTLINE (each section is written separately):\n"
+        + "".join(f"{i}. {h}\n" for i, h in enumerate(headings, 1))
+        + "\nNUMBERED SOURCES:\n"
+        + ("".join(f"{i}. {url}\n" for i, url in enumerate(sources, 1)) or "None\n")
+    )
+
+    put_token = getattr(deps, "put_token", None)
+    written: dict[int, ReportSection] = {}
+    failed: set[int] = set()
+    flushed = 0
+
+    async def write(index: int, heading: str) -> ReportSection:
+        nonlocal flushed
+        try:
+            section = await call(section_agent, f'{context}\nYOUR TASK: write ONLY the section "{heading}".')
+            section = ReportSection(heading=heading, content=section.content)
+        except Exception as e:
+            await deps.add_event("agent_limit", "Reporter", f"Section '{heading}' failed: {e}")
+            failed.add(index)
+            section = ReportSection(heading=heading, content=_FAILED_SECTION)
+        written[index] = section
+        while put_token is not None and flushed in written:
+            put_token(("\n\n" if flushed else "") + f"## {written[flushed].heading}\n\n{written[flushed].content}")
+            flushed += 1
+        return section
+
+    async def tables() -> ReportTables:
+        try:
+            return await call(tables_agent, synthesis_prompt)
+        except Exception as e:
+            await deps.add_event("info", "Reporter", f"Country mix / scenario tables skipped: {e}")
+            return ReportTables()
+
+    # Section failures are caught in write()/tables(), so gather only raises on
+    # cancellation (e.g. the reporter timeout), which it passes to every child.
+    *sections, extra = await asyncio.gather(*(write(i, h) for i, h in enumerate(headings)), tables())
+    if len(failed) == len(sections):
+        raise UnexpectedModelBehavior("No report section could be generated")
+
+    summary = await call(
+        summary_agent,
+        f"{_prompt_header(synthesis_prompt)}\n\nSECTION DIGESTS:\n\n" + "\n\n".join(_digest(s) for s in sections),
+    )
+    report = MarketReport(
+        title=summary.title,
+        executive_summary=summary.executive_summary,
+        sections=sections,
+        sources=sources,
+        country_mix=extra.country_mix or None,
+        scenario_probabilities=extra.scenario_probabilities or None,
+    )
+    report.markdown_content = render_markdown(report)
+    return report
@@ -0,0 +1,236 @@
+"""Per-run usage budgets scaled to the complexity of the question.
+
+A single-drug payer question needs far fewer turns than a multi-country
+competitive landscape, yet every stage used to run under the same fixed
+`UsageLimits`. `allocate` classifies the query locally — no model call — and
+assigns each stage a request, tool-call, wall-clock and (optional) token budget:
+
+- archetype: keyword rules over the same archetypes the lead and planner use;
+  two or more matching archetypes make the question 'multi-dimensional'. When
+  the planner agent has already classified the question (pipeline engine),
+  its archetype wins;
+- complexity: 'simple', 'standard' or 'complex', from the number of matched
+  dimensions, geographies and comparison cues, and the query length;
+- budgets: the standard budgets (the previous fixed limits) scaled by the
+  complexity tier. For a single-archetype question the stage that does not
+  own that archetype — the analyst for a coverage question, the researcher
+  for a market-sizing one — gets a reduced share.
+
+The allocation travels on `ResearchContext.budget`; stages read theirs with
+`stage_budget`. It is recorded as a `Budget` info event and, in the API, on
+the session row (`budget_json`) so budgets can be tuned against outcomes.
+Set BUDGET_ALLOCATOR=off to give every run the standard budgets.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from typing import Any, Literal
+
+from pydantic import BaseModel, Field
+from pydantic_ai import UsageLimits
+
+from app.schema import ResearchPlan
+
+Complexity = Literal["simple", "standard", "complex"]
+
+# Matched as whole words/phrases, so inflections are listed explicitly.
+ARCHETYPE_KEYWORDS: dict[str, tuple[str, ...]] = {
+    "coverage/formulary": (
+        "coverage", "covered", "covers", "formulary", "formularies", "prior auth", "prior authorization",
+        "step therapy", "step edit", "step edits", "payer", "payers", "reimburse", "reimbursed",
+        "reimbursement", "pbm", "pbms", "tier", "tiers", "tiered", "medicare", "medicaid",
+        "utilization management",
+    ),
+    "volume/prescribing": (
+        "trx", "nbrx", "prescription", "prescriptions", "prescribing", "scripts", "patient share", "uptake",
+    ),
+    "care-delivery": (
+        "site of care", "sites of care", "site of administration", "drug administration", "infusion",
+        "infusions", "specialty pharmacy", "specialty pharmacies", "rems", "channel", "channels",
+        "buy-and-bill",
+    ),
+    "regulatory/pipeline": (
+        "fda", "ema", "approval", "approvals", "approved", "pipeline", "trial", "trials", "phase",
+        "phases", "label", "labels", "labeling", "regulatory",
+    ),
+    "market-sizing/competitive": (
+        "market size", "market sizing", "revenue", "revenues", "forecast", "forecasts", "competitive",
+        "competitor", "competitors", "market share", "landscape", "sales", "peak",
+    ),
+}
+# The FDA's name is not a care-delivery cue ("drug administration" otherwise is).
+_FDA_NAME = re.compile(r"\bfood and drug administration\b")
+
+# Lower-case whole words/phrases; the bare pronoun-like "US" is matched case-sensitively instead.
+_GEOGRAPHIES = (
+    "u.s.", "usa", "united states", "eu", "europe", "eu5", "uk", "germany", "france",
+    "italy", "spain", "japan", "china", "canada", "brazil", "india", "global", "worldwide",
+    "countries", "multi-country",
+)
+_US = re.compile(r"\bUS\b")
+_COMPARISON = re.compile(r"\b(vs\.?|versus|compare[ds]?|comparison|across|landscape|each)\b")
+_WORD = re.compile(r"[a-z0-9][a-z0-9.\-]*")
+_LONG_QUERY_WORDS = 30
+
+# Scale applied to the standard budgets per complexity tier.
+TIER_SCALE: dict[str, float] = {"simple": 0.6, "standard": 1.0, "complex": 1.5}
+# Share of the standard budget for the stage that does not own a single archetype.
+SECONDARY_SHARE = 0.7
+
+# Stage owning each single archetype's evidence (the other research stage is secondary).
+_PRIMARY_STAGE = {
+    "coverage/formulary": "researcher",
+    "care-delivery": "researcher",
+    "regulatory/pipeline": "researcher",
+    "volume/prescribing": "analyst",
+    "market-sizing/competitive": "analyst",
+}
+
+
+class StageBudget(BaseModel):
+    """Limits for one stage of a run."""
+
+    request_limit: int = Field(description="Maximum model requests")
+    tool_calls_limit: int = Field(description="Maximum tool calls")
+    total_tokens_limit: int | None = Field(default=None, description="Maximum total tokens, or None for unbounded")
+    timeout: float | None = Field(default=None, description="Wall-clock limit in seconds, or None for unbounded")
+
+    def usage_limits(self) -> UsageLimits:
+        return UsageLimits(
+            request_limit=self.request_limit,
+            tool_calls_limit=self.tool_calls_limit,
+            total_tokens_limit=self.total_tokens_limit,
+        )
+
+
+class RunBudget(BaseModel):
+    """The query classification and the budgets allocated from it."""
+
+    archetype: str = Field(description="Question archetype the budgets were allocated for")
+    complexity: Complexity = Field(description="Complexity tier")
+    source: Literal["local", "planner", "default"] = Field(
+        description="'local' keyword rules, 'planner' agent archetype, or 'default' (allocator off)"
+    )
+    signals: dict[str, Any] = Field(default_factory=dict, description="Classifier inputs, for tuning")
+    stages: dict[str, StageBudget] = Field(description="Stage name → its budget")
+
+
+def standard_budgets() -> dict[str, StageBudget]:
+    """The fixed budgets every run used before allocation (the 'standard' tier).
+
+    Environment variables:
+        AGENT_TIMEOUT: Researcher/analyst wall-clock limit in seconds (default 120).
+        REPORTER_TIMEOUT: Reporter wall-clock limit in seconds (default 600).
+        BUDGET_STAGE_TOKENS: Total-token limit of each research stage (default unset:
+            unbounded, as before allocation). Scaled with the tier when set.
+        BUDGET_REPORTER_TOKENS: Total-token limit of the reporter (default unset; scaled when set).
+    """
+    agent_timeout = float(os.environ.get("AGENT_TIMEOUT", "120"))
+    stage_tokens = int(os.environ.get("BUDGET_STAGE_TOKENS") or 0) or None
+    return {
+        "lead": StageBudget(request_limit=20, tool_calls_limit=15),
+        "researcher": StageBudget(
+            request_limit=10, tool_calls_limit=12, total_tokens_limit=stage_tokens, timeout=agent_timeout
+        ),
+        "analyst": StageBudget(
+            request_limit=10, tool_calls_limit=12, total_tokens_limit=stage_tokens, timeout=agent_timeout
+        ),
+        "reporter": StageBudget(
+            request_limit=8,
+            tool_calls_limit=0,
+            total_tokens_limit=int(os.environ.get("BUDGET_REPORTER_TOKENS") or 0) or None,
+            timeout=float(os.environ.get("REPORTER_TIMEOUT", "600")),
+        ),
+    }
+
+
+def classify_query(query: str) -> tuple[str, Complexity, dict[str, Any]]:
+    """(archetype, complexity, signals) of `query` from keyword rules."""
+    text = query.lower()
+    words = _WORD.findall(text)
+    keyword_text = _FDA_NAME.sub("fda", text)
+    matched = [
+        archetype
+        for archetype, keywords in ARCHETYPE_KEYWORDS.items()
+        if any(re.search(rf"\b{re.escape(k)}\b", keyword_text) for k in keywords)
+    ]
+    found = {g for g in _GEOGRAPHIES if (g in words if " " not in g else re.search(rf"\b{g}\b", text))}
+    if _US.search(query):
+        found.add("u.s.")
+    geographies = sorted(found)
+    comparison = bool(_COMPARISON.search(text))
+    signals = {
+        "matched_archetypes": matched,
+        "geographies": geographies,
+        "comparison": comparison,
+        "words": len(words),
+    }
+    archetype = matched[0] if len(matched) == 1 else "multi-dimensional"
+    score = max(len(matched) - 1, 0) + max(len(geographies) - 1, 0) + comparison + (len(words) > _LONG_QUERY_WORDS)
+    complexity: Complexity = "simple" if len(matched) <= 1 and score == 0 else "complex" if score >= 2 else "standard"
+    return archetype, complexity, signals
+
+
+def _scale(budget: StageBudget, factor: float, timeout_factor: float, min_requests: int = 2) -> StageBudget:
+    return StageBudget(
+        request_limit=max(min_requests, round(budget.request_limit * factor)),
+        tool_calls_limit=round(budget.tool_calls_limit * factor),
+        total_tokens_limit=round(budget.total_tokens_limit * factor) if budget.total_tokens_limit else None,
+        timeout=round(budget.timeout * timeout_factor, 1) if budget.timeout else None,
+    )
+
+
+def allocate(query: str, plan: ResearchPlan | None = None) -> RunBudget:
+    """Classify `query` and allocate every stage's budget (see module docstring).
+
+    Environment variables:
+        BUDGET_ALLOCATOR: 'local' (default) or 'off' for the standard budgets on every run.
+    """
+    if os.environ.get("BUDGET_ALLOCATOR", "local").strip().lower() == "off":
+        return RunBudget(archetype="multi-dimensional", complexity="standard", source="default", stages=standard_budgets())
+
+    archetype, complexity, signals = classify_query(query)
+    source: Literal["local", "planner"] = "local"
+    if plan is not None:
+        source = "planner"
+        archetype = plan.question_archetype
+        if archetype == "multi-dimensional" and complexity == "simple":
+            complexity = "standard"
+
+    tier = TIER_SCALE[complexity]
+    secondary = None
+    if archetype in _PRIMARY_STAGE:
+        secondary = "analyst" if _PRIMARY_STAGE[archetype] == "researcher" else "researcher"
+    # Wall-clock limits follow the tier only: a secondary stage runs alongside
+    # the primary one, so a shorter timeout would not shorten the run.
+    stages = {
+        name: _scale(budget, tier * (SECONDARY_SHARE if name == secondary else 1.0), tier)
+        for name, budget in standard_budgets().items()
+    }
+    # The lead always makes the same few tool calls; it only needs more for complex runs.
+    stages["lead"] = _scale(standard_budgets()["lead"], max(tier, 1.0), 1.0)
+    return RunBudget(archetype=archetype, complexity=complexity, source=source, signals=signals, stages=stages)
+
+
+def stage_budget(deps: Any, stage: str) -> StageBudget:
+    """The budget allocated to `stage` on this run, or its standard budget."""
+    budget: RunBudget | None = getattr(deps, "budget", None)
+    if budget is not None and stage in budget.stages:
+        return budget.stages[stage]
+    return standard_budgets()[stage]
+
+
+async def apply_budget(deps: Any, query: str, plan: ResearchPlan | None = None) -> RunBudget:
+    """Allocate budgets for this run, store them on `deps` and record a Budget event."""
+    budget = allocate(query, plan)
+    deps.budget = budget
+    await deps.add_event(
+        "info",
+        "Budget",
+        f"{budget.complexity.capitalize()} {budget.archetype} question: "
+        + ", ".join(f"{name} {b.request_limit} req/{b.tool_calls_limit} tools" for name, b in budget.stages.items()),
+        details=budget.model_dump(),
+    )
+    return budget
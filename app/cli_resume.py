@@ -3,10 +3,14 @@
 import os
 import sys
 
-from pydantic_ai import UsageLimits
+from pydantic_ai.usage import RunUsage
 
+from app.budget import apply_budget, stage_budget
 from app.context import ResearchContext
+from app.distill import distill_stage
+from app.findings_format import format_findings
 from app.history import CheckpointSession, ResearchSession, UsageStats
+from app.stage_history import load_stage_history, run_resumable
 
 _SYNTHESIS_PROMPT = (
     "RESEARCH QUESTION: {query}\n\n"
@@ -24,20 +28,23 @@ _SYNTHESIS_PROMPT = (
     "5. Populate sources with every URL present in the findings.\n"
     "6. Executive summary: paragraph 1 = headline answer, paragraph 2 = key commercial "
     "findings, paragraph 3 = primary caveat or risk.\n"
-    "7. Populate markdown_content with the complete formatted report as a single Markdown string."
+    "7. Write each section's content as well-formatted Markdown."
 )
 
 
 async def resume_from_checkpoint(checkpoint: CheckpointSession) -> ResearchSession:
     """Resume a failed pipeline run, skipping stages already in the checkpoint.
 
+    A stage that failed partway continues after its completed tool calls
+    (`checkpoint.stage_history`, see app.stage_history).
+
     Calls researcher_agent, analyst_agent, and reporter_agent directly
     (bypassing lead_agent) so completed stages can be skipped cleanly.
     Mirrors the pattern in api/routes/run.py:_run_reporter_only().
     """
     # Import inside function so get_model() reads env vars after .env is loaded
     from app.agents.analyst import analyst_agent
-    from app.agents.reporter import reporter_agent
+    from app.agents.reporter import write_report
     from app.agents.researcher import researcher_agent
 
     deps = ResearchContext(
@@ -49,15 +56,19 @@ async def resume_from_checkpoint(checkpoint: CheckpointSession) -> ResearchSessi
     query = checkpoint.query
     research = checkpoint.research_findings
     analyst = checkpoint.analyst_findings
+    load_stage_history(deps, checkpoint.stage_history)
+    await apply_budget(deps, query)
 
     # --- Stage 1: Research ---
     if research is None:
         print("[resume] Running researcher agent...", file=sys.stderr)
         deps.add_event("info", "CLI", "Resuming: running researcher agent")
-        result = await researcher_agent.run(
+        result = await run_resumable(
+            researcher_agent,
+            deps,
+            "researcher",
             f"Research market access for: {query}",
-            deps=deps,
-            usage_limits=UsageLimits(request_limit=10, tool_calls_limit=8),
+            usage_limits=stage_budget(deps, "researcher").usage_limits(),
         )
         research = result.output
     else:
@@ -69,10 +80,12 @@ async def resume_from_checkpoint(checkpoint: CheckpointSession) -> ResearchSessi
     if analyst is None:
         print("[resume] Running analyst agent...", file=sys.stderr)
         deps.add_event("info", "CLI", "Resuming: running analyst agent")
-        result = await analyst_agent.run(
+        result = await run_resumable(
+            analyst_agent,
+            deps,
+            "analyst",
             f"Analyze market for: {query}",
-            deps=deps,
-            usage_limits=UsageLimits(request_limit=10, tool_calls_limit=8),
+            usage_limits=stage_budget(deps, "analyst").usage_limits(),
         )
         analyst = result.output
     else:
@@ -83,24 +96,26 @@ async def resume_from_checkpoint(checkpoint: CheckpointSession) -> ResearchSessi
     # --- Stage 3: Reporter (always runs) ---
     print("[resume] Running reporter agent...", file=sys.stderr)
     deps.add_event("info", "CLI", "Resuming: running reporter agent")
+    usage_data = RunUsage()
+    research, analyst = await distill_stage(deps, query, research, analyst, usage_data)
     synthesis_prompt = _SYNTHESIS_PROMPT.format(
         query=query,
         question_archetype="multi-dimensional",
         primary_dimensions="market access, payer coverage, market sizing, competitive landscape",
-        research=research.model_dump_json(indent=2) if research else "Not available",
-        analyst=analyst.model_dump_json(indent=2) if analyst else "Not available",
+        research=format_findings(research),
+        analyst=format_findings(analyst),
     )
-    result = await reporter_agent.run(
+    report = await write_report(
         synthesis_prompt,
-        deps=deps,
-        usage_limits=UsageLimits(request_limit=8, tool_calls_limit=0),
+        deps,
+        usage=usage_data,
+        usage_limits=stage_budget(deps, "reporter").usage_limits(),
     )
-    usage_data = result.usage()
 
     return ResearchSession(
         session_id=checkpoint.session_id,  # preserve same ID for continuity
         query=query,
-        report=result.output,
+        report=report,
         events=deps.events,
         usage=UsageStats(
             requests=getattr(usage_data, "requests", 0) or 0,
@@ -1,5 +1,6 @@
 """Shared dependency context for all agents."""
 
+from collections.abc import Awaitable, Callable
 from dataclasses import dataclass, field
 from typing import Any
 
@@ -22,6 +23,27 @@ class ResearchContext:
     events: list[WorkflowEvent] = field(default_factory=list)
     """List of events captured during the research run."""
 
+    dedup: Any = None
+    """Stage → ContentDeduper (see app.tools.dedup), created on first tool use."""
+
+    saturation: Any = None
+    """Stage → SaturationMonitor (see app.tools.saturation), created on first tool use."""
+
+    on_stage_complete: Callable[[str, Any], Awaitable[None]] | None = None
+    """Optional hook awaited with (stage, findings) as soon as a research stage finishes."""
+
+    budget: Any = None
+    """RunBudget allocated for this run (see app.budget); stages fall back to the standard budgets."""
+
+    stage_history: Any = None
+    """Stage → resume point messages of an unfinished sub-agent run (see app.stage_history)."""
+
+    async def complete_stage(self, stage: str, findings: Any) -> None:
+        """Record a finished stage's findings ('research' or 'analyst') and checkpoint them."""
+        setattr(self, f"{stage}_findings", findings)
+        if self.on_stage_complete is not None:
+            await self.on_stage_complete(stage, findings)
+
     async def add_event(
         self,
         event_type: str,
@@ -0,0 +1,214 @@
+"""Findings distillation: condense oversized free-text fields before synthesis.
+
+`raw_evidence_summary`, `reimbursement_notes` and the analyst's summaries can
+run to thousands of tokens, and they are all replayed into the reporter — the
+most expensive call of the run. With FINDINGS_DISTILL enabled, every string
+field of the findings longer than FINDINGS_FIELD_BUDGET tokens is condensed
+before the synthesis prompt is built:
+
+- 'extractive': sentences are ranked with BM25 against the research question
+  and the best ones are kept, in their original order, until the budget is
+  spent. Local and instant.
+- 'llm': the distiller agent rewrites the field (DISTILL_MODEL picks a cheaper
+  model). A failed or over-budget rewrite falls back to extractive.
+
+Either way, source URLs survive intact: sentences are never cut mid-way, and
+any URL that did not make the cut is appended on a `Sources:` line. Before and
+after token counts are recorded as a `Distiller` info event. Checkpoints keep
+the full findings; only the reporter's view is condensed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import re
+from typing import Any, TypeVar
+
+from pydantic import BaseModel
+from pydantic_ai.usage import RunUsage
+
+from app.context import ResearchContext
+from app.findings_format import format_findings
+from app.tools.passage_rank import Passage, bm25_scores
+from app.tools.shaping import estimate_tokens, truncate_markdown
+
+logger = logging.getLogger(__name__)
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+_URL = re.compile(r"https?://[^\s\"'<>)\]\\,]+")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n+")
+# An LLM rewrite may overshoot the budget by this factor before it is rejected.
+_LLM_SLACK = 1.25
+
+
+def distill_mode() -> str:
+    """FINDINGS_DISTILL: 'off' (default), 'extractive' or 'llm'."""
+    mode = os.environ.get("FINDINGS_DISTILL", "off").strip().lower()
+    return mode if mode in ("extractive", "llm") else "off"
+
+
+def field_budget() -> int:
+    """FINDINGS_FIELD_BUDGET: token budget per free-text field (default 300)."""
+    return max(1, int(os.environ.get("FINDINGS_FIELD_BUDGET", "300")))
+
+
+def _urls(text: str) -> list[str]:
+    return list(dict.fromkeys(url.rstrip(".;:") for url in _URL.findall(text)))
+
+
+def _keep_urls(original: str, condensed: str) -> str:
+    """Append every URL of `original` that `condensed` lost."""
+    missing = [url for url in _urls(original) if url not in condensed]
+    return f"{condensed}\nSources: {' '.join(missing)}" if missing else condensed
+
+
+def extract(text: str, budget: int, query: str) -> str:
+    """Condense `text` to about `budget` tokens by keeping its most relevant sentences.
+
+    Sentences are ranked with BM25 against `query` (earlier sentences win
+    ties) and kept whole, in document order. Text already within budget is
+    returned unchanged.
+    """
+    if estimate_tokens(text) <= budget:
+        return text
+    sentences = [s.strip() for s in _SENTENCE_END.split(text) if s.strip()]
+    scores = bm25_scores([Passage(i, [], s) for i, s in enumerate(sentences)], query)
+    urls = _urls(text)
+
+    def sources_cost(kept: str) -> int:
+        missing = [url for url in urls if url not in kept]
+        return estimate_tokens("Sources: " + " ".join(missing)) if missing else 0
+
+    chosen: list[int] = []
+    used = 0
+    for i in sorted(range(len(sentences)), key=lambda i: (-scores[i], i)):
+        cost = estimate_tokens(sentences[i])
+        kept = " ".join(sentences[j] for j in [*chosen, i])
+        if used + cost + sources_cost(kept) <= budget:
+            chosen.append(i)
+            used += cost
+    if chosen:
+        condensed = " ".join(sentences[i] for i in sorted(chosen))
+    else:
+        # Even the best sentence alone is over budget: cut it structure-aware.
+        condensed = truncate_markdown(text, max(budget - sources_cost(""), 1)).text
+    return _keep_urls(text, condensed)
+
+
+async def _rewrite(
+    text: str,
+    budget: int,
+    query: str,
+    path: str,
+    deps: ResearchContext,
+    usage: RunUsage,
+) -> str:
+    """Condense one field with the distiller agent, falling back to `extract`."""
+    from app.agents.distiller import distiller_agent
+
+    try:
+        result = await distiller_agent.run(
+            f"RESEARCH QUESTION: {query}\nFIELD: {path}\nTOKEN BUDGET: {budget}\n\nTEXT:\n{text}",
+            deps=deps,
+        )
+        usage.incr(result.usage())
+        condensed = _keep_urls(text, result.output.strip())
+        if condensed and estimate_tokens(condensed) <= budget * _LLM_SLACK:
+            return condensed
+        reason = "rewrite over budget"
+    except Exception as e:
+        reason = str(e)
+    logger.info("Distiller fell back to extractive for %s: %s", path, reason)
+    return extract(text, budget, query)
+
+
+def _long_fields(value: Any, budget: int, path: str = "") -> list[tuple[str, Any, Any]]:
+    """(path, container, key) of every string leaf over `budget` tokens."""
+    found: list[tuple[str, Any, Any]] = []
+    items = value.items() if isinstance(value, dict) else enumerate(value) if isinstance(value, list) else ()
+    for key, item in items:
+        child = f"{path}[{key}]" if isinstance(key, int) else f"{path}.{key}" if path else key
+        if isinstance(item, str):
+            if estimate_tokens(item) > budget:
+                found.append((child, value, key))
+        else:
+            found += _long_fields(item, budget, child)
+    return found
+
+
+async def distill_findings(
+    findings: ModelT | None,
+    stage: str,
+    query: str,
+    deps: ResearchContext,
+    usage: RunUsage | None = None,
+) -> ModelT | None:
+    """A copy of `findings` with oversized string fields condensed (see module docstring).
+
+    Returns `findings` itself when distillation is off or nothing is over
+    budget. Never raises: on any failure the original findings are returned.
+
+    Environment variables:
+        FINDINGS_DISTILL: 'off' (default), 'extractive' or 'llm'.
+        FINDINGS_FIELD_BUDGET: Token budget per free-text field (default 300).
+        DISTILL_MODEL: Model for 'llm' mode (default LLM_MODEL).
+    """
+    mode = distill_mode()
+    if findings is None or mode == "off":
+        return findings
+    budget = field_budget()
+    usage = usage if usage is not None else RunUsage()
+    try:
+        data = findings.model_dump()
+        fields = _long_fields(data, budget)
+        if not fields:
+            return findings
+        before = {path: estimate_tokens(container[key]) for path, container, key in fields}
+        if mode == "llm":
+            condensed = await asyncio.gather(
+                *(_rewrite(container[key], budget, query, path, deps, usage) for path, container, key in fields)
+            )
+        else:
+            condensed = [extract(container[key], budget, query) for _, container, key in fields]
+        for (_, container, key), text in zip(fields, condensed):
+            container[key] = text
+        distilled = type(findings).model_validate(data)
+    except Exception as e:
+        await deps.add_event("agent_limit", "Distiller", f"Distilling {stage} findings failed: {e}")
+        return findings
+
+    total_before, total_after = estimate_tokens(format_findings(findings)), estimate_tokens(format_findings(distilled))
+    await deps.add_event(
+        "info",
+        "Distiller",
+        f"Distilled {len(fields)} {stage} field(s): {total_before} → {total_after} tokens",
+        details={
+            "stage": stage,
+            "mode": mode,
+            "before_tokens": total_before,
+            "after_tokens": total_after,
+            "fields": {
+                path: {"before_tokens": before[path], "after_tokens": estimate_tokens(text)}
+                for (path, _, _), text in zip(fields, condensed)
+            },
+        },
+    )
+    return distilled
+
+
+async def distill_stage(
+    deps: ResearchContext,
+    query: str,
+    research: BaseModel | None,
+    analyst: BaseModel | None,
+    usage: RunUsage | None = None,
+) -> tuple[BaseModel | None, BaseModel | None]:
+    """Distill both stages' findings concurrently, ahead of the synthesis prompt."""
+    research, analyst = await asyncio.gather(
+        distill_findings(research, "research", query, deps, usage),
+        distill_findings(analyst, "analyst", query, deps, usage),
+    )
+    return research, analyst
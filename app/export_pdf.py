@@ -23,6 +23,7 @@ if sys.platform == "darwin":
 import markdown as md_lib
 from weasyprint import HTML
 
+from app.report_markdown import render_markdown
 from app.schema import MarketReport
 
 # ---------------------------------------------------------------------------
@@ -221,22 +222,7 @@ def report_to_markdown(report: MarketReport) -> str:
     Uses ``markdown_content`` if populated; otherwise assembles it from the
     structured fields so the output is always usable.
     """
-    if report.markdown_content:
-        return report.markdown_content
-
-    parts: list[str] = [f"# {report.title}\n"]
-    parts.append(f"\n{report.executive_summary}\n")
-
-    for section in report.sections:
-        parts.append(f"\n## {section.heading}\n")
-        parts.append(f"\n{section.content}\n")
-
-    if report.sources:
-        parts.append("\n## Sources\n")
-        for s in report.sources:
-            parts.append(f"- {s}\n")
-
-    return "\n".join(parts)
+    return report.markdown_content or render_markdown(report)
 
 
 def markdown_to_html(md_text: str, report: MarketReport) -> str:
@@ -0,0 +1,162 @@
+"""Compact serialization of research findings for synthesis prompts.
+
+`model_dump_json(indent=2)` spends a large share of the reporter's prompt on
+indentation, quotes, and fields the agents left null. `format_findings` emits
+the same facts more tightly:
+
+- scalar fields as `key: value` lines, with strings unquoted;
+- lists of models (payer coverage, trials, competitors, ...) as pipe tables
+  holding only the columns that have a value in some row;
+- other nested values as compact JSON;
+- None/empty fields dropped, but named on a closing `not found:` line so the
+  reporter can still list them under Gaps & Data Confidence.
+
+Run `python -m app.findings_format [files...]` to compare prompt tokens of both
+formats on recorded findings — checkpoint files, or the sessions database by
+default.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel
+
+from app.tools.shaping import estimate_tokens
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+def _prune(value: Any) -> Any:
+    """Drop None/empty entries from nested dicts and lists."""
+    if isinstance(value, dict):
+        pruned = {k: _prune(v) for k, v in value.items()}
+        return {k: v for k, v in pruned.items() if not _is_empty(v)}
+    if isinstance(value, list):
+        return [p for p in (_prune(v) for v in value) if not _is_empty(p)]
+    return value
+
+
+def _compact(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+    return str(value)
+
+
+def _cell(value: Any) -> str:
+    if _is_empty(value):
+        return ""
+    if isinstance(value, list) and all(not isinstance(v, (dict, list)) for v in value):
+        text = "; ".join(_compact(v) for v in value)
+    else:
+        text = _compact(value)
+    return text.replace("|", "\\|").replace("\n", " ").strip()
+
+
+def _table(rows: list[dict[str, Any]]) -> list[str]:
+    columns = list(dict.fromkeys(key for row in rows for key, value in row.items() if not _is_empty(value)))
+    lines = ["|" + "|".join(columns) + "|"]
+    lines += ["|" + "|".join(_cell(row.get(col)) for col in columns) + "|" for row in rows]
+    return lines
+
+
+def format_data(data: dict[str, Any]) -> str:
+    """Compact text for one findings object already dumped to JSON-mode data."""
+    lines: list[str] = []
+    missing: list[str] = []
+    for key, value in data.items():
+        value = _prune(value)
+        if _is_empty(value):
+            missing.append(key)
+        elif isinstance(value, list) and all(isinstance(v, dict) for v in value):
+            lines.append(f"{key}:")
+            lines += _table(value)
+        elif isinstance(value, list):
+            lines.append(f"{key}: {_cell(value)}")
+        else:
+            lines.append(f"{key}: {_compact(value)}")
+    if missing:
+        lines.append("not found: " + ", ".join(missing))
+    return "\n".join(lines)
+
+
+def format_findings(findings: BaseModel | None) -> str:
+    """Serialize stage findings for a synthesis prompt ('Not available' for None)."""
+    if findings is None:
+        return "Not available"
+    return format_data(findings.model_dump(mode="json"))
+
+
+# ---------------------------------------------------------------------------
+# Benchmark: prompt tokens of indented JSON vs the compact format
+# ---------------------------------------------------------------------------
+
+
+def compare(findings: BaseModel) -> tuple[int, int]:
+    """(tokens as indented JSON, tokens as compact text) for one findings object."""
+    return estimate_tokens(findings.model_dump_json(indent=2)), estimate_tokens(format_findings(findings))
+
+
+def _from_checkpoint(path: Path) -> list[tuple[str, BaseModel]]:
+    from app.history import load_checkpoint
+
+    checkpoint = load_checkpoint(path)
+    return [
+        (f"{path.name}:{name}", findings)
+        for name, findings in (("research", checkpoint.research_findings), ("analyst", checkpoint.analyst_findings))
+        if findings is not None
+    ]
+
+
+async def _from_database() -> list[tuple[str, BaseModel]]:
+    import aiosqlite
+
+    from api.database import DB_PATH
+    from app.schema import AnalystFindings, MarketAccessFindings
+
+    if not DB_PATH.exists():
+        return []
+    records: list[tuple[str, BaseModel]] = []
+    async with aiosqlite.connect(DB_PATH) as db:
+        async with db.execute(
+            "SELECT session_id, research_json, analyst_json FROM sessions "
+            "WHERE research_json IS NOT NULL OR analyst_json IS NOT NULL"
+        ) as cursor:
+            async for session_id, research_json, analyst_json in cursor:
+                if research_json:
+                    records.append((f"{session_id}:research", MarketAccessFindings.model_validate_json(research_json)))
+                if analyst_json:
+                    records.append((f"{session_id}:analyst", AnalystFindings.model_validate_json(analyst_json)))
+    return records
+
+
+async def _main(argv: list[str]) -> None:
+    records: list[tuple[str, BaseModel]] = []
+    for arg in argv:
+        records += _from_checkpoint(Path(arg))
+    if not argv:
+        records = await _from_database()
+    if not records:
+        print("Usage: python -m app.findings_format [checkpoint.json ...]  (default: all findings in the sessions DB)")
+        return
+    total_before = total_after = 0
+    for name, findings in records:
+        before, after = compare(findings)
+        total_before += before
+        total_after += after
+        print(f"{name:<50} {before:>7} → {after:>7} tokens ({1 - after / max(before, 1):.0%} saved)")
+    print(f"{'total':<50} {total_before:>7} → {total_after:>7} tokens ({1 - total_after / max(total_before, 1):.0%} saved)")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main(sys.argv[1:]))
@@ -57,6 +57,10 @@ class CheckpointSession(BaseModel):
     failure_reason: str | None = Field(
         default=None, description="Exception message or 'KeyboardInterrupt'"
     )
+    stage_history: dict[str, list[Any]] = Field(
+        default_factory=dict,
+        description="Resume points (serialized messages) of unfinished sub-agent stages",
+    )
 
 
 def _ensure_dir(directory: Path) -> Path:
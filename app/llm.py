@@ -39,10 +39,17 @@ class OllamaChatModel(OpenAIChatModel):
         return result
 
 
-def get_model() -> Any:
+def get_model(model_name: str | None = None, provider: str | None = None) -> Any:
     """
     Return the configured chat model from environment.
 
+    Pass `model_name` to use a different model on the configured provider
+    (e.g. a cheaper model for an auxiliary agent) instead of LLM_MODEL, and
+    `provider` to use a different provider than LLM_PROVIDER.
+
+    The model is wrapped in `RepairingModel` (app.output_repair), which fixes
+    almost-valid structured outputs locally instead of spending a retry.
+
     Environment variables:
         LLM_PROVIDER: One of 'ollama' (default), 'openai'. Future: 'anthropic', 'google'.
         LLM_MODEL: Model name (e.g. qwen3.5:latest, glm4.7-flash for Ollama).
@@ -50,9 +57,16 @@ def get_model() -> Any:
         OPENAI_API_KEY: Required when LLM_PROVIDER=openai.
         ANTHROPIC_API_KEY: Required when LLM_PROVIDER=anthropic (not yet implemented).
         GOOGLE_API_KEY: Required when LLM_PROVIDER=google (not yet implemented).
+        OUTPUT_REPAIR: 'on' (default) or 'off' to leave invalid outputs to pydantic-ai's retries.
     """
-    provider = (os.environ.get("LLM_PROVIDER") or "ollama").strip().lower()
-    model_name = os.environ.get("LLM_MODEL") or "qwen3.5:latest"
+    from app.output_repair import RepairingModel
+
+    return RepairingModel(_provider_model(model_name, provider))
+
+
+def _provider_model(model_name: str | None, provider: str | None) -> Any:
+    provider = (provider or os.environ.get("LLM_PROVIDER") or "ollama").strip().lower()
+    model_name = model_name or os.environ.get("LLM_MODEL") or "qwen3.5:latest"
 
     if provider == "ollama":
         base_url = os.environ.get("OLLAMA_BASE_URL") or "http://localhost:11434/v1"
@@ -98,6 +112,20 @@ def get_model() -> Any:
     )
 
 
+def get_fallback_model() -> Any | None:
+    """
+    Return the fallback model for a stage's last retry, or None if unset.
+
+    Environment variables:
+        FALLBACK_MODEL: Model name (e.g. a faster or more reliable model than LLM_MODEL).
+        FALLBACK_PROVIDER: Provider of FALLBACK_MODEL (default LLM_PROVIDER).
+    """
+    model_name = os.environ.get("FALLBACK_MODEL")
+    if not model_name:
+        return None
+    return get_model(model_name, os.environ.get("FALLBACK_PROVIDER") or None)
+
+
 def get_retries() -> int:
     """Return the configured agent output validation retry count."""
     return int(os.environ.get("AGENT_RETRIES", "3"))
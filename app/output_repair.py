@@ -0,0 +1,583 @@
+"""Local repair of almost-valid structured output before a retry round trip.
+
+Local models often return nearly valid final-result arguments: trailing
+commas, unquoted keys, single quotes, a code fence, an array cut off at the
+token limit, a nested object serialized as a string, "12.5%" for a number or
+"Coverage / Formulary" for the `coverage/formulary` enum. Each of those used
+to cost a full `ModelRetry` round trip (up to AGENT_RETRIES per stage).
+
+`RepairingModel` wraps the configured model (see `app.llm.get_model`). When a
+response calls an output tool whose schema is one of `REPAIRABLE_OUTPUTS`,
+the arguments are checked against that model locally. Invalid arguments are
+repaired deterministically — first `repair_json` for the syntax, then
+`coerce` driven by pydantic's validation errors — and replaced only if the
+result validates. Otherwise the original arguments are left for pydantic-ai
+to reject and retry as before. A response that answers with the JSON as text
+instead of calling the output tool is converted the same way.
+
+Streamed responses (the streaming reporter) are repaired once the stream
+ends: the partial drafts are shown as the model wrote them, while the final
+response that pydantic-ai validates carries the repaired arguments. JSON
+answered as text is not converted there — the stream has already been
+committed to a text answer.
+
+Outcomes are counted per model (`repair_stats`, shown on /config/health) so
+the repair success rate of each local model can be compared.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import difflib
+import json
+import os
+import re
+from collections import Counter
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+from pydantic import BaseModel, ValidationError
+from pydantic_ai import RunContext
+from pydantic_ai.messages import ModelMessage, ModelResponse, ModelResponseStreamEvent, TextPart, ToolCallPart
+from pydantic_ai.models import ModelRequestParameters, StreamedResponse
+from pydantic_ai.models.wrapper import WrapperModel
+from pydantic_ai.settings import ModelSettings
+
+from app.schema import AnalystFindings, MarketAccessFindings, MarketReport, MarketReportContent, ResearchPlan
+
+# Output schemas (by JSON schema title) that are checked and repaired locally.
+REPAIRABLE_OUTPUTS: dict[str, type[BaseModel]] = {
+    cls.__name__: cls
+    for cls in (MarketAccessFindings, AnalystFindings, MarketReportContent, MarketReport, ResearchPlan)
+}
+
+_FENCE_RE = re.compile(r"```(?:json|JSON)?\s*(.*?)(?:```|$)", re.DOTALL)
+_NUMBER_RE = re.compile(r"-?\d[\d,]*(?:\.\d+)?|-?\.\d+")
+_SCALE_RE = re.compile(r"^\s*(billion|bn|b|million|mn|mm|m|thousand|k)\b", re.IGNORECASE)
+_SCALES = {"b": 1e9, "bn": 1e9, "billion": 1e9, "m": 1e6, "mm": 1e6, "mn": 1e6, "million": 1e6, "k": 1e3, "thousand": 1e3}
+_LITERALS = {"true": "true", "false": "false", "null": "null", "True": "true", "False": "false", "None": "null",
+             "NaN": "null", "Infinity": "null", "-Infinity": "null", "undefined": "null"}
+_DELIMITERS = set(",:{}[]\"'")
+_MAX_COERCE_PASSES = 6
+
+_stats: dict[str, dict[str, Any]] = {}
+
+
+def output_repair_enabled() -> bool:
+    """OUTPUT_REPAIR: 'on' (default) or 'off'."""
+    return os.environ.get("OUTPUT_REPAIR", "on").strip().lower() != "off"
+
+
+# ---------------------------------------------------------------------------
+# Syntax
+# ---------------------------------------------------------------------------
+
+
+class _Scanner:
+    """Re-emits almost-valid JSON as valid JSON, noting each fix."""
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.i = 0
+        self.out: list[str] = []
+        self.stack: list[dict[str, Any]] = []  # {"type": "{"|"[", "expect": ..., "member": index}
+        self.fixes: set[str] = set()
+        self.done = False
+
+    def run(self) -> str:
+        text = self.text
+        while self.i < len(text) and not self.done:
+            ch = text[self.i]
+            if ch.isspace():
+                self.i += 1
+            elif text.startswith("//", self.i) or text.startswith("/*", self.i):
+                end = text.find("\n" if text[self.i + 1] == "/" else "*/", self.i + 2)
+                self.i = len(text) if end < 0 else end + (1 if text[self.i + 1] == "/" else 2)
+                self.fixes.add("comments")
+            elif ch in "{[":
+                self._value_start()
+                self.stack.append({"type": ch, "expect": "key" if ch == "{" else "value", "member": len(self.out)})
+                self.out.append(ch)
+                self.i += 1
+            elif ch in "}]":
+                self._close()
+                self.i += 1
+            elif ch == ",":
+                self._comma()
+                self.i += 1
+            elif ch == ":":
+                if not self.stack or self.stack[-1]["expect"] != "colon":
+                    raise ValueError(f"unexpected ':' at {self.i}")
+                self.out.append(":")
+                self.stack[-1]["expect"] = "value"
+                self.i += 1
+            elif ch in "\"'":
+                self._string(ch)
+            else:
+                self._bare()
+        if not self.done:
+            if not self.stack:
+                raise ValueError("no JSON value")
+            self.fixes.add("truncated")
+            while self.stack:
+                self._close(truncated=True)
+        return "".join(self.out)
+
+    def _value_start(self) -> None:
+        if not self.stack:
+            return
+        top = self.stack[-1]
+        if top["expect"] == "comma":
+            self.out.append(",")
+            self.fixes.add("missing_commas")
+            top["expect"] = "key" if top["type"] == "{" else "value"
+        if top["type"] == "{" and top["expect"] == "key":
+            raise ValueError(f"expected an object key at {self.i}")
+
+    def _value_end(self) -> None:
+        if self.stack:
+            self.stack[-1]["expect"] = "comma"
+        else:
+            self.done = True
+
+    def _key_start(self) -> None:
+        top = self.stack[-1]
+        if top["expect"] == "comma":
+            self.out.append(",")
+            self.fixes.add("missing_commas")
+        top["member"] = len(self.out)
+
+    def _close(self, truncated: bool = False) -> None:
+        if not self.stack:
+            raise ValueError(f"unbalanced close at {self.i}")
+        top = self.stack.pop()
+        if top["type"] == "{" and top["expect"] in ("colon", "value"):
+            # A key without a value (cut off, or never written): drop the member.
+            del self.out[top["member"] :]
+            self.fixes.add("truncated" if truncated else "dangling_keys")
+        if self.out and self.out[-1] == ",":
+            self.out.pop()
+            if not truncated:
+                self.fixes.add("trailing_commas")
+        if not truncated and self.text[self.i] != ("}" if top["type"] == "{" else "]"):
+            self.fixes.add("mismatched_brackets")
+        self.out.append("}" if top["type"] == "{" else "]")
+        self._value_end()
+
+    def _comma(self) -> None:
+        if self.stack and self.stack[-1]["expect"] == "comma":
+            self.out.append(",")
+            top = self.stack[-1]
+            top["expect"] = "key" if top["type"] == "{" else "value"
+        else:
+            self.fixes.add("trailing_commas")  # doubled or leading comma
+
+    def _string(self, quote: str) -> None:
+        text = self.text
+        j = self.i + 1
+        chars: list[str] = []
+        while j < len(text) and text[j] != quote:
+            if text[j] == "\\" and j + 1 < len(text):
+                chars.append(text[j : j + 2])
+                j += 2
+                continue
+            chars.append(text[j])
+            j += 1
+        if j >= len(text):
+            self.fixes.add("truncated")
+        if quote == "'":
+            self.fixes.add("single_quotes")
+        self.i = j + 1
+        value = self._decode(chars, quote)
+        if self.stack and self.stack[-1]["type"] == "{" and self.stack[-1]["expect"] in ("key", "comma"):
+            self._key_start()
+            self.out.append(json.dumps(value))
+            self.stack[-1]["expect"] = "colon"
+            return
+        self._value_start()
+        self.out.append(json.dumps(value))
+        self._value_end()
+
+    def _decode(self, chars: list[str], quote: str) -> str:
+        body = []
+        for c in chars:
+            if c == "\\'":
+                body.append("'")
+            elif c == '"':
+                body.append('\\"')
+            elif len(c) == 1 and ord(c) < 0x20:
+                body.append(json.dumps(c)[1:-1])
+                self.fixes.add("control_characters")
+            else:
+                body.append(c)
+        try:
+            return json.loads('"' + "".join(body) + '"')
+        except json.JSONDecodeError:
+            self.fixes.add("bad_escapes")
+            return "".join(c[-1] if c.startswith("\\") else c for c in chars)
+
+    def _bare(self) -> None:
+        text = self.text
+        in_key = bool(self.stack) and self.stack[-1]["type"] == "{" and self.stack[-1]["expect"] in ("key", "comma")
+        j = self.i
+        stops = ":" if in_key else ",}]\n"
+        while j < len(text) and text[j] not in stops and (text[j] not in _DELIMITERS or text[j] in "'"):
+            j += 1
+        token = text[self.i : j].strip()
+        self.i = j
+        if not token:
+            raise ValueError(f"unexpected character at {j}")
+        if in_key:
+            self._key_start()
+            self.out.append(json.dumps(token))
+            self.stack[-1]["expect"] = "colon"
+            self.fixes.add("unquoted_keys")
+            return
+        self._value_start()
+        if token in _LITERALS:
+            if token != _LITERALS[token]:
+                self.fixes.add("python_literals")
+            self.out.append(_LITERALS[token])
+        else:
+            try:
+                json.loads(token)
+                self.out.append(token)
+            except json.JSONDecodeError:
+                self.out.append(json.dumps(token))
+                self.fixes.add("unquoted_values")
+        self._value_end()
+
+
+def repair_json(text: str) -> tuple[Any, list[str]]:
+    """Parse almost-valid JSON; return (value, fixes applied). Raises ValueError if it cannot."""
+    try:
+        return json.loads(text), []
+    except json.JSONDecodeError:
+        pass
+    fixes: list[str] = []
+    fence = _FENCE_RE.search(text)
+    if fence:
+        text = fence.group(1)
+        fixes.append("code_fence")
+    start = min((i for i in (text.find("{"), text.find("[")) if i >= 0), default=-1)
+    if start < 0:
+        raise ValueError("no JSON object found")
+    if text[:start].strip():
+        fixes.append("surrounding_text")
+    scanner = _Scanner(text[start:])
+    repaired = scanner.run()
+    if text[start + scanner.i :].strip():
+        fixes.append("surrounding_text")
+    return json.loads(repaired), sorted(set(fixes) | scanner.fixes)
+
+
+# ---------------------------------------------------------------------------
+# Schema coercion
+# ---------------------------------------------------------------------------
+
+
+def _number(text: str) -> float | None:
+    match = _NUMBER_RE.search(text)
+    if not match:
+        return None
+    value = float(match.group().replace(",", ""))
+    scale = _SCALE_RE.match(text[match.end() :])
+    return value * _SCALES[scale.group(1).lower()] if scale else value
+
+
+def _closest(value: str, expected: list[str]) -> str | None:
+    def norm(s: str) -> str:
+        return re.sub(r"[^a-z0-9]", "", s.lower())
+
+    by_norm = {norm(e): e for e in expected}
+    if norm(value) in by_norm:
+        return by_norm[norm(value)]
+    prefixed = [e for e in expected if norm(value) and norm(e).startswith(norm(value))]
+    if len(prefixed) == 1:
+        return prefixed[0]
+    match = difflib.get_close_matches(norm(value), list(by_norm), n=1, cutoff=0.6)
+    return by_norm[match[0]] if match else None
+
+
+def _locate(data: Any, loc: tuple[Any, ...]) -> tuple[Any, Any] | None:
+    """(container, key) of the value at `loc`, ignoring union-branch tags pydantic appends."""
+    parent, key, node = None, None, data
+    for step in loc:
+        if isinstance(node, dict) and step in node:
+            parent, key, node = node, step, node[step]
+        elif isinstance(node, list) and isinstance(step, int) and 0 <= step < len(node):
+            parent, key, node = node, step, node[step]
+        else:
+            break
+    return (parent, key) if parent is not None else None
+
+
+def _fix(data: Any, error: dict[str, Any]) -> str | None:
+    """Apply one deterministic fix for a validation error in place; return its name."""
+    where = _locate(data, tuple(error["loc"]))
+    if where is None:
+        return None
+    parent, key = where
+    value = parent[key]
+    kind = error["type"]
+
+    def drop() -> str | None:
+        if isinstance(parent, dict):
+            del parent[key]
+            return "null_to_default"
+        return None
+
+    if kind in ("literal_error", "enum") and isinstance(value, str):
+        expected = re.findall(r"'([^']*)'", str(error.get("ctx", {}).get("expected", "")))
+        match = _closest(value, expected)
+        if match is not None and match != value:
+            parent[key] = match
+            return "enum_values"
+        return None
+    if value is None:
+        return drop()
+    if kind == "list_type":
+        if isinstance(value, str) and value.strip().startswith("["):
+            try:
+                parent[key] = repair_json(value)[0]
+                return "stringified_json"
+            except ValueError:
+                pass
+        parent[key] = [value]
+        return "scalar_to_list"
+    if kind in ("model_type", "dict_type", "model_attributes_type"):
+        if isinstance(value, str):
+            try:
+                parsed = repair_json(value)[0]
+            except ValueError:
+                return None
+            parent[key] = parsed
+            return "stringified_json"
+        if isinstance(value, list) and len(value) == 1 and isinstance(value[0], dict):
+            parent[key] = value[0]
+            return "list_to_object"
+        return None
+    if kind == "string_type":
+        if isinstance(value, list):
+            parent[key] = "; ".join(v if isinstance(v, str) else json.dumps(v) for v in value)
+        elif isinstance(value, dict):
+            parent[key] = json.dumps(value)
+        else:
+            parent[key] = str(value).lower() if isinstance(value, bool) else str(value)
+        return "to_string"
+    if kind in ("float_parsing", "int_parsing", "float_type", "int_type", "int_from_float") and not isinstance(value, bool):
+        number = _number(value) if isinstance(value, str) else None
+        if number is None:
+            return drop()
+        parent[key] = round(number) if kind.startswith("int") else number
+        return "numbers"
+    return None
+
+
+def coerce(data: Any, model: type[BaseModel]) -> tuple[Any, list[str], bool]:
+    """Coerce parsed output towards `model`; return (data, fixes applied, valid)."""
+    fixes: list[str] = []
+    if isinstance(data, list) and len(data) == 1 and isinstance(data[0], dict):
+        data = data[0]
+        fixes.append("list_to_object")
+    if isinstance(data, dict) and len(data) == 1:
+        (key, inner), = data.items()
+        if key not in model.model_fields and isinstance(inner, dict):
+            data = inner
+            fixes.append("unwrapped")
+    for _ in range(_MAX_COERCE_PASSES):
+        try:
+            model.model_validate(data)
+            return data, fixes, True
+        except ValidationError as e:
+            errors = e.errors(include_url=False)
+        applied, seen = [], set()
+        for error in errors:
+            # A union field reports one error per branch; fix the value once per pass.
+            where = _locate(data, tuple(error["loc"]))
+            if where is None or (id(where[0]), where[1]) in seen:
+                continue
+            seen.add((id(where[0]), where[1]))
+            fix = _fix(data, error)
+            if fix:
+                applied.append(fix)
+        if not applied:
+            return data, fixes, False
+        fixes.extend(applied)
+    try:
+        model.model_validate(data)
+        return data, fixes, True
+    except ValidationError:
+        return data, fixes, False
+
+
+def repair_args(args: str | dict[str, Any] | None, model: type[BaseModel]) -> tuple[str, dict[str, Any] | None, list[str]]:
+    """Check output-tool `args` against `model`; return (outcome, repaired args or None, fixes).
+
+    `outcome` is 'valid' (unchanged), 'repaired' (use the returned args) or 'failed'.
+    """
+    fixes: list[str] = []
+    if isinstance(args, dict):
+        data: Any = args
+    else:
+        try:
+            data, fixes = repair_json(args or "{}")
+        except ValueError:
+            return "failed", None, fixes
+    if not fixes:
+        try:
+            model.model_validate(data)
+            return "valid", None, []
+        except ValidationError:
+            pass
+    data = json.loads(json.dumps(data))  # never mutate the caller's dict
+    data, coerced, valid = coerce(data, model)
+    fixes = sorted(set(fixes + coerced))
+    return ("repaired", data, fixes) if valid else ("failed", None, fixes)
+
+
+# ---------------------------------------------------------------------------
+# Model wrapper and stats
+# ---------------------------------------------------------------------------
+
+
+def _record(model_name: str, outcome: str, fixes: list[str]) -> None:
+    stats = _stats.setdefault(model_name, {"outputs": 0, "valid": 0, "repaired": 0, "failed": 0, "fixes": Counter()})
+    stats["outputs"] += 1
+    stats[outcome] += 1
+    stats["fixes"].update(fixes)
+
+
+def repair_stats() -> dict[str, dict[str, Any]]:
+    """Per model: final outputs checked, valid / repaired / failed counts, fixes used, repair success rate."""
+    return {
+        name: {
+            **{k: v for k, v in stats.items() if k != "fixes"},
+            "fixes": dict(stats["fixes"]),
+            "repair_success_rate": (
+                round(stats["repaired"] / (stats["repaired"] + stats["failed"]), 3)
+                if stats["repaired"] + stats["failed"]
+                else None
+            ),
+        }
+        for name, stats in _stats.items()
+    }
+
+
+def reset_repair_stats() -> None:
+    _stats.clear()
+
+
+def repair_response(
+    response: ModelResponse,
+    params: ModelRequestParameters,
+    model_name: str,
+    text_to_tool_call: bool = True,
+) -> ModelResponse:
+    """`response` with repairable output-tool arguments (or JSON answered as text) repaired."""
+    outputs = {
+        tool.name: REPAIRABLE_OUTPUTS[title]
+        for tool in params.output_tools
+        if (title := tool.parameters_json_schema.get("title")) in REPAIRABLE_OUTPUTS
+    }
+    if not outputs:
+        return response
+
+    parts = list(response.parts)
+    changed = False
+    calls = [i for i, p in enumerate(parts) if isinstance(p, ToolCallPart)]
+    for i in calls:
+        part = parts[i]
+        if part.tool_name not in outputs:
+            continue
+        outcome, args, fixes = repair_args(part.args, outputs[part.tool_name])
+        _record(model_name, outcome, fixes)
+        if outcome == "repaired":
+            parts[i] = dataclasses.replace(part, args=args)
+            changed = True
+
+    if text_to_tool_call and not calls and len(outputs) == 1:
+        text = "".join(p.content for p in parts if isinstance(p, TextPart)).strip()
+        if text and ("{" in text or "[" in text):
+            ((tool_name, model),) = outputs.items()
+            outcome, args, fixes = repair_args(text, model)
+            if outcome == "valid":
+                if params.allow_text_output:  # pydantic-ai parses valid text output itself
+                    _record(model_name, outcome, fixes)
+                    return response
+                outcome, args = "repaired", json.loads(text)
+            if outcome == "repaired" and not (isinstance(args, dict) and set(args) & set(model.model_fields)):
+                return response  # prose that merely contains braces, not an answer
+            _record(model_name, outcome, sorted(set(fixes) | {"text_to_tool_call"}))
+            if outcome == "repaired":
+                parts = [p for p in parts if not isinstance(p, TextPart)] + [ToolCallPart(tool_name, args)]
+                changed = True
+
+    return dataclasses.replace(response, parts=parts) if changed else response
+
+
+class RepairingModel(WrapperModel):
+    """Wraps a model so near-miss structured outputs are repaired locally (see module docstring)."""
+
+    async def request(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+    ) -> ModelResponse:
+        response = await super().request(messages, model_settings, model_request_parameters)
+        if not output_repair_enabled():
+            return response
+        return repair_response(response, model_request_parameters, self.model_name)
+
+    @asynccontextmanager
+    async def request_stream(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+        run_context: RunContext[Any] | None = None,
+    ) -> AsyncIterator[StreamedResponse]:
+        async with super().request_stream(
+            messages, model_settings, model_request_parameters, run_context
+        ) as stream:
+            if not output_repair_enabled():
+                yield stream
+            else:
+                yield _RepairingStream(stream, self.model_name)  # type: ignore[misc]
+
+
+class _RepairingStream:
+    """Proxy of a StreamedResponse whose final `get()` is repaired.
+
+    Until the event stream is exhausted `get()` returns the raw partial
+    response, so drafts stream unchanged and nothing is counted; afterwards
+    it returns the repaired response, built once.
+    """
+
+    def __init__(self, stream: StreamedResponse, model_name: str) -> None:
+        self._stream = stream
+        self._model_name = model_name
+        self._finished = False
+        self._repaired: ModelResponse | None = None
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._stream, name)
+
+    def __aiter__(self) -> AsyncIterator[ModelResponseStreamEvent]:
+        return self._events()
+
+    async def _events(self) -> AsyncIterator[ModelResponseStreamEvent]:
+        async for event in self._stream:
+            yield event
+        self._finished = True
+
+    def get(self) -> ModelResponse:
+        if not self._finished:
+            return self._stream.get()
+        if self._repaired is None:
+            self._repaired = repair_response(
+                self._stream.get(), self._stream.model_request_parameters, self._model_name, text_to_tool_call=False
+            )
+        return self._repaired
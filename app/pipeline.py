@@ -0,0 +1,198 @@
+"""Deterministic pipeline engine: the research stages as a code-defined DAG.
+
+The lead agent spends several full-context LLM round trips deciding to call
+the researcher, analyst and reporter in an order that never changes, then
+re-types both findings into the synthesis prompt. `run_pipeline` does that
+work in code instead:
+
+    plan ──┬── research ──┬── distill ── report
+           └── analyst  ──┘
+
+- plan: the planner agent classifies the question (one small request, no
+  tools) and the run's stage budgets are re-allocated for its archetype
+  (`app.budget`). With `planner=False`, or if planning fails, the default
+  `ResearchPlan` is used;
+- research / analyst: the same stage functions the lead's tools call, run
+  concurrently as soon as the plan is ready;
+- distill: oversized free-text fields condensed (`app.distill`; a no-op
+  unless FINDINGS_DISTILL is set);
+- report: `_SYNTHESIS_PROMPT` filled from the plan and both findings, then
+  the reporter stage.
+
+Selected per run with `RunRequest.engine = "pipeline"`; the lead agent stays
+the default engine.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+from pydantic import BaseModel
+from pydantic_ai import UsageLimits
+from pydantic_ai.usage import RunUsage
+
+from app.agents.lead import (
+    _AGENT_TIMEOUT,
+    analyst_stage,
+    market_access_stage,
+    reporter_stage,
+    run_stages_concurrently,
+)
+from app.agents.planner import planner_agent
+from app.budget import apply_budget
+from app.cli_resume import _SYNTHESIS_PROMPT
+from app.context import ResearchContext
+from app.distill import distill_stage
+from app.findings_format import format_findings
+from app.retry import stage_retry_policy
+from app.schema import MarketReport, ResearchPlan
+
+
+@dataclass
+class Stage:
+    """One DAG node; `run` receives the results of the stages named in `after`."""
+
+    name: str
+    run: Callable[[dict[str, Any]], Awaitable[Any]]
+    after: tuple[str, ...] = ()
+
+
+async def run_dag(stages: list[Stage]) -> dict[str, Any]:
+    """Run each stage as soon as every stage it depends on has finished.
+
+    Stages must be listed after their dependencies. Cancellation is shared as
+    in `run_stages_concurrently`: if any stage raises, or the caller is
+    cancelled, every unfinished stage is cancelled before the error propagates.
+
+    Returns:
+        Stage name → that stage's result.
+
+    Raises:
+        ValueError: A stage name repeats, or a dependency is not listed before it.
+    """
+    seen: set[str] = set()
+    for stage in stages:
+        if stage.name in seen:
+            raise ValueError(f"Duplicate pipeline stage: {stage.name}")
+        unknown = [dep for dep in stage.after if dep not in seen]
+        if unknown:
+            raise ValueError(f"Stage {stage.name} depends on unknown or later stages: {unknown}")
+        seen.add(stage.name)
+
+    tasks: dict[str, asyncio.Future[Any]] = {}
+
+    async def execute(stage: Stage) -> Any:
+        inputs = {dep: await tasks[dep] for dep in stage.after}
+        return await stage.run(inputs)
+
+    for stage in stages:
+        tasks[stage.name] = asyncio.ensure_future(execute(stage))
+    results = await run_stages_concurrently(*tasks.values())
+    return dict(zip(tasks, results))
+
+
+async def plan_stage(deps: ResearchContext, query: str, usage: RunUsage) -> ResearchPlan:
+    """Classify the question with the planner agent and re-allocate the run's budgets.
+
+    UnexpectedModelBehavior is retried under the stage retry policy. Never
+    raises for model failures: the run continues on the default plan and the
+    locally allocated budgets.
+    """
+    await deps.add_event("agent_start", "Planner", "Planning research")
+
+    async def attempt(model: Any) -> Any:
+        return await asyncio.wait_for(
+            planner_agent.run(
+                query,
+                deps=deps,
+                model=model,
+                usage=usage,
+                usage_limits=UsageLimits(request_limit=3, tool_calls_limit=0),
+            ),
+            timeout=_AGENT_TIMEOUT,
+        )
+
+    try:
+        result = await stage_retry_policy().run(deps, "Planner", attempt)
+    except Exception as e:
+        await deps.add_event("agent_limit", "Planner", f"Planning failed, using the default plan: {e}")
+        return ResearchPlan()
+    plan = result.output
+    await deps.add_event(
+        "agent_end",
+        "Planner",
+        f"Planned a {plan.question_archetype} question",
+        details=plan.model_dump(),
+    )
+    await apply_budget(deps, query, plan)
+    return plan
+
+
+def briefing(query: str, plan: ResearchPlan) -> str:
+    """The structured sub-agent briefing the lead agent is instructed to write."""
+    return (
+        f"QUESTION: {query}\n"
+        f"QUESTION TYPE: {plan.question_archetype}\n"
+        f"KEY PRODUCT/DRUG CLASS: {plan.key_product or 'not specified'}\n"
+        f"PRIMARY DIMENSIONS: {', '.join(plan.primary_dimensions)}"
+    )
+
+
+def synthesis_prompt(
+    query: str,
+    plan: ResearchPlan,
+    research: BaseModel | None,
+    analyst: BaseModel | None,
+) -> str:
+    """Fill `_SYNTHESIS_PROMPT` from the plan and both stages' findings."""
+    return _SYNTHESIS_PROMPT.format(
+        query=query,
+        question_archetype=plan.question_archetype,
+        primary_dimensions=", ".join(plan.primary_dimensions),
+        research=format_findings(research),
+        analyst=format_findings(analyst),
+    )
+
+
+async def run_pipeline(
+    query: str,
+    deps: ResearchContext,
+    planner: bool = True,
+) -> tuple[MarketReport, RunUsage]:
+    """Run plan → (research ∥ analyst) → distill → report without the lead agent.
+
+    Returns the report and the usage summed across every stage.
+    """
+    usage = RunUsage()
+    if deps.budget is None:
+        await apply_budget(deps, query)
+
+    async def plan(_: dict[str, Any]) -> ResearchPlan:
+        return await plan_stage(deps, query, usage) if planner else ResearchPlan()
+
+    async def research(done: dict[str, Any]) -> Any:
+        return await market_access_stage(deps, briefing(query, done["plan"]), usage)
+
+    async def analyst(done: dict[str, Any]) -> Any:
+        return await analyst_stage(deps, briefing(query, done["plan"]), usage)
+
+    async def distill(done: dict[str, Any]) -> tuple[Any, Any]:
+        return await distill_stage(deps, query, done["research"], done["analyst"], usage)
+
+    async def report(done: dict[str, Any]) -> MarketReport:
+        prompt = synthesis_prompt(query, done["plan"], *done["distill"])
+        return await reporter_stage(deps, prompt, usage)
+
+    results = await run_dag(
+        [
+            Stage("plan", plan),
+            Stage("research", research, after=("plan",)),
+            Stage("analyst", analyst, after=("plan",)),
+            Stage("distill", distill, after=("research", "analyst")),
+            Stage("report", report, after=("plan", "distill")),
+        ]
+    )
+    return results["report"], usage
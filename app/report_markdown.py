@@ -0,0 +1,83 @@
+"""Render a report's Markdown locally from its structured fields.
+
+Asking the reporter model for `markdown_content` makes it write the whole
+report a second time after it has already filled the structured fields.
+`render_markdown` builds the same document in code instead: title,
+executive summary, sections, then Country Mix and Scenario Probabilities
+tables when present, then a numbered sources list (matching the reporter's
+1-based `[N]` citation markers).
+"""
+
+from __future__ import annotations
+
+from app.schema import CountryMixEntry, MarketReportContent, ScenarioEntry
+
+_MISSING = "—"
+
+
+def _cell(value: object) -> str:
+    """One Markdown table cell: pipes escaped, newlines folded, None shown as a dash."""
+    if value is None or value == "":
+        return _MISSING
+    if isinstance(value, float):
+        return f"{value:g}"
+    return str(value).replace("|", "\\|").replace("\n", " ").strip()
+
+
+def _pct(value: float | None) -> str:
+    return _MISSING if value is None else f"{value:g}%"
+
+
+def _table(header: list[str], rows: list[list[str]]) -> str:
+    lines = ["| " + " | ".join(header) + " |", "|" + "|".join("---" for _ in header) + "|"]
+    lines += ["| " + " | ".join(row) + " |" for row in rows]
+    return "\n".join(lines)
+
+
+def country_mix_table(entries: list[CountryMixEntry]) -> str:
+    """Markdown table of the country mix, one row per country."""
+    return _table(
+        ["Country", "Share 2024", "Share 2030", "Spend 2024", "Spend 2030", "Notes"],
+        [
+            [
+                _cell(e.country),
+                _pct(e.share_2024),
+                _pct(e.share_2030),
+                _cell(e.spend_2024),
+                _cell(e.spend_2030),
+                _cell(e.notes),
+            ]
+            for e in entries
+        ],
+    )
+
+
+def scenario_table(entries: list[ScenarioEntry]) -> str:
+    """Markdown table of the scenario probabilities, one row per scenario."""
+    return _table(
+        ["Scenario", "Probability", "Description", "Impact"],
+        [[_cell(e.scenario), _pct(e.probability_pct), _cell(e.description), _cell(e.impact)] for e in entries],
+    )
+
+
+def render_markdown(report: MarketReportContent, appendices: bool = True) -> str:
+    """The full report as Markdown.
+
+    With `appendices=False` only the title, executive summary and sections are
+    rendered — the fields the model writes first, which is what the streamed
+    draft shows. Blocks are joined so the rendering of a growing partial report
+    only ever grows by appending.
+    """
+    blocks = [f"# {report.title}"] if report.title else []
+    if report.executive_summary:
+        blocks.append(report.executive_summary)
+    for section in report.sections:
+        blocks.append(f"## {section.heading}" + (f"\n\n{section.content}" if section.content else ""))
+    if appendices:
+        if report.country_mix:
+            blocks.append("## Country Mix\n\n" + country_mix_table(report.country_mix))
+        if report.scenario_probabilities:
+            blocks.append("## Scenario Probabilities\n\n" + scenario_table(report.scenario_probabilities))
+        if report.sources:
+            blocks.append("## Sources\n\n" + "\n".join(f"{i}. {url}" for i, url in enumerate(report.sources, 1)))
+    return "\n\n".join(blocks)
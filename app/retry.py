@@ -0,0 +1,128 @@
+"""Retry policy shared by the agent stages.
+
+A stage whose sub-agent run ends in `UnexpectedModelBehavior` (output
+validation retries exhausted, malformed tool calls) used to re-run at once,
+on the same model. `RetryPolicy.run` retries it instead with:
+
+- exponential backoff with full jitter between attempts (the same scheme as
+  `app.tools.rate_limit`), so a struggling local model gets a moment to
+  recover and concurrent stages do not retry in lockstep;
+- an overall time budget: a retry is only started if the stage's attempts
+  and the backoff before it fit in STAGE_RETRY_BUDGET seconds;
+- an optional fallback model (FALLBACK_MODEL, see `app.llm.get_fallback_model`)
+  for the last attempt.
+
+Timeouts, usage limits and other errors are not retried; they propagate to
+the stage, which maps them to its degraded output as before. Every failed
+attempt that is retried is recorded as an `info` event from the stage with
+its latency and error; the outcome of the final attempt is available in
+`RetryPolicy.attempts` for the stage's own end or limit event.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+from pydantic_ai.exceptions import UnexpectedModelBehavior
+
+T = TypeVar("T")
+
+
+@dataclass
+class RetryPolicy:
+    """How a stage retries `UnexpectedModelBehavior`, and the log of its last run."""
+
+    retries: int = 2
+    backoff_base: float = 1.0
+    backoff_max: float = 20.0
+    budget: float | None = 300.0
+    fallback_model: str | None = None
+    attempts: list[dict[str, Any]] = field(default_factory=list)
+
+    def delay(self, attempt: int) -> float:
+        """Full-jitter backoff (seconds) before retrying after failed `attempt` (0-based)."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2**attempt)))
+
+    def model_for(self, attempt: int) -> Any | None:
+        """Model override for `attempt`: the fallback model on the last retry, else None."""
+        if self.fallback_model and self.retries > 0 and attempt == self.retries:
+            from app.llm import get_fallback_model
+
+            return get_fallback_model()
+        return None
+
+    async def run(
+        self,
+        deps: Any,
+        source: str,
+        attempt: Callable[[Any | None], Awaitable[T]],
+        retry_on: tuple[type[BaseException], ...] = (UnexpectedModelBehavior,),
+    ) -> T:
+        """Await `attempt(model)` until it succeeds, retrying `retry_on` errors.
+
+        `model` is None (the agent's own model) or the fallback model. The
+        last error is raised once retries or the time budget run out.
+        """
+        self.attempts = []
+        started = time.monotonic()
+        for n in range(self.retries + 1):
+            model = self.model_for(n)
+            record: dict[str, Any] = {
+                "attempt": n + 1,
+                "model": f"fallback:{self.fallback_model}" if model is not None else "primary",
+            }
+            self.attempts.append(record)
+            attempt_started = time.monotonic()
+            try:
+                result = await attempt(model)
+            except Exception as e:
+                record["latency_s"] = round(time.monotonic() - attempt_started, 3)
+                record["outcome"] = type(e).__name__
+                record["error"] = str(e)
+                if not isinstance(e, retry_on) or n == self.retries:
+                    raise
+                delay = self.delay(n)
+                if self.budget is not None and time.monotonic() - started + delay >= self.budget:
+                    record["budget_exhausted"] = True
+                    raise
+                record["retry_delay_s"] = round(delay, 3)
+                await deps.add_event(
+                    "info",
+                    source,
+                    f"Retry {n + 1}/{self.retries} in {delay:.1f}s "
+                    f"(attempt took {record['latency_s']:.1f}s): {e}",
+                    details=dict(record),
+                )
+                await asyncio.sleep(delay)
+                continue
+            record["latency_s"] = round(time.monotonic() - attempt_started, 3)
+            record["outcome"] = "ok"
+            return result
+        raise AssertionError("unreachable: the last attempt returns or raises")
+
+
+def stage_retry_policy() -> RetryPolicy:
+    """The retry policy for one stage run, from the environment.
+
+    Environment variables:
+        STAGE_RETRIES: Additional attempts on UnexpectedModelBehavior (default 2).
+        STAGE_RETRY_BACKOFF_BASE: Backoff base in seconds (default 1.0).
+        STAGE_RETRY_BACKOFF_MAX: Backoff cap in seconds (default 20).
+        STAGE_RETRY_BUDGET: Seconds a stage may spend on attempts and backoff before
+            it stops retrying (default 300; 0 for no budget).
+        FALLBACK_MODEL: Model for the last attempt (default unset: same model).
+    """
+    budget = float(os.environ.get("STAGE_RETRY_BUDGET", "300"))
+    return RetryPolicy(
+        retries=max(0, int(os.environ.get("STAGE_RETRIES", "2"))),
+        backoff_base=float(os.environ.get("STAGE_RETRY_BACKOFF_BASE", "1.0")),
+        backoff_max=float(os.environ.get("STAGE_RETRY_BACKOFF_MAX", "20")),
+        budget=budget or None,
+        fallback_model=os.environ.get("FALLBACK_MODEL") or None,
+    )
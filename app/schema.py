@@ -262,8 +262,8 @@ class ScenarioEntry(BaseModel):
     )
 
 
-class MarketReport(BaseModel):
-    """Top-level publication-ready market report."""
+class MarketReportContent(BaseModel):
+    """The structured fields of a MarketReport — everything but its Markdown rendering."""
 
     title: str = Field(description="Report title")
     executive_summary: str = Field(description="Executive summary")
@@ -272,10 +272,6 @@ class MarketReport(BaseModel):
         description="Report sections (e.g. Market Access, Market Size, Competitive Landscape)",
     )
     sources: list[str] = Field(default_factory=list, description="Cited sources or URLs")
-    markdown_content: str | None = Field(
-        default=None,
-        description="Full report as a single Markdown string (optional)",
-    )
     country_mix: list[CountryMixEntry] | None = Field(
         default=None,
         description=(
@@ -291,3 +287,33 @@ class MarketReport(BaseModel):
             "present in the provided findings; leave as null if absent. Backward-compatible."
         ),
     )
+
+
+class MarketReport(MarketReportContent):
+    """Top-level publication-ready market report."""
+
+    markdown_content: str | None = Field(
+        default=None,
+        description="Full report as a single Markdown string (optional)",
+    )
+
+
+class ResearchPlan(BaseModel):
+    """Planner output used by the deterministic pipeline engine to brief each stage."""
+
+    question_archetype: Literal[
+        "coverage/formulary",
+        "volume/prescribing",
+        "care-delivery",
+        "regulatory/pipeline",
+        "market-sizing/competitive",
+        "multi-dimensional",
+    ] = Field(default="multi-dimensional", description="Question type; selects the report section structure")
+    key_product: str | None = Field(
+        default=None,
+        description="Primary product(s) or drug class the question is about",
+    )
+    primary_dimensions: list[str] = Field(
+        default_factory=lambda: ["market access", "payer coverage", "market sizing", "competitive landscape"],
+        description="2-3 information areas most central to answering the question",
+    )
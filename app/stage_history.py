@@ -0,0 +1,105 @@
+"""Mid-stage resume for the researcher and analyst sub-agents.
+
+A sub-agent run that fails partway — output validation retries exhausted
+after eight good tool calls, a timeout, a crash — used to be retried from an
+empty history, repeating every tool call. `run_resumable` captures the run's
+messages when it fails and keeps the resume point: the history up to the
+last request carrying tool results, i.e. every completed tool call but none
+of the failed output attempts. The next run of that stage continues from
+there with no new prompt, so the model picks up where the evidence ends.
+
+Resume points live on `ResearchContext.stage_history` (stage → messages)
+until the stage succeeds. They are saved with the session — the
+`stage_history_json` column in the API, the checkpoint file in the CLI — so
+`POST /run/{id}/retry` and `main.py --resume` continue mid-stage too.
+Set STAGE_RESUME=off to always restart a stage from scratch.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any
+
+from pydantic_ai import Agent, capture_run_messages
+from pydantic_ai.messages import ModelMessage, ModelMessagesTypeAdapter, ModelRequest, ToolReturnPart
+
+
+def resume_enabled() -> bool:
+    """STAGE_RESUME: 'on' (default) or 'off'."""
+    return os.environ.get("STAGE_RESUME", "on").strip().lower() != "off"
+
+
+def resume_point(messages: list[ModelMessage]) -> list[ModelMessage]:
+    """`messages` up to the last request carrying tool results, or [] if none completed."""
+    for i in range(len(messages) - 1, -1, -1):
+        message = messages[i]
+        if isinstance(message, ModelRequest) and any(isinstance(p, ToolReturnPart) for p in message.parts):
+            return list(messages[: i + 1])
+    return []
+
+
+def tool_results(messages: list[ModelMessage]) -> int:
+    """Number of tool results in `messages`."""
+    return sum(
+        isinstance(part, ToolReturnPart)
+        for message in messages
+        if isinstance(message, ModelRequest)
+        for part in message.parts
+    )
+
+
+def stage_resume_point(deps: Any, stage: str) -> list[ModelMessage]:
+    """The saved resume point of `stage` on this run, or []."""
+    return list((getattr(deps, "stage_history", None) or {}).get(stage, []))
+
+
+def _keep(deps: Any, stage: str, messages: list[ModelMessage]) -> None:
+    if getattr(deps, "stage_history", None) is None:
+        deps.stage_history = {}
+    if messages:
+        deps.stage_history[stage] = messages
+    else:
+        deps.stage_history.pop(stage, None)
+
+
+async def run_resumable(agent: Agent[Any, Any], deps: Any, stage: str, prompt: str, **kwargs: Any) -> Any:
+    """`agent.run(prompt, deps=deps, **kwargs)`, continuing from `stage`'s resume point if it has one.
+
+    On any failure the resume point is updated before the error propagates;
+    on success it is cleared.
+    """
+    if not resume_enabled():
+        return await agent.run(prompt, deps=deps, **kwargs)
+
+    history = stage_resume_point(deps, stage)
+    if history:
+        await deps.add_event(
+            "info",
+            stage.capitalize(),
+            f"Resuming after {tool_results(history)} completed tool results from the previous attempt",
+            details={"messages": len(history)},
+        )
+    with capture_run_messages() as messages:
+        try:
+            result = await agent.run(None if history else prompt, deps=deps, message_history=history or None, **kwargs)
+        except BaseException:
+            # A failure before any new tool result keeps the previous resume point.
+            _keep(deps, stage, resume_point(messages) or history)
+            raise
+    _keep(deps, stage, [])
+    return result
+
+
+def dump_stage_history(deps: Any) -> dict[str, list[Any]]:
+    """JSON-serializable resume points of every unfinished stage."""
+    return {
+        stage: ModelMessagesTypeAdapter.dump_python(messages, mode="json")
+        for stage, messages in (getattr(deps, "stage_history", None) or {}).items()
+        if messages
+    }
+
+
+def load_stage_history(deps: Any, data: dict[str, list[Any]] | None) -> None:
+    """Restore resume points saved by `dump_stage_history` onto `deps`."""
+    for stage, messages in (data or {}).items():
+        _keep(deps, stage, ModelMessagesTypeAdapter.validate_python(messages))
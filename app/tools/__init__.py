@@ -1,11 +1,18 @@
 """Custom tools for Crawl4AI, ClinicalTrials.gov, and Tavily."""
 
 from app.tools.clinical_trials_tool import search_clinical_trials
-from app.tools.crawl4ai_tool import deep_scrape
-from app.tools.tavily_tool import tavily_search
+from app.tools.crawl4ai_tool import (
+    deep_scrape,
+    deep_scrape_many_with_events,
+    deep_scrape_with_events,
+)
+from app.tools.tavily_tool import tavily_batch_search, tavily_search
 
 __all__ = [
     "deep_scrape",
+    "deep_scrape_many_with_events",
+    "deep_scrape_with_events",
     "search_clinical_trials",
+    "tavily_batch_search",
     "tavily_search",
 ]
@@ -0,0 +1,298 @@
+"""Process-wide pool of warm Crawl4AI browsers shared by concurrent sessions.
+
+Launching Chromium costs seconds and hundreds of MB, so `deep_scrape` leases a
+long-lived `AsyncWebCrawler` from this pool instead of creating one per URL.
+The FastAPI lifespan starts the pool (`start_crawler_pool`) and closes it on
+shutdown; the CLI never starts one and keeps the one-crawler-per-call path.
+
+Each slot is one browser that serves up to `pages_per_browser` concurrent
+crawls. A slot is recycled (browser closed and relaunched on next lease)
+after `max_uses` crawls, after repeated failures, or when its health check
+finds the browser disconnected. Callers beyond capacity wait in a bounded
+queue; once `max_waiters` are queued, further leases fail fast with
+`CrawlerPoolExhausted` rather than piling up behind slow pages.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Consecutive crawl failures after which a browser is assumed wedged.
+_MAX_CONSECUTIVE_FAILURES = 3
+
+
+class CrawlerPoolExhausted(RuntimeError):
+    """Raised when the wait queue is full or a lease times out."""
+
+
+def _default_factory() -> Any:
+    """Build a headless Chromium crawler with the same config deep_scrape uses."""
+    from crawl4ai import AsyncWebCrawler, BrowserConfig
+
+    return AsyncWebCrawler(
+        config=BrowserConfig(browser_type="chromium", headless=True, verbose=False)
+    )
+
+
+class _BrowserSlot:
+    """One browser in the pool plus its lease bookkeeping."""
+
+    def __init__(self, index: int) -> None:
+        self.index = index
+        self.crawler: Any = None
+        self.uses = 0
+        self.in_flight = 0
+        self.failures = 0
+        self.retiring = False
+        self.launches = 0
+        self.start_lock = asyncio.Lock()
+
+
+class CrawlerPool:
+    """Bounded pool of long-lived crawlers with health checks and recycling."""
+
+    def __init__(
+        self,
+        size: int = 2,
+        pages_per_browser: int = 4,
+        max_uses: int = 50,
+        max_waiters: int = 16,
+        acquire_timeout: float = 60.0,
+        health_interval: float = 60.0,
+        factory: Callable[[], Any] = _default_factory,
+    ) -> None:
+        self.size = max(1, size)
+        self.pages_per_browser = max(1, pages_per_browser)
+        self.max_uses = max(1, max_uses)
+        self.max_waiters = max(0, max_waiters)
+        self.acquire_timeout = acquire_timeout
+        self.health_interval = health_interval
+        self._factory = factory
+        self._slots = [_BrowserSlot(i) for i in range(self.size)]
+        self._capacity = asyncio.Semaphore(self.size * self.pages_per_browser)
+        self._lock = asyncio.Lock()
+        self._waiters = 0
+        self._closed = False
+        self._health_task: asyncio.Task | None = None
+        self.total_leases = 0
+        self.rejected = 0
+        self.recycled = 0
+
+    async def start(self, warm: bool = False) -> None:
+        """Open the pool; optionally launch every browser now instead of lazily."""
+        self._closed = False
+        if warm:
+            for slot in self._slots:
+                await self._ensure_started(slot)
+        if self.health_interval > 0 and self._health_task is None:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def close(self) -> None:
+        """Stop the health loop and close every browser."""
+        self._closed = True
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+        for slot in self._slots:
+            await self._shutdown(slot)
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[Any]:
+        """Lease a started crawler for one crawl.
+
+        Raises:
+            CrawlerPoolExhausted: the wait queue is full or the lease timed out.
+        """
+        if self._closed:
+            raise CrawlerPoolExhausted("Crawler pool is closed")
+        if self._waiters >= self.max_waiters and self._capacity.locked():
+            self.rejected += 1
+            raise CrawlerPoolExhausted(
+                f"Crawler pool busy: {self._waiters} requests already waiting"
+            )
+        self._waiters += 1
+        try:
+            await asyncio.wait_for(self._capacity.acquire(), timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise CrawlerPoolExhausted(
+                f"Timed out after {self.acquire_timeout}s waiting for a browser"
+            ) from None
+        finally:
+            self._waiters -= 1
+
+        ok = False
+        slot: _BrowserSlot | None = None
+        try:
+            async with self._lock:
+                slot = self._pick_slot()
+                slot.in_flight += 1
+                slot.uses += 1
+                self.total_leases += 1
+            # Launch outside the pool lock so a cold browser doesn't stall
+            # leases and releases on the other slots.
+            async with slot.start_lock:
+                await self._ensure_started(slot)
+            yield slot.crawler
+            ok = True
+        finally:
+            if slot is not None:
+                await self._release(slot, ok)
+            self._capacity.release()
+
+    def _pick_slot(self) -> _BrowserSlot:
+        """Least-loaded slot that is not retiring (capacity guarantees one exists)."""
+        candidates = [
+            s for s in self._slots
+            if not s.retiring and s.in_flight < self.pages_per_browser
+        ]
+        if not candidates:
+            # Every slot is draining for recycle; let the emptiest take one more.
+            candidates = [s for s in self._slots if s.in_flight < self.pages_per_browser]
+        # Prefer already-running browsers so idle slots stay cold until needed.
+        return min(candidates, key=lambda s: (s.crawler is None, s.in_flight))
+
+    async def _ensure_started(self, slot: _BrowserSlot) -> None:
+        if slot.crawler is None:
+            crawler = self._factory()
+            await crawler.start()
+            slot.crawler = crawler
+            slot.failures = 0
+            slot.retiring = False
+            slot.launches += 1
+
+    async def _release(self, slot: _BrowserSlot, ok: bool) -> None:
+        async with self._lock:
+            slot.in_flight -= 1
+            slot.failures = 0 if ok else slot.failures + 1
+            if slot.uses >= self.max_uses or slot.failures >= _MAX_CONSECUTIVE_FAILURES:
+                slot.retiring = True
+            if slot.retiring and slot.in_flight == 0:
+                self.recycled += 1
+                await self._shutdown(slot)
+
+    async def _shutdown(self, slot: _BrowserSlot) -> None:
+        crawler, slot.crawler = slot.crawler, None
+        slot.uses = 0
+        slot.failures = 0
+        slot.retiring = False
+        if crawler is not None:
+            try:
+                await crawler.close()
+            except Exception as e:
+                logger.warning("Closing pooled browser %d failed: %s", slot.index, e)
+
+    async def health_check(self) -> None:
+        """Recycle idle browsers whose Chromium process is no longer connected."""
+        async with self._lock:
+            for slot in self._slots:
+                if slot.crawler is None or slot.in_flight:
+                    continue
+                if not _is_connected(slot.crawler):
+                    logger.warning("Pooled browser %d failed health check; recycling", slot.index)
+                    self.recycled += 1
+                    await self._shutdown(slot)
+
+    async def _health_loop(self) -> None:
+        while not self._closed:
+            await asyncio.sleep(self.health_interval)
+            try:
+                await self.health_check()
+            except Exception as e:
+                logger.warning("Crawler pool health check failed: %s", e)
+
+    def stats(self) -> dict[str, Any]:
+        """Snapshot of pool occupancy for health endpoints and logs."""
+        return {
+            "browsers": self.size,
+            "pages_per_browser": self.pages_per_browser,
+            "running": sum(1 for s in self._slots if s.crawler is not None),
+            "in_flight": sum(s.in_flight for s in self._slots),
+            "waiting": self._waiters,
+            "total_leases": self.total_leases,
+            "rejected": self.rejected,
+            "recycled": self.recycled,
+        }
+
+
+def _is_connected(crawler: Any) -> bool:
+    """Best-effort liveness probe through Crawl4AI's browser manager.
+
+    Unknown internals count as healthy — we only recycle on positive evidence.
+    """
+    strategy = getattr(crawler, "crawler_strategy", None)
+    manager = getattr(strategy, "browser_manager", None)
+    browser = getattr(manager, "browser", None)
+    is_connected = getattr(browser, "is_connected", None)
+    if callable(is_connected):
+        try:
+            return bool(is_connected())
+        except Exception:
+            return False
+    return True
+
+
+_pool: CrawlerPool | None = None
+
+
+def get_crawler_pool() -> CrawlerPool | None:
+    """Return the running pool, or None when scrapes should launch their own browser."""
+    return _pool
+
+
+async def start_crawler_pool() -> CrawlerPool | None:
+    """Create and start the process-wide pool from environment settings.
+
+    Environment variables:
+        CRAWLER_POOL_ENABLED: '0' disables pooling (default '1').
+        CRAWLER_POOL_BROWSERS: Number of Chromium instances (default 2).
+        CRAWLER_POOL_PAGES: Concurrent pages per browser (default 4).
+        CRAWLER_POOL_MAX_USES: Crawls before a browser is recycled (default 50).
+        CRAWLER_POOL_MAX_WAITERS: Bounded wait-queue length (default 16).
+        CRAWLER_POOL_ACQUIRE_TIMEOUT: Seconds to wait for a free page (default 60).
+        CRAWLER_POOL_WARM: '1' launches browsers at startup (default '0').
+    """
+    global _pool
+    if _pool is not None:
+        return _pool
+    if os.environ.get("CRAWLER_POOL_ENABLED", "1").strip() in {"0", "false", "no"}:
+        return None
+    try:
+        import crawl4ai  # noqa: F401
+    except ImportError as e:
+        logger.warning("Crawl4AI not available; crawler pool disabled: %s", e)
+        return None
+
+    pool = CrawlerPool(
+        size=int(os.environ.get("CRAWLER_POOL_BROWSERS", "2")),
+        pages_per_browser=int(os.environ.get("CRAWLER_POOL_PAGES", "4")),
+        max_uses=int(os.environ.get("CRAWLER_POOL_MAX_USES", "50")),
+        max_waiters=int(os.environ.get("CRAWLER_POOL_MAX_WAITERS", "16")),
+        acquire_timeout=float(os.environ.get("CRAWLER_POOL_ACQUIRE_TIMEOUT", "60")),
+    )
+    warm = os.environ.get("CRAWLER_POOL_WARM", "0").strip() in {"1", "true", "yes"}
+    try:
+        await pool.start(warm=warm)
+    except Exception as e:
+        logger.warning("Crawler pool warm-up failed; browsers will launch lazily: %s", e)
+    _pool = pool
+    return pool
+
+
+async def stop_crawler_pool() -> None:
+    """Close the process-wide pool if one is running."""
+    global _pool
+    pool, _pool = _pool, None
+    if pool is not None:
+        await pool.close()
@@ -0,0 +1,231 @@
+"""Circuit breakers around the external tools.
+
+When Tavily or the headless browser is degraded, every agent turn would wait
+out a full timeout before seeing an error, then try again. A breaker per tool
+watches a rolling window of call outcomes and trips once too many calls fail
+or run slow:
+
+- closed: calls pass through; outcomes are recorded;
+- open: calls are refused immediately — the tool answers from its cache or
+  returns a short "service unavailable" message — for `cooldown` seconds;
+- half-open: after the cooldown a single probe call is let through; success
+  closes the breaker, failure re-opens it.
+
+Breakers are process-wide, shared by every session. Tools compare `state`
+before and after a call and emit a `WorkflowEvent` via `report_transition`
+when it changes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Any, Literal, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+State = Literal["closed", "open", "half_open"]
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling a service whose breaker is open."""
+
+    def __init__(self, name: str, retry_in: float) -> None:
+        super().__init__(f"{name} is temporarily unavailable (circuit open, retry in {retry_in:.0f}s)")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Rolling-window breaker driven by error rate and slow-call rate.
+
+    A call counts as failed if it raised, or if it took longer than
+    `slow_call_s` (None: latency is not judged). The breaker opens when at
+    least `min_calls` outcomes fall inside the last `window_s` seconds and
+    the failed share reaches `failure_rate`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = 0.5,
+        min_calls: int = 5,
+        window_s: float = 60.0,
+        slow_call_s: float | None = 15.0,
+        cooldown_s: float = 30.0,
+    ) -> None:
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window_s = window_s
+        self.slow_call_s = slow_call_s
+        self.cooldown_s = cooldown_s
+        self._outcomes: deque[tuple[float, bool, float]] = deque()
+        self._opened_at: float | None = None
+        self._probing = False
+        self.transitions = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> State:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.cooldown_s:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Whether a call may go out now (claims the probe slot when half-open)."""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        self.rejected += 1
+        return False
+
+    def retry_in(self) -> float:
+        """Seconds until the breaker will let a probe through (0 if closed)."""
+        if self._opened_at is None:
+            return 0.0
+        return max(0.0, self._opened_at + self.cooldown_s - time.monotonic())
+
+    def record(self, ok: bool, latency_s: float, probe: bool = False) -> None:
+        """Record one call's outcome and trip or reset the breaker as needed.
+
+        While the breaker is not closed only the half-open probe's outcome
+        counts; stragglers that started before it tripped are ignored.
+        """
+        now = time.monotonic()
+        failed = not ok or (self.slow_call_s is not None and latency_s > self.slow_call_s)
+        if self._opened_at is not None:
+            if not probe:
+                return
+            self._probing = False
+            if failed:
+                self._trip(now, "probe failed")
+            else:
+                self._opened_at = None
+                self._outcomes.clear()
+                self.transitions += 1
+                logger.info("Circuit %s closed", self.name)
+            return
+        self._outcomes.append((now, failed, latency_s))
+        while self._outcomes and now - self._outcomes[0][0] > self.window_s:
+            self._outcomes.popleft()
+        if len(self._outcomes) >= self.min_calls:
+            failures = sum(1 for _, f, _ in self._outcomes if f)
+            if failures / len(self._outcomes) >= self.failure_rate:
+                self._trip(now, f"{failures}/{len(self._outcomes)} calls failed or slow")
+
+    def _trip(self, now: float, reason: str) -> None:
+        self._opened_at = now
+        self.transitions += 1
+        logger.warning("Circuit %s opened for %.0fs: %s", self.name, self.cooldown_s, reason)
+
+    async def call(
+        self,
+        fn: Callable[[], Awaitable[T]],
+        ignore: tuple[type[BaseException], ...] = (),
+    ) -> T:
+        """Run `fn` through the breaker.
+
+        Exceptions in `ignore` are about the request, not the service (a dead
+        link, a throttling host): they propagate but count as a successful call.
+
+        Raises:
+            CircuitOpen: The breaker is open (or a half-open probe is already out).
+        """
+        probe = self.state == "half_open"
+        if not self.allow():
+            raise CircuitOpen(self.name, self.retry_in())
+        started = time.monotonic()
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            # Cancellation says nothing about the service; free the probe slot.
+            if probe:
+                self._probing = False
+            raise
+        except ignore:
+            self.record(True, time.monotonic() - started, probe)
+            raise
+        except Exception:
+            self.record(False, time.monotonic() - started, probe)
+            raise
+        self.record(True, time.monotonic() - started, probe)
+        return result
+
+    def stats(self) -> dict[str, Any]:
+        """State, window error rate, and counters for `/config/health`."""
+        failures = sum(1 for _, f, _ in self._outcomes if f)
+        return {
+            "state": self.state,
+            "window_calls": len(self._outcomes),
+            "window_failure_rate": round(failures / len(self._outcomes), 3) if self._outcomes else 0.0,
+            "retry_in_s": round(self.retry_in(), 1),
+            "transitions": self.transitions,
+            "rejected": self.rejected,
+        }
+
+
+async def report_transition(deps: Any, source: str, breaker: CircuitBreaker, before: State) -> None:
+    """Emit an info event on the run context if the breaker changed state."""
+    after = breaker.state
+    if after != before:
+        await deps.add_event(
+            "info",
+            source,
+            f"Circuit {before} → {after}",
+            details={"circuit": breaker.name, **breaker.stats()},
+        )
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+# Breakers that judge errors only: a slow render is a heavy page, not a degraded browser.
+_NO_SLOW_CALL = frozenset({"crawl4ai"})
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Return the process-wide breaker for a tool, building it from env on first use.
+
+    Environment variables (shared by all breakers):
+        CIRCUIT_FAILURE_RATE: Failed/slow share of the window that trips the breaker (default 0.5).
+        CIRCUIT_MIN_CALLS: Calls in the window before the rate is trusted (default 5).
+        CIRCUIT_WINDOW: Rolling window in seconds (default 60).
+        CIRCUIT_SLOW_CALL: Seconds after which a successful call still counts as failed
+            (default 15; not applied to the crawl4ai browser breaker).
+        CIRCUIT_COOLDOWN: Seconds to stay open before a half-open probe (default 30).
+    """
+    breaker = _breakers.get(name)
+    if breaker is None:
+        breaker = _breakers[name] = CircuitBreaker(
+            name,
+            failure_rate=float(os.environ.get("CIRCUIT_FAILURE_RATE", "0.5")),
+            min_calls=int(os.environ.get("CIRCUIT_MIN_CALLS", "5")),
+            window_s=float(os.environ.get("CIRCUIT_WINDOW", "60")),
+            slow_call_s=None if name in _NO_SLOW_CALL else float(os.environ.get("CIRCUIT_SLOW_CALL", "15")),
+            cooldown_s=float(os.environ.get("CIRCUIT_COOLDOWN", "30")),
+        )
+    return breaker
+
+
+def set_breaker(name: str, breaker: CircuitBreaker | None) -> None:
+    """Install a custom breaker for a tool, or None to rebuild it from env."""
+    if breaker is None:
+        _breakers.pop(name, None)
+    else:
+        _breakers[name] = breaker
+
+
+def breaker_stats() -> dict[str, dict[str, Any]]:
+    """Stats for every breaker created so far."""
+    return {name: breaker.stats() for name, breaker in _breakers.items()}
@@ -1,57 +1,109 @@
 """ClinicalTrials.gov API v2 tool: search studies and return structured summaries."""
 
-import asyncio
 import logging
+from collections.abc import AsyncIterator
 from typing import Any
 
+import httpx
+
 from app.schema import ClinicalTrialSummary
+from app.tools.http_client import get_http_client
+from app.tools.rate_limit import limited
+from app.tools.trials_index import IndexLookup, get_trials_index
 
 logger = logging.getLogger(__name__)
 
-# Field names from ClinicalTrials.gov API v2 used by pytrials
+_API_URL = "https://clinicaltrials.gov/api/v2/studies"
+
+# Field projection: only the pieces ClinicalTrialSummary needs travel over the wire.
 _FIELDS = [
-    "NCT Number",
-    "Study Title",
-    "Phases",
-    "Study Status",
-    "Conditions",
-    "Interventions",
+    "NCTId",
+    "BriefTitle",
+    "Phase",
+    "OverallStatus",
+    "Condition",
+    "InterventionType",
+    "InterventionName",
+    "LastUpdatePostDate",
 ]
 
+# API v2 hard limit on pageSize.
+_MAX_PAGE_SIZE = 1000
+
+
+async def iter_studies(
+    search_expr: str,
+    max_studies: int | None,
+    client: httpx.AsyncClient | None = None,
+) -> AsyncIterator[dict[str, Any]]:
+    """Stream raw study records for a search, following `nextPageToken`.
+
+    Stops requesting pages as soon as `max_studies` records have been yielded,
+    so small searches cost a single request. Each page request goes through
+    the shared `clinicaltrials` rate limiter, which retries 429/503 responses. `None` pages through every match
+    (used by the offline index's delta refresh).
+    """
+    client = client or get_http_client()
+    remaining = float("inf") if max_studies is None else max(0, max_studies)
+    page_token: str | None = None
+    while remaining > 0:
+        params: dict[str, Any] = {
+            "query.term": search_expr,
+            "fields": ",".join(_FIELDS),
+            "pageSize": min(remaining, _MAX_PAGE_SIZE),
+            "format": "json",
+        }
+        if page_token:
+            params["pageToken"] = page_token
+        payload, _ = await limited("clinicaltrials", lambda: _get_page(client, params))
+        studies = payload.get("studies") or []
+        taken = studies if remaining >= len(studies) else studies[: int(remaining)]
+        for study in taken:
+            yield study
+        remaining -= len(taken)
+        page_token = payload.get("nextPageToken")
+        if not page_token or not studies:
+            return
+
+
+async def _get_page(client: httpx.AsyncClient, params: dict[str, Any]) -> dict[str, Any]:
+    response = await client.get(_API_URL, params=params)
+    response.raise_for_status()
+    return response.json()
+
 
-def _search_sync(search_expr: str, max_studies: int) -> list[dict[str, Any]]:
-    """Synchronous search using pytrials. Run from thread to not block event loop."""
-    from pytrials.client import ClinicalTrials
+def study_last_update(study: dict[str, Any]) -> str | None:
+    """The record's LastUpdatePostDate (ISO date), if present."""
+    status = (study.get("protocolSection") or {}).get("statusModule") or {}
+    return (status.get("lastUpdatePostDateStruct") or {}).get("date")
 
-    ct = ClinicalTrials()
-    raw = ct.get_study_fields(
-        search_expr=search_expr,
-        fields=_FIELDS,
-        max_studies=min(max_studies, 1000),
-        fmt="csv",
+
+def study_to_summary(study: dict[str, Any]) -> ClinicalTrialSummary:
+    """Map a v2 JSON study record onto ClinicalTrialSummary.
+
+    Multi-valued fields are pipe-joined, matching the API's CSV rendering the
+    agents were prompted with before (e.g. 'PHASE2|PHASE3', 'DRUG: X|OTHER: Placebo').
+    """
+    protocol = study.get("protocolSection") or {}
+    ident = protocol.get("identificationModule") or {}
+    status = protocol.get("statusModule") or {}
+    design = protocol.get("designModule") or {}
+    conditions = protocol.get("conditionsModule") or {}
+    arms = protocol.get("armsInterventionsModule") or {}
+
+    interventions = [
+        f"{i['type']}: {i['name']}" if i.get("type") else i["name"]
+        for i in arms.get("interventions") or []
+        if i.get("name")
+    ]
+    return ClinicalTrialSummary(
+        nct_id=(ident.get("nctId") or "").strip() or "Unknown",
+        title=(ident.get("briefTitle") or "").strip() or "No title",
+        phase="|".join(design.get("phases") or []) or None,
+        status=status.get("overallStatus") or None,
+        condition="|".join(conditions.get("conditions") or []) or None,
+        interventions="|".join(interventions) or None,
     )
-    if not raw or len(raw) < 2:
-        return []
-    headers: list[str] = raw[0]
-    rows = raw[1:]
-    results = []
-    for row in rows:
-        if len(row) != len(headers):
-            continue
-        rec = dict(zip(headers, row, strict=True))
-        nct = rec.get("NCT Number", "").strip() or "Unknown"
-        title = rec.get("Study Title", "").strip() or "No title"
-        results.append(
-            ClinicalTrialSummary(
-                nct_id=nct,
-                title=title,
-                phase=rec.get("Phases") or None,
-                status=rec.get("Study Status") or None,
-                condition=rec.get("Conditions") or None,
-                interventions=rec.get("Interventions") or None,
-            )
-        )
-    return results
 
 
 async def search_clinical_trials(
@@ -61,6 +113,11 @@ async def search_clinical_trials(
     """
     Search ClinicalTrials.gov and return a list of trial summaries.
 
+    Answers from the offline FTS5 index (see `app.tools.trials_index`) when it
+    holds fresh matches; otherwise talks to the v2 JSON API over the shared
+    httpx connection pool and writes the results back into the index. A stale
+    index hit is still returned if the live API fails.
+
     Args:
         search_expr: Search expression (condition, drug name, NCT id, etc.).
         max_studies: Maximum number of studies to return (capped at 1000).
@@ -68,8 +125,29 @@ async def search_clinical_trials(
     Returns:
         List of ClinicalTrialSummary models.
     """
+    max_studies = min(max_studies, 1000)
+    index = get_trials_index()
+    if index is not None and not index.exists():
+        index = None
+    cached: IndexLookup | None = None
+    if index is not None:
+        try:
+            cached = await index.search(search_expr, limit=max_studies)
+        except Exception as e:
+            logger.warning("Trials index lookup failed: %s", e)
+        if cached is not None and cached.fresh:
+            return cached.trials
+
     try:
-        return await asyncio.to_thread(_search_sync, search_expr, max_studies)
+        studies = [study async for study in iter_studies(search_expr, max_studies)]
     except Exception as e:
         logger.exception("search_clinical_trials failed: %s", e)
-        return []
+        return cached.trials if cached is not None else []
+
+    results = [study_to_summary(study) for study in studies]
+    if index is not None and results:
+        try:
+            await index.upsert(zip(results, map(study_last_update, studies)))
+        except Exception as e:
+            logger.warning("Trials index write-back failed: %s", e)
+    return results
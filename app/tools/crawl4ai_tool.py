@@ -2,55 +2,538 @@
 
 import asyncio
 import logging
+import os
+import re
+import time
+from dataclasses import dataclass, field
 from typing import Any
 
+import httpx
+from pydantic_ai import RunContext
+
+from app.context import ResearchContext
+from app.tools.browser_pool import get_crawler_pool
+from app.tools.circuit_breaker import CircuitOpen, get_breaker, report_transition
+from app.tools.dedup import back_reference, canonical_url, stage_deduper
+from app.tools.passage_rank import rank_passages
+from app.tools.rate_limit import (
+    RateLimited,
+    domain_key,
+    is_host_throttle,
+    limited,
+    parse_retry_after,
+    raise_for_throttle,
+)
+from app.tools.scrape_cache import content_hash, get_scrape_cache, revalidate
+from app.tools.shaping import shape_text, tool_budget, truncate_markdown
+
 logger = logging.getLogger(__name__)
 
 
+class ScrapeError(Exception):
+    """A render failed; the message is what the agent sees."""
+
+
+@dataclass
+class ScrapeResult:
+    """Outcome of a scrape plus which fetch tiers ran and how long each took."""
+
+    url: str
+    markdown: str
+    tier: str
+    """Tier that produced the content: 'cache', 'revalidated', 'stale', 'http' or 'browser'."""
+    latency_ms: float = 0.0
+    tiers: list[dict[str, Any]] = field(default_factory=list)
+    """One entry per tier attempted: {'tier', 'ms', 'outcome'}."""
+    ok: bool = True
+    original_chars: int | None = None
+    """Page size before query-focused passage selection (None if not applied)."""
+    compression_ratio: float | None = None
+    limiter_wait_ms: float = 0.0
+    """Time spent waiting on the per-domain rate limiter (including backoff)."""
+
+    def details(self) -> dict[str, Any]:
+        """Event `details` payload for the Crawl4AI tool_result event."""
+        details: dict[str, Any] = {
+            "url": self.url,
+            "tier": self.tier,
+            "latency_ms": round(self.latency_ms, 1),
+            "tiers": self.tiers,
+            "chars": len(self.markdown),
+            "limiter_wait_ms": round(self.limiter_wait_ms, 1),
+        }
+        if self.original_chars is not None:
+            details["original_chars"] = self.original_chars
+            details["compression_ratio"] = self.compression_ratio
+        return details
+
+
 async def deep_scrape(url: str, query: str | None = None) -> str:
     """
     Scrape a URL and return its content as clean Markdown.
 
-    Uses Crawl4AI's AsyncWebCrawler to handle JS-heavy pages (e.g. pharma portals).
-    Optionally focus on content relevant to `query` (used for adaptive strategies).
+    Thin wrapper over `scrape_page` for callers that only need the text.
 
     Args:
         url: Full URL to scrape.
-        query: Optional query to guide extraction (e.g. for relevance filtering).
+        query: Optional query; only the most relevant passages are returned.
 
     Returns:
         Markdown string of the page content. Returns error message string on failure.
     """
+    return (await scrape_page(url, query)).markdown
+
+
+async def deep_scrape_with_events(
+    ctx: RunContext[ResearchContext],
+    url: str,
+    query: str | None = None,
+    *,
+    stage: str,
+) -> str:
+    """Agent-tool entry point: scrape and record tool_call/tool_result events.
+
+    The tool_result event's `details` carry the tier breakdown from
+    `ScrapeResult.details()` so the UI and logs show which tier served a page,
+    plus the token-budget accounting from `app.tools.shaping`. A page the
+    calling `stage` was already shown (by content; see app.tools.dedup) comes
+    back as a back-reference.
+    """
+    await ctx.deps.add_event("tool_call", "Crawl4AI", f"Scraping: {url}")
+    breaker = get_breaker("crawl4ai")
+    before = breaker.state
+    result = await scrape_page(url, query)
+    await report_transition(ctx.deps, "Crawl4AI", breaker, before)
+    message = f"Scraped {len(result.markdown)} characters via {result.tier}"
+    if result.original_chars is not None and result.original_chars > len(result.markdown):
+        message += f" (focused from {result.original_chars})"
+    details = result.details()
+    markdown = result.markdown
+    if result.ok:
+        dedup = stage_deduper(ctx.deps, stage)
+        original = dedup.check(url, markdown)
+        details["dedup"] = dedup.stats()
+        if original:
+            message += f" (duplicate of {original}, omitted)"
+            markdown = back_reference(original)
+        shaped = shape_text("deep_scrape", markdown)
+        details["budget"] = shaped.details()
+        if shaped.truncated:
+            message += f" (truncated to ~{shaped.tokens} tokens)"
+            markdown = shaped.text
+    await ctx.deps.add_event("tool_result", "Crawl4AI", message, details=details)
+    return markdown
+
+
+async def deep_scrape_many_with_events(
+    ctx: RunContext[ResearchContext],
+    urls: list[str],
+    query: str | None = None,
+    *,
+    stage: str,
+) -> str:
+    """Agent-tool entry point: scrape several URLs in parallel under one deadline.
+
+    URLs are de-duplicated by canonical form and capped at SCRAPE_MANY_MAX_URLS
+    (default 6). Each runs through `scrape_page` — sharing the browser pool,
+    scrape cache, rate limiter and circuit breaker — with at most
+    SCRAPE_DOMAIN_CONCURRENCY (default 2) pages in flight per domain. Pages
+    still running when SCRAPE_MANY_DEADLINE (default 45s) expires are
+    cancelled and listed with a marker; the pages that finished are returned,
+    each trimmed to an equal share of the `deep_scrape_many` token budget.
+    """
+    unique: dict[str, str] = {}
+    for url in urls:
+        if url.strip():
+            unique.setdefault(canonical_url(url), url.strip())
+    batch = list(unique.values())[: int(os.environ.get("SCRAPE_MANY_MAX_URLS", "6"))]
+    if not batch:
+        return "No URLs given."
+    deadline = float(os.environ.get("SCRAPE_MANY_DEADLINE", "45"))
+    per_domain = int(os.environ.get("SCRAPE_DOMAIN_CONCURRENCY", "2"))
+
+    await ctx.deps.add_event("tool_call", "Crawl4AI", f"Scraping {len(batch)} URLs: {', '.join(batch)}")
+    breaker = get_breaker("crawl4ai")
+    before = breaker.state
+    started = time.perf_counter()
+    domain_slots: dict[str, asyncio.Semaphore] = {}
+
+    async def run(url: str) -> ScrapeResult:
+        slot = domain_slots.setdefault(domain_key(url), asyncio.Semaphore(per_domain))
+        async with slot:
+            return await scrape_page(url, query)
+
+    tasks = {url: asyncio.create_task(run(url)) for url in batch}
+    try:
+        _, pending = await asyncio.wait(tasks.values(), timeout=deadline)
+    finally:
+        for task in tasks.values():
+            task.cancel()
+    await asyncio.gather(*tasks.values(), return_exceptions=True)
+    await report_transition(ctx.deps, "Crawl4AI", breaker, before)
+
+    finished = [
+        url for url, task in tasks.items()
+        if task not in pending and not task.exception() and task.result().ok
+    ]
+    budget = tool_budget("deep_scrape_many")
+    page_budget = budget // max(1, len(finished)) if budget is not None else None
+    dedup = stage_deduper(ctx.deps, stage)
+    parts: list[str] = []
+    pages: list[dict[str, Any]] = []
+    for url, task in tasks.items():
+        if task in pending:
+            parts.append(f"## {url}\n\n[Not finished within {deadline:g}s — omitted]")
+            pages.append({"url": url, "outcome": "timeout"})
+            continue
+        if task.exception() is not None:
+            logger.warning("deep_scrape_many failed for %s: %s", url, task.exception())
+            parts.append(f"## {url}\n\n[Failed: Scraping error: {task.exception()!s}]")
+            pages.append({"url": url, "outcome": "failed"})
+            continue
+        result = task.result()
+        details = result.details()
+        if not result.ok:
+            parts.append(f"## {url}\n\n[Failed: {result.markdown}]")
+            pages.append({**details, "outcome": "failed"})
+            continue
+        markdown = result.markdown
+        original = dedup.check(url, markdown)
+        if original:
+            markdown = back_reference(original)
+            details["outcome"] = "duplicate"
+        else:
+            shaped = truncate_markdown(markdown, page_budget)
+            markdown = shaped.text
+            details["outcome"] = "ok"
+            details["budget"] = shaped.details()
+        parts.append(f"## {url}\n\n{markdown}")
+        pages.append(details)
+
+    timed_out = sum(1 for p in pages if p["outcome"] == "timeout")
+    failed = sum(1 for p in pages if p["outcome"] == "failed")
+    await ctx.deps.add_event(
+        "tool_result",
+        "Crawl4AI",
+        f"Scraped {len(finished)}/{len(batch)} pages ({timed_out} timed out, {failed} failed)",
+        details={
+            "pages": pages,
+            "deadline_s": deadline,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+            "dedup": dedup.stats(),
+        },
+    )
+    return "\n\n".join(parts)
+
+
+async def scrape_page(url: str, query: str | None = None) -> ScrapeResult:
+    """
+    Scrape a URL and, when `query` is given, keep only the relevant passages.
+
+    The full page is fetched (and cached) by `fetch_page`; passage selection
+    runs afterwards in a worker thread so cached pages can be re-focused for
+    different queries. See `app.tools.passage_rank` for the ranking.
+
+    Args:
+        url: Full URL to scrape.
+        query: Optional query; selects the top passages under a character budget.
+
+    Returns:
+        ScrapeResult. On failure `ok` is False and `markdown` holds the error message.
+    """
+    result = await fetch_page(url)
+    if not result.ok or not query or not query.strip():
+        return result
+    ranked = await asyncio.to_thread(
+        rank_passages,
+        result.markdown,
+        query,
+        top_k=int(os.environ.get("SCRAPE_TOP_K", "8")),
+        char_budget=int(os.environ.get("SCRAPE_CHAR_BUDGET", "8000")),
+    )
+    result.markdown = ranked.text
+    result.original_chars = ranked.original_chars
+    result.compression_ratio = ranked.compression_ratio
+    return result
+
+
+async def fetch_page(url: str) -> ScrapeResult:
+    """
+    Fetch a full page through the cheapest tier that yields real content.
+
+    Tiers, in order:
+      1. Scrape cache — fresh entries are served directly; stale ones are
+         revalidated with a conditional GET before paying for a fetch.
+      2. Plain HTTP — a pooled httpx GET plus local HTML→Markdown conversion.
+         Handles static pages (FDA labels, CMS documents, blogs) in tens of ms.
+         A changed page's revalidation response is converted here instead of
+         being fetched again.
+      3. Headless browser — Crawl4AI's AsyncWebCrawler for JS-heavy portals,
+         used only when the HTTP tier fails or returns a JavaScript shell.
+         When the process-wide crawler pool is running (API server), a warm
+         browser is leased from it; otherwise a one-off browser is launched.
+         Renders go through the `crawl4ai` circuit breaker, outside the
+         per-domain limiter so throttled retries are not browser failures.
+         Only infrastructure failures (browser launch or pool errors,
+         timeouts) count against it — a failed page (ScrapeError) or a
+         throttling host does not. While it is open, a stale cache entry is
+         served if there is one, else the scrape fails immediately.
+
+    Args:
+        url: Full URL to scrape.
+
+    Returns:
+        ScrapeResult. On failure `ok` is False and `markdown` holds the error message.
+    """
+    started = time.perf_counter()
+    tiers: list[dict[str, Any]] = []
+    limiter_key = domain_key(url)
+    limiter_wait = 0.0
+
+    def _finish(markdown: str, tier: str, ok: bool = True) -> ScrapeResult:
+        return ScrapeResult(
+            url=url,
+            markdown=markdown,
+            tier=tier,
+            latency_ms=(time.perf_counter() - started) * 1000,
+            tiers=tiers,
+            ok=ok,
+            limiter_wait_ms=limiter_wait * 1000,
+        )
+
+    cache = get_scrape_cache()
+    entry = await cache.get(url) if cache is not None else None
+    changed: httpx.Response | None = None
+    if entry is not None:
+        t0 = time.perf_counter()
+        if cache.is_fresh(entry):
+            cache.hits += 1
+            tiers.append(_tier("cache", t0, "hit"))
+            return _finish(entry.markdown, "cache")
+        unchanged, headers, changed = await revalidate(entry)
+        if unchanged:
+            cache.revalidated += 1
+            await cache.touch(entry, headers)
+            tiers.append(_tier("cache", t0, "revalidated"))
+            return _finish(entry.markdown, "revalidated")
+        tiers.append(_tier("cache", t0, "changed" if changed is not None else "stale"))
+    if cache is not None:
+        cache.misses += 1
+
+    markdown: str | None = None
+    headers: dict[str, Any] = {}
+    tier = "http"
+    if _static_first_enabled():
+        t0 = time.perf_counter()
+        try:
+            if changed is not None:
+                markdown, headers, reason = await static_markdown(changed)
+            else:
+                (markdown, headers, reason), waited = await limited(limiter_key, lambda: fetch_static(url))
+                limiter_wait += waited
+        except RateLimited as e:
+            # Escalating to the browser would only hit the throttling host again.
+            tiers.append(_tier("http", t0, "throttled"))
+            return _finish(f"Scraping error: rate limited by host ({e!s})", "http", ok=False)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            markdown, reason = None, f"error: {e!s}"
+        tiers.append(_tier("http", t0, "ok" if markdown is not None else f"escalated: {reason}"))
+
+    if markdown is None:
+        tier = "browser"
+        t0 = time.perf_counter()
+        breaker = get_breaker("crawl4ai")
+        try:
+            (markdown, headers), waited = await breaker.call(
+                lambda: limited(limiter_key, lambda: _render(url)), ignore=(ScrapeError, RateLimited)
+            )
+            limiter_wait += waited
+        except CircuitOpen as e:
+            tiers.append(_tier("browser", t0, "circuit open"))
+            if entry is not None:
+                return _finish(entry.markdown, "stale")
+            return _finish(f"Scraping unavailable: {e!s}", "browser", ok=False)
+        except ScrapeError as e:
+            tiers.append(_tier("browser", t0, "failed"))
+            return _finish(str(e), "browser", ok=False)
+        except RateLimited as e:
+            tiers.append(_tier("browser", t0, "throttled"))
+            return _finish(f"Scraping error: rate limited by host ({e!s})", "browser", ok=False)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.exception("deep_scrape failed for %s", url)
+            tiers.append(_tier("browser", t0, "failed"))
+            return _finish(f"Scraping error: {e!s}", "browser", ok=False)
+        tiers.append(_tier("browser", t0, "ok"))
+
+    if cache is not None and markdown.strip():
+        if entry is not None and content_hash(markdown) == entry.content_hash:
+            await cache.touch(entry, headers)
+        else:
+            await cache.put(url, markdown, headers)
+    return _finish(markdown, tier)
+
+
+def _tier(name: str, t0: float, outcome: str) -> dict[str, Any]:
+    return {"tier": name, "ms": round((time.perf_counter() - t0) * 1000, 1), "outcome": outcome}
+
+
+def _static_first_enabled() -> bool:
+    return os.environ.get("SCRAPE_STATIC_FIRST", "1").strip() not in {"0", "false", "no"}
+
+
+# ---------------------------------------------------------------------------
+# Plain-HTTP tier
+# ---------------------------------------------------------------------------
+
+_STRIP_BLOCKS_RE = re.compile(
+    r"<(script|style|noscript|template|svg|nav|footer|header|iframe)\b[^>]*>.*?</\1\s*>",
+    re.IGNORECASE | re.DOTALL,
+)
+_TAG_RE = re.compile(r"<[^>]+>")
+_WS_RE = re.compile(r"\s+")
+_NOSCRIPT_RE = re.compile(r"<noscript\b[^>]*>(.*?)</noscript\s*>", re.IGNORECASE | re.DOTALL)
+_NOSCRIPT_MARKERS = (
+    "enable javascript",
+    "javascript is required",
+    "javascript is disabled",
+    "requires javascript",
+)
+_BOT_CHECK_MARKERS = (
+    "checking your browser",
+    "just a moment...",
+    "verify you are human",
+)
+_EMPTY_ROOT_RE = re.compile(
+    r"<div[^>]+id=[\"'](root|app|__next|__nuxt)[\"'][^>]*>\s*</div>", re.IGNORECASE
+)
+
+
+def visible_text(html: str) -> str:
+    """Rough visible text of an HTML document (scripts, styles and chrome removed)."""
+    return _WS_RE.sub(" ", _TAG_RE.sub(" ", _STRIP_BLOCKS_RE.sub(" ", html))).strip()
+
+
+def js_shell_reason(html: str, min_chars: int | None = None) -> str | None:
+    """Return why `html` looks like a JavaScript-only shell, or None if it has real content.
+
+    Heuristics: too little visible text, a tiny text-to-markup ratio on a
+    large document, noscript "enable JavaScript" notices, bot-check
+    interstitials, or an empty SPA mount point with no surrounding text.
+    """
+    if min_chars is None:
+        min_chars = int(os.environ.get("SCRAPE_STATIC_MIN_CHARS", "500"))
+    text = visible_text(html)
+    if len(text) < min_chars:
+        return "empty body"
+    lowered_text = text.lower()
+    if any(m in lowered_text[:2000] for m in _BOT_CHECK_MARKERS):
+        return "bot check"
+    for noscript in _NOSCRIPT_RE.findall(html):
+        if any(m in noscript.lower() for m in _NOSCRIPT_MARKERS):
+            if len(text) < min_chars * 4:
+                return "noscript marker"
+    if len(html) > 50_000 and len(text) / len(html) < 0.02:
+        return "low text ratio"
+    if _EMPTY_ROOT_RE.search(html) and len(text) < min_chars * 4:
+        return "empty app root"
+    return None
+
+
+def html_to_markdown(html: str, base_url: str = "") -> str:
+    """Convert static HTML to Markdown with Crawl4AI's generator (no browser)."""
+    from crawl4ai.markdown_generation_strategy import DefaultMarkdownGenerator
+
+    cleaned = _STRIP_BLOCKS_RE.sub("", html)
+    result = DefaultMarkdownGenerator().generate_markdown(
+        input_html=cleaned,
+        base_url=base_url,
+        citations=False,
+    )
+    return (result.raw_markdown or "").strip()
+
+
+async def fetch_static(url: str) -> tuple[str | None, dict[str, Any], str]:
+    """Fetch a page over plain HTTP and convert it to Markdown.
+
+    Returns (markdown, headers, reason). `markdown` is None when the page
+    must be escalated to the browser tier; `reason` says why.
+
+    Raises:
+        RateLimited: The host answered 429, or 503 with a Retry-After (retried by
+            the caller's limiter). A bare 503 escalates like any other status.
+    """
+    from app.tools.http_client import get_http_client
+
+    response = await get_http_client().get(url)
+    raise_for_throttle(response)
+    return await static_markdown(response)
+
+
+async def static_markdown(response: httpx.Response) -> tuple[str | None, dict[str, Any], str]:
+    """Convert an HTTP response to Markdown, or say why it needs the browser (see `fetch_static`)."""
+    headers = dict(response.headers)
+    if response.status_code != 200:
+        return None, headers, f"HTTP {response.status_code}"
+    content_type = response.headers.get("content-type", "").lower()
+    if "html" not in content_type and "xml" not in content_type:
+        return None, headers, f"content-type {content_type.split(';')[0] or 'unknown'}"
+    html = response.text
+    reason = js_shell_reason(html)
+    if reason is not None:
+        return None, headers, reason
+    markdown = await asyncio.to_thread(html_to_markdown, html, str(response.url))
+    if not markdown:
+        return None, headers, "empty markdown"
+    return markdown, headers, "ok"
+
+
+async def _render(url: str) -> tuple[str, dict[str, Any]]:
+    """Render a page in headless Chromium; return (markdown, response headers).
+
+    Raises:
+        ScrapeError: Crawl4AI is missing or the crawl reported failure.
+        RateLimited: The host answered 429, or 503 with a Retry-After.
+    """
     try:
         from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig, CacheMode
     except ImportError as e:
         logger.warning("Crawl4AI not available: %s", e)
-        return f"Scraping unavailable: {e!s}"
+        raise ScrapeError(f"Scraping unavailable: {e!s}") from e
 
-    try:
+    # Crawl4AI's own cache stays bypassed — caching and revalidation happen
+    # in app.tools.scrape_cache, which knows about validators and domain TTLs.
+    run_cfg = CrawlerRunConfig(
+        cache_mode=CacheMode.BYPASS,
+        word_count_threshold=10,
+    )
+    pool = get_crawler_pool()
+    if pool is not None:
+        async with pool.lease() as crawler:
+            result = await crawler.arun(url, config=run_cfg)
+    else:
         browser_cfg = BrowserConfig(
             browser_type="chromium",
             headless=True,
             verbose=False,
         )
-        run_cfg = CrawlerRunConfig(
-            cache_mode=CacheMode.BYPASS,
-            word_count_threshold=10,
-        )
         async with AsyncWebCrawler(config=browser_cfg) as crawler:
             result = await crawler.arun(url, config=run_cfg)
-        if not result.success:
-            return result.error_message or "Crawl failed with no message."
-        md = getattr(result, "markdown", None)
-        if md is None:
-            md = getattr(result, "cleaned_html", "") or ""
-        if hasattr(md, "raw_markdown"):
-            return md.raw_markdown or ""
-        if isinstance(md, str):
-            return md
-        return str(md)
-    except asyncio.CancelledError:
-        raise
-    except Exception as e:
-        logger.exception("deep_scrape failed for %s", url)
-        return f"Scraping error: {e!s}"
+    raw_headers = getattr(result, "response_headers", None) or {}
+    retry_after = next((v for k, v in raw_headers.items() if k.lower() == "retry-after"), None)
+    if is_host_throttle(getattr(result, "status_code", None), retry_after):
+        raise RateLimited(f"HTTP {result.status_code} from {url}", parse_retry_after(retry_after))
+    if not result.success:
+        raise ScrapeError(result.error_message or "Crawl failed with no message.")
+    headers = dict(getattr(result, "response_headers", None) or {})
+    md = getattr(result, "markdown", None)
+    if md is None:
+        md = getattr(result, "cleaned_html", "") or ""
+    if hasattr(md, "raw_markdown"):
+        return md.raw_markdown or "", headers
+    if isinstance(md, str):
+        return md, headers
+    return str(md), headers
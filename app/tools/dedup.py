@@ -0,0 +1,142 @@
+"""Stage-scoped de-duplication of tool outputs.
+
+Tavily results and scraped pages often repeat the same press release or
+syndicated article under different URLs. Every copy the model sees costs
+prompt tokens, so tool outputs pass through a `ContentDeduper` held on the
+run's `ResearchContext` for the stage that called the tool:
+
+- exact duplicates are caught by canonical URL (scheme/host case, `www.`,
+  fragments, tracking parameters and trailing slashes are ignored);
+- near-duplicates are caught by a 64-bit SimHash over the text's words.
+
+Search results are checked by URL and by content. Scraped pages are checked
+by content only: scraping a URL that a search returned — or scraping it again
+for a different `query` — is how an agent gets the full page or new passages
+beyond what it was shown, so the URL alone does not make it a repeat. A
+repeated item is replaced by a short back-reference to the first copy, and
+the suppressed bytes are tallied.
+
+A back-reference is only useful to an agent that has the first copy in its
+message history, so each stage (researcher, analyst) has its own deduper —
+the two run concurrently and never see each other's tool results — and a
+stage starting a fresh agent run starts a fresh deduper (see `stage_deduper`).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+_TRACKING_PARAMS = frozenset(
+    {"gclid", "fbclid", "mc_cid", "mc_eid", "ref", "ref_src", "igshid", "_hsenc", "_hsmi"}
+)
+
+
+def canonical_url(url: str) -> str:
+    """Normalize a URL so trivially different spellings of one page compare equal."""
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower().removeprefix("www.")
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    query = urlencode(
+        sorted(
+            (k, v)
+            for k, v in parse_qsl(parts.query, keep_blank_values=True)
+            if not k.lower().startswith("utm_") and k.lower() not in _TRACKING_PARAMS
+        )
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("https" if parts.scheme in ("http", "https") else parts.scheme, host, path, query, ""))
+
+
+def simhash(text: str) -> int:
+    """64-bit SimHash of `text`, with each word token as a feature.
+
+    Syndicated copies that differ by a byline or a reworded lead land within a
+    few bits of each other; different articles on the same drug do not.
+    """
+    weights = [0] * 64
+    for word in _WORD_RE.findall(text.lower()):
+        h = int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if h >> bit & 1 else -1
+    return sum(1 << bit for bit, w in enumerate(weights) if w > 0)
+
+
+def hamming(a: int, b: int) -> int:
+    """Number of differing bits between two fingerprints."""
+    return (a ^ b).bit_count()
+
+
+@dataclass
+class ContentDeduper:
+    """Remembers what one agent run has already been shown.
+
+    `max_distance` is the SimHash Hamming distance at or below which two
+    texts count as near-duplicates; texts shorter than `min_chars` are only
+    de-duplicated by URL, since short snippets fingerprint unreliably.
+    """
+
+    max_distance: int = 3
+    min_chars: int = 200
+    suppressed: int = 0
+    suppressed_bytes: int = 0
+    _urls: dict[str, str] = field(default_factory=dict)
+    _fingerprints: list[tuple[int, str]] = field(default_factory=list)
+
+    def check(self, label: str, text: str, url: str | None = None) -> str | None:
+        """Register an item, or return the label of the earlier copy it repeats."""
+        key = canonical_url(url) if url else None
+        if key is not None and key in self._urls:
+            return self._suppress(self._urls[key], text)
+        fingerprint = simhash(text) if len(text) >= self.min_chars else None
+        if fingerprint is not None:
+            for seen, seen_label in self._fingerprints:
+                if hamming(fingerprint, seen) <= self.max_distance:
+                    if key is not None:
+                        self._urls[key] = seen_label
+                    return self._suppress(seen_label, text)
+            self._fingerprints.append((fingerprint, label))
+        if key is not None:
+            self._urls[key] = label
+        return None
+
+    def _suppress(self, original: str, text: str) -> str:
+        self.suppressed += 1
+        self.suppressed_bytes += max(0, len(text.encode("utf-8")) - len(back_reference(original)))
+        return original
+
+    def stats(self) -> dict[str, int]:
+        """Items suppressed for this stage and the bytes they would have cost."""
+        return {"suppressed": self.suppressed, "suppressed_bytes": self.suppressed_bytes}
+
+
+def back_reference(original: str) -> str:
+    """Placeholder shown to the model in place of repeated content."""
+    return f"[Duplicate of earlier result {original} — omitted]"
+
+
+def stage_deduper(deps: Any, stage: str, reset: bool = False) -> ContentDeduper:
+    """Return the stage's deduper, creating it on the context on first use.
+
+    Pass `reset=True` when a stage (re)starts its agent run from scratch: the
+    new run has not seen anything the previous one was shown.
+
+    Environment variables:
+        DEDUP_MAX_DISTANCE: SimHash Hamming distance treated as near-duplicate (default 3).
+        DEDUP_MIN_CHARS: Shortest text fingerprinted for near-duplicates (default 200).
+    """
+    if getattr(deps, "dedup", None) is None:
+        deps.dedup = {}
+    if reset or stage not in deps.dedup:
+        deps.dedup[stage] = ContentDeduper(
+            max_distance=int(os.environ.get("DEDUP_MAX_DISTANCE", "3")),
+            min_chars=int(os.environ.get("DEDUP_MIN_CHARS", "200")),
+        )
+    return deps.dedup[stage]
@@ -0,0 +1,52 @@
+"""Shared pooled httpx client for the tools' plain-HTTP calls.
+
+One `AsyncClient` per event loop keeps TCP/TLS connections warm across
+tool calls (scrape revalidation, static page fetches, API lookups). The
+FastAPI lifespan closes it on shutdown via `close_http_client()`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+
+import httpx
+
+_USER_AGENT = "Mozilla/5.0 (compatible; Buzz-HC/0.1; +https://github.com/james-sexton96/buzz-hc)"
+
+_client: httpx.AsyncClient | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it for the running event loop.
+
+    Environment variables:
+        HTTP_MAX_CONNECTIONS: Pool-wide connection cap (default 50).
+        HTTP_MAX_KEEPALIVE: Idle keep-alive connections retained (default 20).
+        HTTP_TIMEOUT: Per-request timeout in seconds (default 20).
+    """
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        # A client is bound to the loop that created it (e.g. a fresh
+        # asyncio.run in the CLI) — never share one across loops.
+        _client = httpx.AsyncClient(
+            follow_redirects=True,
+            timeout=httpx.Timeout(float(os.environ.get("HTTP_TIMEOUT", "20"))),
+            limits=httpx.Limits(
+                max_connections=int(os.environ.get("HTTP_MAX_CONNECTIONS", "50")),
+                max_keepalive_connections=int(os.environ.get("HTTP_MAX_KEEPALIVE", "20")),
+            ),
+            headers={"User-Agent": _USER_AGENT},
+        )
+        _client_loop = loop
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared client if one is open."""
+    global _client, _client_loop
+    client, _client, _client_loop = _client, None, None
+    if client is not None and not client.is_closed:
+        await client.aclose()
@@ -0,0 +1,184 @@
+"""Query-focused passage selection for scraped pages.
+
+Payer policy pages and FDA labels often run to tens of thousands of
+characters, most of it irrelevant to the agent's question. `rank_passages`
+splits the page Markdown into heading-aware chunks, scores them against the
+query with BM25, and keeps the best chunks — in document order, each
+prefixed with its heading trail — until a character budget is spent.
+
+Pure Python and CPU-bound: call it through `asyncio.to_thread` from async code.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+
+_SEPARATOR = "\n\n…\n\n"
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.*\S)\s*$")
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9\-]*")
+
+# Words too common in pharma/web prose to carry ranking signal.
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this "
+    "to was were will with what which who how when where why does do".split()
+)
+
+
+@dataclass
+class Passage:
+    """A contiguous chunk of a page with the headings it sits under."""
+
+    index: int
+    headings: list[str]
+    text: str
+
+    def render(self) -> str:
+        trail = " > ".join(self.headings)
+        return f"[{trail}]\n{self.text}" if trail else self.text
+
+
+@dataclass
+class RankedPassages:
+    """Selected passages plus compression accounting."""
+
+    text: str
+    original_chars: int
+    kept_passages: int
+    total_passages: int
+    scores: list[float] = field(default_factory=list)
+
+    @property
+    def compression_ratio(self) -> float:
+        """Kept characters over original characters (1.0 = nothing dropped)."""
+        if not self.original_chars:
+            return 1.0
+        return round(len(self.text) / self.original_chars, 3)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens with stopwords removed."""
+    return [t for t in _WORD_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def chunk_markdown(markdown: str, max_chars: int = 1200) -> list[Passage]:
+    """Split Markdown into passages that never straddle a heading.
+
+    Sections longer than `max_chars` are split on paragraph boundaries;
+    a single oversized paragraph is kept whole rather than cut mid-sentence.
+    """
+    passages: list[Passage] = []
+    trail: list[tuple[int, str]] = []
+    buffer: list[str] = []
+
+    def flush() -> None:
+        body = "\n".join(buffer).strip()
+        buffer.clear()
+        if not body:
+            return
+        headings = [h for _, h in trail]
+        current: list[str] = []
+        size = 0
+        for para in re.split(r"\n\s*\n", body):
+            para = para.strip()
+            if not para:
+                continue
+            if current and size + len(para) > max_chars:
+                passages.append(Passage(len(passages), headings, "\n\n".join(current)))
+                current, size = [], 0
+            current.append(para)
+            size += len(para) + 2
+        if current:
+            passages.append(Passage(len(passages), headings, "\n\n".join(current)))
+
+    for line in markdown.splitlines():
+        m = _HEADING_RE.match(line)
+        if m:
+            flush()
+            level = len(m.group(1))
+            trail = [(lvl, h) for lvl, h in trail if lvl < level]
+            trail.append((level, m.group(2).strip("# ").strip()))
+        else:
+            buffer.append(line)
+    flush()
+    return passages
+
+
+def bm25_scores(
+    passages: list[Passage],
+    query: str,
+    k1: float = 1.5,
+    b: float = 0.75,
+) -> list[float]:
+    """Okapi BM25 score of each passage (heading trail included) for `query`."""
+    docs = [tokenize(" ".join(p.headings) + " " + p.text) for p in passages]
+    terms = set(tokenize(query))
+    if not docs or not terms:
+        return [0.0] * len(passages)
+    n = len(docs)
+    avgdl = sum(len(d) for d in docs) / n or 1.0
+    df = Counter(t for d in docs for t in set(d) if t in terms)
+    idf = {t: math.log(1 + (n - df[t] + 0.5) / (df[t] + 0.5)) for t in terms}
+    scores = []
+    for d in docs:
+        tf = Counter(d)
+        dl = len(d) or 1
+        score = 0.0
+        for t in terms:
+            f = tf.get(t, 0)
+            if f:
+                score += idf[t] * f * (k1 + 1) / (f + k1 * (1 - b + b * dl / avgdl))
+        scores.append(score)
+    return scores
+
+
+def rank_passages(
+    markdown: str,
+    query: str,
+    top_k: int = 8,
+    char_budget: int = 8000,
+) -> RankedPassages:
+    """Keep the `top_k` most query-relevant passages that fit in `char_budget`.
+
+    Pages already within budget are returned unchanged. If nothing matches the
+    query, the leading passages are kept so the agent still sees the page.
+    """
+    original = len(markdown)
+    if original <= char_budget:
+        return RankedPassages(markdown, original, 1, 1)
+    passages = chunk_markdown(markdown)
+    scores = bm25_scores(passages, query)
+    if any(scores):
+        order = sorted(range(len(passages)), key=lambda i: (-scores[i], i))
+    else:
+        order = list(range(len(passages)))
+
+    chosen: list[int] = []
+    used = 0
+    for i in order:
+        if len(chosen) >= top_k:
+            break
+        if any(scores) and scores[i] <= 0:
+            break
+        cost = len(passages[i].render()) + len(_SEPARATOR)
+        if used + cost > char_budget:
+            continue
+        chosen.append(i)
+        used += cost
+    if not chosen and passages:
+        # Every passage alone exceeds the budget: fall back to a clipped best one.
+        best = passages[order[0]].render()
+        chosen_text = best[:char_budget]
+        return RankedPassages(chosen_text, original, 1, len(passages), [scores[order[0]]])
+
+    chosen.sort()
+    text = _SEPARATOR.join(passages[i].render() for i in chosen)
+    return RankedPassages(
+        text,
+        original,
+        len(chosen),
+        len(passages),
+        [round(scores[i], 3) for i in chosen],
+    )
@@ -0,0 +1,295 @@
+"""Shared per-service and per-domain rate limiting for the tools.
+
+Several concurrent sessions share one process, so Tavily, ClinicalTrials.gov
+and whichever sites the agents scrape all see the sum of their traffic.
+Every outbound call goes through `limited(key, call)`:
+
+- a token bucket per key (`tavily`, `clinicaltrials`, `domain:<host>`)
+  smooths bursts to a sustained rate while still allowing short bursts;
+- a throttled response (HTTP 429/503, or Tavily's usage-limit error) pauses
+  the whole bucket until its Retry-After, so sibling calls stop piling on.
+  Scraped hosts only count as throttling on a 429 or a 503 carrying a
+  Retry-After: bot checks and JS interstitials are commonly served as a bare
+  503 and belong to the browser tier;
+- the call is retried with jittered exponential backoff, up to a cap.
+
+Time spent waiting on the limiter is returned to the caller (for the tool
+event's `details`) and accumulated per key for `stats()`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import random
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, TypeVar
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# (requests per second, burst) per service; domains use RATE_LIMIT_DOMAIN.
+DEFAULT_LIMITS: dict[str, tuple[float, int]] = {
+    "tavily": (5.0, 10),
+    "clinicaltrials": (10.0, 20),
+}
+_DEFAULT_DOMAIN_LIMIT = (2.0, 4)
+_THROTTLE_STATUSES = frozenset({429, 503})
+
+
+class RateLimited(Exception):
+    """The service asked us to slow down; `retry_after` is in seconds if it said."""
+
+    def __init__(self, message: str, retry_after: float | None = None) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def throttle_of(exc: BaseException) -> RateLimited | None:
+    """Recognise a throttling error from any of the clients the tools use."""
+    if isinstance(exc, RateLimited):
+        return exc
+    if isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code in _THROTTLE_STATUSES:
+        return RateLimited(str(exc), parse_retry_after(exc.response.headers.get("retry-after")))
+    # tavily-python raises UsageLimitExceededError on 429; match by name so
+    # this module does not import the optional SDK.
+    if any(cls.__name__ == "UsageLimitExceededError" for cls in type(exc).__mro__):
+        retry_after = getattr(exc, "retry_after_seconds", None)
+        return RateLimited(str(exc), float(retry_after) if retry_after is not None else None)
+    return None
+
+
+def is_host_throttle(status_code: int | None, retry_after: str | None) -> bool:
+    """Whether a scraped host's status asks us to slow down: 429, or 503 with a Retry-After."""
+    return status_code == 429 or (status_code == 503 and retry_after is not None)
+
+
+def raise_for_throttle(response: httpx.Response) -> None:
+    """Raise RateLimited for a scraped host's throttling response (see `is_host_throttle`)."""
+    retry_after = response.headers.get("retry-after")
+    if is_host_throttle(response.status_code, retry_after):
+        raise RateLimited(f"HTTP {response.status_code} from {response.url.host}", parse_retry_after(retry_after))
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, holding at most `burst`.
+
+    Acquirers reserve a token synchronously — the balance may go negative —
+    and then sleep off their share of the debt, so no lock is needed and the
+    bucket is safe to share across event loops.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+
+    def pause(self, seconds: float) -> None:
+        """Hold every acquirer for `seconds` (e.g. a server's Retry-After)."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def reserve(self) -> float:
+        """Take one token now; return how long the caller must wait before using it."""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= 1
+        debt = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        return max(debt, self._paused_until - now)
+
+    async def acquire(self) -> float:
+        """Take one token, sleeping as needed; return the seconds waited."""
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return max(delay, 0.0)
+
+
+@dataclass
+class KeyStats:
+    """Per-key counters reported by `RateLimiter.stats()`."""
+
+    calls: int = 0
+    throttled: int = 0
+    retries: int = 0
+    wait_s: float = 0.0
+
+
+def parse_limits(spec: str) -> dict[str, tuple[float, int]]:
+    """Parse 'tavily=5:10,clinicaltrials=10' into key → (rate, burst).
+
+    A missing burst defaults to twice the rate (at least 1).
+    """
+    limits: dict[str, tuple[float, int]] = {}
+    for item in spec.split(","):
+        key, _, value = item.partition("=")
+        if not key.strip() or not value.strip():
+            continue
+        rate, _, burst = value.partition(":")
+        try:
+            limits[key.strip().lower()] = (
+                float(rate),
+                int(burst) if burst.strip() else max(1, int(float(rate) * 2)),
+            )
+        except ValueError:
+            logger.warning("Ignoring invalid rate limit entry: %s", item)
+    return limits
+
+
+class RateLimiter:
+    """Token buckets keyed by service or `domain:<host>`, plus retry policy."""
+
+    def __init__(
+        self,
+        limits: dict[str, tuple[float, int]] | None = None,
+        domain_limit: tuple[float, int] = _DEFAULT_DOMAIN_LIMIT,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+    ) -> None:
+        self.limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self.domain_limit = domain_limit
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._buckets: dict[str, TokenBucket] = {}
+        self._stats: dict[str, KeyStats] = {}
+
+    def bucket(self, key: str) -> TokenBucket:
+        """The bucket for `key`, created from the configured limits on first use."""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            rate, burst = self.limits.get(key, self.domain_limit)
+            bucket = self._buckets[key] = TokenBucket(rate, burst)
+        return bucket
+
+    def backoff(self, attempt: int, retry_after: float | None = None) -> float:
+        """Full-jitter exponential delay for `attempt` (0-based), never below Retry-After."""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+        return max(delay, retry_after or 0.0)
+
+    async def run(self, key: str, call: Callable[[], Awaitable[T]]) -> tuple[T, float]:
+        """Run `call` under `key`'s bucket, retrying throttled attempts.
+
+        Returns (result, seconds spent waiting on the limiter and backoff).
+        The last throttling error is re-raised once retries are exhausted;
+        any other exception propagates immediately.
+        """
+        bucket = self.bucket(key)
+        stats = self._stats.setdefault(key, KeyStats())
+        waited = 0.0
+        attempt = 0
+        while True:
+            waited += await bucket.acquire()
+            stats.calls += 1
+            try:
+                result = await call()
+            except Exception as e:
+                throttle = throttle_of(e)
+                if throttle is None:
+                    raise
+                stats.throttled += 1
+                if attempt >= self.max_retries:
+                    stats.wait_s += waited
+                    raise
+                delay = self.backoff(attempt, throttle.retry_after)
+                if throttle.retry_after is not None:
+                    bucket.pause(throttle.retry_after)
+                logger.info("%s throttled (attempt %d); retrying in %.2fs", key, attempt + 1, delay)
+                stats.retries += 1
+                attempt += 1
+                await asyncio.sleep(delay)
+                waited += delay
+                continue
+            stats.wait_s += waited
+            return result, waited
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Per-key calls, throttles, retries and cumulative wait seconds."""
+        return {
+            key: {
+                "calls": s.calls,
+                "throttled": s.throttled,
+                "retries": s.retries,
+                "wait_s": round(s.wait_s, 3),
+            }
+            for key, s in self._stats.items()
+        }
+
+
+def domain_key(url: str) -> str:
+    """Limiter key for a scraped URL's host (`www.` folded into the bare domain)."""
+    return "domain:" + (urlsplit(url).hostname or "").lower().removeprefix("www.")
+
+
+_UNSET: Any = object()
+_limiter: RateLimiter | None = _UNSET
+
+
+def get_rate_limiter() -> RateLimiter | None:
+    """Return the process-wide limiter, building it from env on first use.
+
+    Environment variables:
+        RATE_LIMIT_ENABLED: '0' disables limiting and retries (default '1').
+        RATE_LIMITS: Per-key 'rate:burst' overrides, 'tavily=5:10,clinicaltrials=10:20,domain:fda.gov=1:2'.
+        RATE_LIMIT_DOMAIN: Default 'rate:burst' for scraped domains (default '2:4').
+        RATE_LIMIT_MAX_RETRIES: Retries after a throttled response (default 3).
+        RATE_LIMIT_BACKOFF_BASE: First backoff ceiling in seconds, doubled per retry (default 0.5).
+        RATE_LIMIT_BACKOFF_MAX: Backoff ceiling in seconds (default 30).
+    """
+    global _limiter
+    if _limiter is _UNSET:
+        if os.environ.get("RATE_LIMIT_ENABLED", "1").strip() in {"0", "false", "no"}:
+            _limiter = None
+        else:
+            domain = parse_limits("domain=" + os.environ.get("RATE_LIMIT_DOMAIN", "2:4"))
+            _limiter = RateLimiter(
+                limits=parse_limits(os.environ.get("RATE_LIMITS", "")),
+                domain_limit=domain.get("domain", _DEFAULT_DOMAIN_LIMIT),
+                max_retries=int(os.environ.get("RATE_LIMIT_MAX_RETRIES", "3")),
+                backoff_base=float(os.environ.get("RATE_LIMIT_BACKOFF_BASE", "0.5")),
+                backoff_max=float(os.environ.get("RATE_LIMIT_BACKOFF_MAX", "30")),
+            )
+    return _limiter
+
+
+def set_rate_limiter(limiter: RateLimiter | None) -> None:
+    """Install a custom limiter, or None to disable limiting."""
+    global _limiter
+    _limiter = limiter
+
+
+async def limited(key: str, call: Callable[[], Awaitable[T]]) -> tuple[T, float]:
+    """Run `call` through the shared limiter (or directly if disabled).
+
+    Returns (result, seconds waited on the limiter).
+    """
+    limiter = get_rate_limiter()
+    if limiter is None:
+        return await call(), 0.0
+    return await limiter.run(key, call)
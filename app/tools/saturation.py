@@ -0,0 +1,165 @@
+"""Evidence-saturation early stopping for the researcher and analyst loops.
+
+The sub-agents keep calling tools until they decide to stop or run out of
+budget, and their late calls mostly return sources and passages they have
+already seen. Each stage's tool outputs pass through a `SaturationMonitor`
+held on the run's `ResearchContext`, which scores every call's novelty:
+
+- new sources: canonical URLs (or trial IDs) the stage has not seen before;
+- new content: the share of the output's word shingles not seen before
+  (URLs and de-duplication back-references are ignored).
+
+A call with no new source and less than SATURATION_MIN_NOVELTY new content is
+low-novelty. After SATURATION_PATIENCE consecutive low-novelty calls (once at
+least SATURATION_MIN_CALLS calls have been made) the stage is saturated: a
+`Saturation` info event is recorded and every further tool result ends with
+a note telling the agent to finalize. With SATURATION_MODE=refuse the tools
+are also withdrawn (see `refuse_when_saturated`), so the next model turn can
+only produce the findings. A novel result lifts saturation again.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any
+
+from pydantic_ai import RunContext
+from pydantic_ai.tools import ToolDefinition
+
+from app.tools.dedup import canonical_url
+
+_URL_RE = re.compile(r"https?://[^\s\"'<>)\]\\,]+")
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_BACK_REFERENCE_RE = re.compile(r"\[Duplicate of earlier result .*? — omitted\]")
+_SHINGLE = 5
+
+
+def saturation_mode() -> str:
+    """SATURATION_MODE: 'message' (default), 'refuse' or 'off'."""
+    mode = os.environ.get("SATURATION_MODE", "message").strip().lower()
+    return mode if mode in ("message", "refuse", "off") else "message"
+
+
+def finalize_note(patience: int) -> str:
+    """Note appended to tool results once the stage is saturated."""
+    return (
+        f"\n\n[Evidence saturation: your last {patience} tool calls returned no new sources and "
+        "little new content. Stop calling tools and return your findings now, recording "
+        "anything still missing as a gap.]"
+    )
+
+
+def _shingles(text: str) -> set[int]:
+    # URLs are scored as sources; back-references stand for content already seen.
+    words = _WORD_RE.findall(_URL_RE.sub(" ", _BACK_REFERENCE_RE.sub(" ", text)).lower())
+    if len(words) < _SHINGLE:
+        return {hash(tuple(words))} if words else set()
+    return {hash(tuple(words[i : i + _SHINGLE])) for i in range(len(words) - _SHINGLE + 1)}
+
+
+@dataclass
+class SaturationMonitor:
+    """Novelty of one stage's tool calls during a run."""
+
+    patience: int = 2
+    min_novelty: float = 0.2
+    min_calls: int = 3
+    calls: int = 0
+    streak: int = 0
+    history: list[dict[str, Any]] = field(default_factory=list)
+    _sources: set[str] = field(default_factory=set)
+    _shingles: set[int] = field(default_factory=set)
+
+    @property
+    def saturated(self) -> bool:
+        return self.calls >= self.min_calls and self.streak >= self.patience
+
+    def observe(self, tool: str, text: str, sources: list[str] | None = None) -> dict[str, Any]:
+        """Record one tool result and return its novelty scores.
+
+        `sources` defaults to the URLs found in `text`.
+        """
+        keys = {canonical_url(url.rstrip(".;:")) for url in _URL_RE.findall(text)} if sources is None else set(sources)
+        new_sources = keys - self._sources
+        shingles = _shingles(text)
+        new_content = round(len(shingles - self._shingles) / len(shingles), 3) if shingles else 0.0
+        self._sources |= keys
+        self._shingles |= shingles
+        self.calls += 1
+        low = not new_sources and new_content < self.min_novelty
+        self.streak = self.streak + 1 if low else 0
+        record = {"tool": tool, "new_sources": len(new_sources), "new_content": new_content, "low_novelty": low}
+        self.history.append(record)
+        return record
+
+    def stats(self) -> dict[str, Any]:
+        """Calls, unique sources and per-call novelty so far."""
+        return {
+            "calls": self.calls,
+            "unique_sources": len(self._sources),
+            "low_novelty_streak": self.streak,
+            "history": self.history,
+        }
+
+
+def stage_monitor(deps: Any, stage: str, reset: bool = False) -> SaturationMonitor:
+    """Return the stage's monitor, creating it on the context on first use.
+
+    Pass `reset=True` when a stage (re)starts its agent run from scratch.
+
+    Environment variables:
+        SATURATION_PATIENCE: Consecutive low-novelty calls before finalizing (default 2).
+        SATURATION_MIN_NOVELTY: Share of new content below which a call is low-novelty (default 0.2).
+        SATURATION_MIN_CALLS: Tool calls a stage always gets before it can saturate (default 3).
+    """
+    if getattr(deps, "saturation", None) is None:
+        deps.saturation = {}
+    if reset or stage not in deps.saturation:
+        deps.saturation[stage] = SaturationMonitor(
+            patience=max(1, int(os.environ.get("SATURATION_PATIENCE", "2"))),
+            min_novelty=float(os.environ.get("SATURATION_MIN_NOVELTY", "0.2")),
+            min_calls=int(os.environ.get("SATURATION_MIN_CALLS", "3")),
+        )
+    return deps.saturation[stage]
+
+
+async def observe_result(
+    deps: Any,
+    stage: str,
+    tool: str,
+    text: str,
+    sources: list[str] | None = None,
+) -> str:
+    """Score a tool result for `stage`; return the text, with the finalize note once saturated.
+
+    The `Saturation` event is recorded on the call that saturates the stage.
+    """
+    if saturation_mode() == "off":
+        return text
+    monitor = stage_monitor(deps, stage)
+    was_saturated = monitor.saturated
+    monitor.observe(tool, text, sources)
+    if not monitor.saturated:
+        return text
+    if not was_saturated:
+        await deps.add_event(
+            "info",
+            "Saturation",
+            f"{stage.capitalize()} saturated after {monitor.calls} tool calls "
+            f"({monitor.streak} in a row added nothing new); asking it to finalize",
+            details={"stage": stage, **monitor.stats()},
+        )
+    return text + finalize_note(monitor.patience)
+
+
+def refuse_when_saturated(stage: str):
+    """Tool `prepare` hook that withdraws the tool once `stage` is saturated (SATURATION_MODE=refuse)."""
+
+    async def prepare(ctx: RunContext[Any], tool_def: ToolDefinition) -> ToolDefinition | None:
+        if saturation_mode() == "refuse" and stage_monitor(ctx.deps, stage).saturated:
+            return None
+        return tool_def
+
+    return prepare
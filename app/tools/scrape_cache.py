@@ -0,0 +1,227 @@
+"""On-disk cache of scraped pages with HTTP revalidation and per-domain TTLs.
+
+Payer policy pages and FDA labels change rarely, so `deep_scrape` keeps the
+cleaned Markdown of every page it renders alongside the response's ETag,
+Last-Modified and a content hash. A fresh entry is served directly; a stale
+one is first revalidated with a cheap conditional GET. When the page changed,
+the body of that same GET goes to the plain-HTTP tier, so only a page that
+needs the browser (or cannot be revalidated) pays for another fetch; a page
+whose new Markdown hashes like the cached one is just marked fresh.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Seconds a cached page is served without revalidation, by registrable domain
+# suffix. Regulatory and CMS pages move slowly; news-like sources do not.
+DEFAULT_DOMAIN_TTLS: dict[str, float] = {
+    "fda.gov": 7 * 86400,
+    "cms.gov": 7 * 86400,
+    "ema.europa.eu": 7 * 86400,
+    "clinicaltrials.gov": 86400,
+    "uhcprovider.com": 3 * 86400,
+    "aetna.com": 3 * 86400,
+    "cigna.com": 3 * 86400,
+}
+
+
+@dataclass
+class ScrapeCacheEntry:
+    """A cached page plus the validators needed to revalidate it."""
+
+    url: str
+    markdown: str
+    content_hash: str
+    fetched_at: float
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 of the page Markdown — detects unchanged content across renders."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def parse_domain_ttls(spec: str) -> dict[str, float]:
+    """Parse 'fda.gov=604800,example.com=3600' into a domain → seconds map."""
+    ttls: dict[str, float] = {}
+    for item in spec.split(","):
+        domain, _, seconds = item.partition("=")
+        if domain.strip() and seconds.strip():
+            try:
+                ttls[domain.strip().lower()] = float(seconds)
+            except ValueError:
+                logger.warning("Ignoring invalid scrape cache TTL entry: %s", item)
+    return ttls
+
+
+class ScrapeCache:
+    """Directory of JSON entries, one file per URL."""
+
+    def __init__(
+        self,
+        directory: Path,
+        default_ttl: float = 86400.0,
+        domain_ttls: dict[str, float] | None = None,
+    ) -> None:
+        self.directory = Path(directory)
+        self.default_ttl = default_ttl
+        self.domain_ttls = {**DEFAULT_DOMAIN_TTLS, **(domain_ttls or {})}
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def _path(self, url: str) -> Path:
+        return self.directory / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json"
+
+    def ttl_for(self, url: str) -> float:
+        """TTL for a URL: the longest matching domain suffix wins."""
+        host = (urlsplit(url).hostname or "").lower()
+        best: tuple[int, float] | None = None
+        for domain, ttl in self.domain_ttls.items():
+            if host == domain or host.endswith("." + domain):
+                if best is None or len(domain) > best[0]:
+                    best = (len(domain), ttl)
+        return best[1] if best else self.default_ttl
+
+    def is_fresh(self, entry: ScrapeCacheEntry, now: float | None = None) -> bool:
+        """Whether the entry is still within its domain TTL."""
+        return ((now or time.time()) - entry.fetched_at) < self.ttl_for(entry.url)
+
+    async def get(self, url: str) -> ScrapeCacheEntry | None:
+        """Load the entry for `url`, or None if absent or unreadable."""
+        path = self._path(url)
+
+        def _read() -> ScrapeCacheEntry | None:
+            if not path.is_file():
+                return None
+            try:
+                return ScrapeCacheEntry(**json.loads(path.read_text()))
+            except Exception as e:
+                logger.warning("Discarding unreadable scrape cache entry %s: %s", path, e)
+                return None
+
+        return await asyncio.to_thread(_read)
+
+    async def put(
+        self,
+        url: str,
+        markdown: str,
+        headers: dict[str, Any] | None = None,
+    ) -> ScrapeCacheEntry:
+        """Store freshly rendered Markdown with the response validators."""
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        entry = ScrapeCacheEntry(
+            url=url,
+            markdown=markdown,
+            content_hash=content_hash(markdown),
+            fetched_at=time.time(),
+            etag=headers.get("etag"),
+            last_modified=headers.get("last-modified"),
+        )
+        await self._write(entry)
+        return entry
+
+    async def touch(self, entry: ScrapeCacheEntry, headers: dict[str, Any] | None = None) -> None:
+        """Mark a revalidated entry fresh again, adopting any updated validators."""
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        entry.fetched_at = time.time()
+        entry.etag = headers.get("etag") or entry.etag
+        entry.last_modified = headers.get("last-modified") or entry.last_modified
+        await self._write(entry)
+
+    async def _write(self, entry: ScrapeCacheEntry) -> None:
+        path = self._path(entry.url)
+
+        def _write_file() -> None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(asdict(entry)))
+            tmp.replace(path)
+
+        try:
+            await asyncio.to_thread(_write_file)
+        except Exception as e:
+            logger.warning("Scrape cache write failed for %s: %s", entry.url, e)
+
+    def stats(self) -> dict[str, int]:
+        """Counters for fresh hits, successful revalidations and misses."""
+        return {"hits": self.hits, "revalidated": self.revalidated, "misses": self.misses}
+
+
+async def revalidate(entry: ScrapeCacheEntry) -> tuple[bool, dict[str, Any], Any]:
+    """Ask the origin whether a cached page changed, via a conditional GET.
+
+    Returns (unchanged, response_headers, response). `response` is the full
+    httpx response of a changed page, for the caller to convert instead of
+    fetching it again; None when unchanged or when no response came back.
+    Entries without validators cannot be revalidated cheaply and always
+    report changed.
+    """
+    if not entry.etag and not entry.last_modified:
+        return False, {}, None
+    from app.tools.http_client import get_http_client
+    from app.tools.rate_limit import domain_key, limited, raise_for_throttle
+
+    async def conditional_get() -> Any:
+        response = await get_http_client().get(entry.url, headers=headers)
+        raise_for_throttle(response)
+        return response
+
+    headers: dict[str, str] = {}
+    if entry.etag:
+        headers["If-None-Match"] = entry.etag
+    if entry.last_modified:
+        headers["If-Modified-Since"] = entry.last_modified
+    try:
+        response, _ = await limited(domain_key(entry.url), conditional_get)
+    except Exception as e:
+        logger.info("Revalidation request failed for %s: %s", entry.url, e)
+        return False, {}, None
+    if response.status_code == 304:
+        return True, dict(response.headers), None
+    return False, dict(response.headers), response
+
+
+_UNSET: Any = object()
+_scrape_cache: ScrapeCache | None = _UNSET
+
+
+def get_scrape_cache() -> ScrapeCache | None:
+    """Return the process-wide scrape cache, building it from env on first use.
+
+    Environment variables:
+        SCRAPE_CACHE_ENABLED: '0' disables caching (default '1').
+        SCRAPE_CACHE_DIR: Entry directory (default ./data/scrape_cache).
+        SCRAPE_CACHE_TTL: Default TTL in seconds (default 86400).
+        SCRAPE_CACHE_DOMAIN_TTLS: Per-domain overrides, 'fda.gov=604800,...'.
+    """
+    global _scrape_cache
+    if _scrape_cache is _UNSET:
+        if os.environ.get("SCRAPE_CACHE_ENABLED", "1").strip() in {"0", "false", "no"}:
+            _scrape_cache = None
+        else:
+            _scrape_cache = ScrapeCache(
+                Path(os.environ.get("SCRAPE_CACHE_DIR", "./data/scrape_cache")),
+                default_ttl=float(os.environ.get("SCRAPE_CACHE_TTL", "86400")),
+                domain_ttls=parse_domain_ttls(os.environ.get("SCRAPE_CACHE_DOMAIN_TTLS", "")),
+            )
+    return _scrape_cache
+
+
+def set_scrape_cache(cache: ScrapeCache | None) -> None:
+    """Install a custom scrape cache, or None to disable it."""
+    global _scrape_cache
+    _scrape_cache = cache
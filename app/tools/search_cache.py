@@ -0,0 +1,250 @@
+"""Persistent TTL cache for web search results (SQLite-backed, LRU-evicted).
+
+The researcher and analyst agents routinely issue the same — or nearly the
+same — Tavily query within a run, and scenario reruns repeat them across runs.
+`tavily_search` consults the process-wide cache returned by
+`get_search_cache()` before going to the network. Swap the backend with
+`set_search_cache()` (pass None to disable caching entirely).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any
+
+import aiosqlite
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"[\w\-\.]+", re.UNICODE)
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a search query so trivially different phrasings share a key.
+
+    Casefolds, drops punctuation, de-duplicates tokens and sorts them — so
+    "GLP-1 market size 2030" and "market size  glp-1 2030?" hit the same entry.
+    """
+    tokens = {t.strip(".") for t in _TOKEN_RE.findall(query.casefold())}
+    return " ".join(sorted(t for t in tokens if t))
+
+
+def make_cache_key(query: str, max_results: int, search_depth: str) -> str:
+    """Build the cache key from the normalized query and search parameters."""
+    return f"{normalize_query(query)}|{max_results}|{search_depth}"
+
+
+class SearchCache(ABC):
+    """Base class for search-result caches.
+
+    Subclasses implement `_get` / `_set`; hit and miss accounting lives here so
+    every backend reports the same counters via `stats()`.
+    """
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    async def get(
+        self,
+        query: str,
+        max_results: int,
+        search_depth: str,
+    ) -> list[dict[str, Any]] | None:
+        """Return cached results for the query, or None on a miss/expiry."""
+        try:
+            value = await self._get(make_cache_key(query, max_results, search_depth))
+        except Exception as e:
+            # A broken cache must never break search — treat it as a miss.
+            logger.warning("Search cache read failed: %s", e)
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(
+        self,
+        query: str,
+        max_results: int,
+        search_depth: str,
+        results: list[dict[str, Any]],
+        ttl: float | None = None,
+    ) -> None:
+        """Store results for the query. `ttl` overrides the backend default."""
+        try:
+            await self._set(
+                make_cache_key(query, max_results, search_depth), query, results, ttl
+            )
+        except Exception as e:
+            logger.warning("Search cache write failed: %s", e)
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit/miss counters and the hit ratio."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+        }
+
+    @abstractmethod
+    async def _get(self, key: str) -> list[dict[str, Any]] | None:
+        """Return the live entry for `key`, or None."""
+
+    @abstractmethod
+    async def _set(
+        self,
+        key: str,
+        query: str,
+        results: list[dict[str, Any]],
+        ttl: float | None,
+    ) -> None:
+        """Store `results` under `key` for `ttl` seconds (None: the backend default)."""
+
+
+class SqliteSearchCache(SearchCache):
+    """SQLite-backed search cache with per-entry TTL and LRU size eviction."""
+
+    def __init__(
+        self,
+        path: Path,
+        ttl_seconds: float = 86400.0,
+        max_entries: int = 5000,
+    ) -> None:
+        super().__init__()
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._initialized = False
+
+    async def _connect(self) -> aiosqlite.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        db = await aiosqlite.connect(self.path)
+        if not self._initialized:
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS search_cache (
+                    cache_key     TEXT PRIMARY KEY,
+                    query         TEXT NOT NULL,
+                    results_json  TEXT NOT NULL,
+                    created_at    REAL NOT NULL,
+                    expires_at    REAL NOT NULL,
+                    last_accessed REAL NOT NULL
+                )
+            """)
+            await db.execute("""
+                CREATE INDEX IF NOT EXISTS idx_search_cache_last_accessed
+                ON search_cache(last_accessed)
+            """)
+            await db.commit()
+            self._initialized = True
+        return db
+
+    async def _get(self, key: str) -> list[dict[str, Any]] | None:
+        now = time.time()
+        db = await self._connect()
+        try:
+            async with db.execute(
+                "SELECT results_json, expires_at FROM search_cache WHERE cache_key=?",
+                (key,),
+            ) as cursor:
+                row = await cursor.fetchone()
+            if row is None:
+                return None
+            results_json, expires_at = row
+            if expires_at <= now:
+                await db.execute("DELETE FROM search_cache WHERE cache_key=?", (key,))
+                await db.commit()
+                return None
+            await db.execute(
+                "UPDATE search_cache SET last_accessed=? WHERE cache_key=?",
+                (now, key),
+            )
+            await db.commit()
+            return json.loads(results_json)
+        finally:
+            await db.close()
+
+    async def _set(
+        self,
+        key: str,
+        query: str,
+        results: list[dict[str, Any]],
+        ttl: float | None,
+    ) -> None:
+        now = time.time()
+        expires_at = now + (self.ttl_seconds if ttl is None else ttl)
+        db = await self._connect()
+        try:
+            await db.execute(
+                """
+                INSERT OR REPLACE INTO search_cache
+                    (cache_key, query, results_json, created_at, expires_at, last_accessed)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (key, query, json.dumps(results, default=str), now, expires_at, now),
+            )
+            # Drop expired rows, then evict least-recently-used beyond the cap.
+            await db.execute("DELETE FROM search_cache WHERE expires_at <= ?", (now,))
+            await db.execute(
+                """
+                DELETE FROM search_cache WHERE cache_key IN (
+                    SELECT cache_key FROM search_cache
+                    ORDER BY last_accessed DESC
+                    LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            )
+            await db.commit()
+        finally:
+            await db.close()
+
+    async def size(self) -> int:
+        """Return the number of stored entries (including not-yet-purged expired ones)."""
+        db = await self._connect()
+        try:
+            async with db.execute("SELECT COUNT(*) FROM search_cache") as cursor:
+                row = await cursor.fetchone()
+            return int(row[0]) if row else 0
+        finally:
+            await db.close()
+
+
+_UNSET: Any = object()
+_search_cache: SearchCache | None = _UNSET
+
+
+def get_search_cache() -> SearchCache | None:
+    """Return the process-wide search cache, building it from env on first use.
+
+    Environment variables:
+        SEARCH_CACHE_ENABLED: '0' disables caching (default '1').
+        SEARCH_CACHE_PATH: SQLite file (default ./data/search_cache.db).
+        SEARCH_CACHE_TTL: Entry lifetime in seconds (default 86400).
+        SEARCH_CACHE_MAX_ENTRIES: LRU size cap (default 5000).
+    """
+    global _search_cache
+    if _search_cache is _UNSET:
+        if os.environ.get("SEARCH_CACHE_ENABLED", "1").strip() in {"0", "false", "no"}:
+            _search_cache = None
+        else:
+            _search_cache = SqliteSearchCache(
+                Path(os.environ.get("SEARCH_CACHE_PATH", "./data/search_cache.db")),
+                ttl_seconds=float(os.environ.get("SEARCH_CACHE_TTL", "86400")),
+                max_entries=int(os.environ.get("SEARCH_CACHE_MAX_ENTRIES", "5000")),
+            )
+    return _search_cache
+
+
+def set_search_cache(cache: SearchCache | None) -> None:
+    """Install a custom cache backend, or None to disable search caching."""
+    global _search_cache
+    _search_cache = cache
@@ -0,0 +1,239 @@
+"""Per-tool token budgets for tool results.
+
+Every tool result is replayed to the model on each later turn of the
+researcher and analyst loops, so one oversized scrape or a 50-row trials
+list makes every subsequent turn slower and more expensive. Tool outputs
+pass through this module before they are returned:
+
+- text results are cut to the tool's budget structure-aware: headings and
+  Markdown tables are kept, prose fills the remaining budget in document
+  order, and the tail is dropped with a marker saying how much was cut;
+- list results (e.g. trial summaries) keep the leading items that fit.
+
+Token counts are a local estimate — `tiktoken` when installed, otherwise a
+word/character heuristic — so no request leaves the process.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Sequence, TypeVar
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+_HEADING_RE = re.compile(r"^#{1,6}\s+\S")
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+# Marker appended to truncated text; reserved out of the budget up front.
+_MARKER_TOKENS = 24
+# Below this many spare tokens a prose block is dropped rather than cut mid-way.
+_MIN_PARTIAL_TOKENS = 32
+
+DEFAULT_BUDGETS: dict[str, int] = {
+    "tavily_search": 3000,
+    "tavily_batch_search": 6000,
+    "deep_scrape": 4000,
+    "deep_scrape_many": 10000,
+    "search_clinical_trials": 2500,
+}
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+_encoder: Any = None
+
+
+def _get_encoder() -> Any:
+    """tiktoken's cl100k encoder if the package is installed, else False."""
+    global _encoder
+    if _encoder is None:
+        try:
+            import tiktoken
+
+            _encoder = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:  # ImportError, or no cached BPE file offline
+            logger.debug("tiktoken unavailable, using heuristic token estimate: %s", e)
+            _encoder = False
+    return _encoder
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of `text` without calling the model.
+
+    Uses tiktoken when available; otherwise the larger of the word/punctuation
+    count and characters / 4, which tracks BPE tokenizers closely on English
+    prose and errs high on URLs and tables.
+    """
+    if not text:
+        return 0
+    encoder = _get_encoder()
+    if encoder:
+        return len(encoder.encode(text, disallowed_special=()))
+    return max(len(_TOKEN_RE.findall(text)), math.ceil(len(text) / 4))
+
+
+def parse_budgets(spec: str) -> dict[str, int]:
+    """Parse 'deep_scrape=4000,tavily_search=2000' into a tool → tokens map."""
+    budgets: dict[str, int] = {}
+    for item in spec.split(","):
+        tool, _, tokens = item.partition("=")
+        if tool.strip() and tokens.strip():
+            try:
+                budgets[tool.strip()] = int(tokens)
+            except ValueError:
+                logger.warning("Ignoring invalid tool token budget entry: %s", item)
+    return budgets
+
+
+def tool_budget(tool: str) -> int | None:
+    """Token budget for a tool's result, or None if unbounded.
+
+    Environment variables:
+        TOOL_TOKEN_BUDGET: Budget for tools without a specific entry (default 4000).
+        TOOL_TOKEN_BUDGETS: Per-tool overrides, 'deep_scrape=4000,tavily_search=3000,...'.
+            A budget of 0 disables truncation for that tool.
+    """
+    budgets = {**DEFAULT_BUDGETS, **parse_budgets(os.environ.get("TOOL_TOKEN_BUDGETS", ""))}
+    budget = budgets.get(tool)
+    if budget is None:
+        budget = int(os.environ.get("TOOL_TOKEN_BUDGET", "4000"))
+    return budget if budget > 0 else None
+
+
+@dataclass
+class ShapedResult:
+    """A tool result after budget enforcement, plus size accounting."""
+
+    text: str
+    budget: int | None
+    tokens: int
+    original_tokens: int
+    original_chars: int
+    omitted_blocks: int = 0
+
+    @property
+    def truncated(self) -> bool:
+        return self.tokens < self.original_tokens
+
+    def details(self) -> dict[str, Any]:
+        """Event `details` payload describing the truncation."""
+        return {
+            "budget": self.budget,
+            "tokens": self.tokens,
+            "original_tokens": self.original_tokens,
+            "original_chars": self.original_chars,
+            "truncated": self.truncated,
+            "omitted_blocks": self.omitted_blocks,
+        }
+
+
+def _blocks(text: str) -> list[tuple[str, str]]:
+    """Split Markdown into (kind, text) blocks: 'heading', 'table' or 'prose'."""
+    blocks: list[tuple[str, str]] = []
+    for para in re.split(r"\n\s*\n", text.strip()):
+        pending: list[str] = []
+        for line in para.splitlines():
+            if _HEADING_RE.match(line):
+                if pending:
+                    blocks.append(_classify(pending))
+                    pending = []
+                blocks.append(("heading", line))
+            else:
+                pending.append(line)
+        if pending:
+            blocks.append(_classify(pending))
+    return blocks
+
+
+def _classify(lines: list[str]) -> tuple[str, str]:
+    body = "\n".join(lines)
+    if all(line.lstrip().startswith("|") for line in lines if line.strip()):
+        return "table", body
+    return "prose", body
+
+
+def _cut(text: str, tokens: int) -> str:
+    """Longest word-boundary prefix of `text` that fits in `tokens`."""
+    end = min(len(text), tokens * 4)
+    while end > 0:
+        prefix = text[:end] if end == len(text) else (text[:end].rsplit(None, 1) or [""])[0]
+        if prefix and estimate_tokens(prefix) <= tokens:
+            return prefix
+        end = int(end * 0.85)
+    return ""
+
+
+def truncate_markdown(text: str, budget: int | None) -> ShapedResult:
+    """Fit Markdown into `budget` tokens, keeping its structure.
+
+    Headings are kept first, then tables (whole, in document order, while
+    they fit), then prose in document order until the budget runs out — the
+    first prose block that does not fit is cut at a word boundary and every
+    later one is dropped. Kept blocks are emitted in their original order
+    with a trailing marker giving the original size.
+    """
+    original = estimate_tokens(text)
+    if budget is None or original <= budget:
+        return ShapedResult(text, budget, original, original, len(text))
+
+    blocks = _blocks(text)
+    costs = [estimate_tokens(body) for _, body in blocks]
+    kept: dict[int, str] = {}
+    remaining = budget - _MARKER_TOKENS
+    for wanted in ("heading", "table"):
+        for i, (kind, body) in enumerate(blocks):
+            if kind == wanted and costs[i] <= remaining:
+                kept[i] = body
+                remaining -= costs[i]
+    for i, (kind, body) in enumerate(blocks):
+        if kind != "prose":
+            continue
+        if costs[i] <= remaining:
+            kept[i] = body
+            remaining -= costs[i]
+            continue
+        if remaining >= _MIN_PARTIAL_TOKENS:
+            partial = _cut(body, remaining - 1)
+            if partial:
+                kept[i] = partial + " …"
+        break
+
+    omitted = sum(1 for i in range(len(blocks)) if i not in kept)
+    body = "\n\n".join(kept[i] for i in sorted(kept))
+    marker = f"[Truncated to ~{budget} of ~{original} tokens; {omitted} blocks omitted]"
+    shaped = f"{body}\n\n{marker}" if body else marker
+    return ShapedResult(shaped, budget, estimate_tokens(shaped), original, len(text), omitted)
+
+
+def shape_text(tool: str, text: str) -> ShapedResult:
+    """Enforce `tool`'s token budget on a text result."""
+    return truncate_markdown(text, tool_budget(tool))
+
+
+def shape_items(tool: str, items: Sequence[ModelT]) -> tuple[list[ModelT], ShapedResult]:
+    """Keep the leading items of a list result that fit `tool`'s budget.
+
+    At least one item is always kept so the agent never sees an empty list
+    for a search that did match. The returned `ShapedResult.text` is empty;
+    only its accounting is meaningful.
+    """
+    budget = tool_budget(tool)
+    costs = [estimate_tokens(item.model_dump_json(exclude_none=True)) for item in items]
+    original = sum(costs)
+    kept = len(items)
+    if budget is not None and original > budget:
+        total = 0
+        for kept, cost in enumerate(costs):
+            if kept and total + cost > budget:
+                break
+            total += cost
+        else:
+            kept = len(items)
+    tokens = sum(costs[:kept])
+    chars = sum(len(item.model_dump_json(exclude_none=True)) for item in items)
+    return list(items[:kept]), ShapedResult("", budget, tokens, original, chars, len(items) - kept)
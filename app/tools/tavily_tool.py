@@ -1,10 +1,17 @@
 """Tavily web search tool for broad search."""
 
+import asyncio
 import logging
+import os
 
 from pydantic_ai import RunContext
 
 from app.context import ResearchContext
+from app.tools.circuit_breaker import CircuitOpen, get_breaker, report_transition
+from app.tools.dedup import ContentDeduper, back_reference, canonical_url, stage_deduper
+from app.tools.rate_limit import limited
+from app.tools.search_cache import get_search_cache, normalize_query
+from app.tools.shaping import shape_text
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +21,8 @@ async def tavily_search(
     query: str,
     max_results: int = 5,
     search_depth: str = "basic",
+    *,
+    stage: str,
 ) -> str:
     """
     Run a Tavily web search and return a concatenated context string.
@@ -26,6 +35,7 @@ async def tavily_search(
         query: Search query.
         max_results: Max number of results to include (default 5).
         search_depth: 'basic' or 'advanced'.
+        stage: Calling stage ('researcher' or 'analyst'); results it was already shown are de-duplicated.
 
     Returns:
         Summary string of search results, or error/placeholder message.
@@ -40,22 +50,10 @@ async def tavily_search(
     if not api_key.strip():
         return "Tavily API key not set. Set TAVILY_API_KEY in environment and pass it via ResearchContext."
 
-    # LLMs love to hallucinate search_depth values like "deep" or "thorough"
-    valid_depths = {"basic", "advanced"}
-    if search_depth not in valid_depths:
-        search_depth = "basic"
-
     try:
-        await ctx.deps.add_event("tool_call", "Tavily", f"Searching: {query}")
-        client = AsyncTavilyClient(api_key=api_key)
-        response = await client.search(
-            query=query,
-            max_results=max_results,
-            search_depth=search_depth,
-        )
-        # Tavily SDK returns a plain dict, not a dataclass/object.
-        results = _get(response, "results") or []
-        await ctx.deps.add_event("tool_result", "Tavily", f"Found {len(results)} results")
+        results = await _search(ctx, AsyncTavilyClient(api_key=api_key), query, max_results, search_depth)
+    except CircuitOpen as e:
+        return f"Tavily unavailable: {e!s}. Continue with the evidence you already have."
     except Exception as e:
         logger.exception("Tavily search failed: %s", e)
         return f"Tavily search error: {e!s}"
@@ -63,13 +61,203 @@ async def tavily_search(
     if not results:
         return "No results from Tavily for this query."
 
+    dedup = stage_deduper(ctx.deps, stage)
+    before = dedup.suppressed
     parts = []
     for r in results[:max_results]:
         title = _get(r, "title") or ""
         url = _get(r, "url") or ""
-        content = _get(r, "content") or ""
+        content = _dedupe(dedup, r)
         parts.append(f"## {title}\nURL: {url}\n\n{content}")
-    return "\n\n".join(parts)
+    await _report_dedup(ctx, dedup, before)
+    return await _shape(ctx, "tavily_search", "\n\n".join(parts))
+
+
+async def tavily_batch_search(
+    ctx: RunContext[ResearchContext],
+    queries: list[str],
+    max_results: int = 5,
+    search_depth: str = "basic",
+    *,
+    stage: str,
+) -> str:
+    """
+    Run several Tavily searches concurrently and return one merged context block.
+
+    Queries run under a semaphore (TAVILY_BATCH_CONCURRENCY, default 4) and
+    near-duplicate queries are collapsed first. Results are de-duplicated by
+    URL and ranked by how many queries surfaced them, then by Tavily score;
+    each entry lists the queries that matched it.
+
+    Args:
+        ctx: Run context with ctx.deps.tavily_api_key.
+        queries: Search queries (capped at TAVILY_BATCH_MAX_QUERIES, default 8).
+        max_results: Max results per query.
+        search_depth: 'basic' or 'advanced'.
+        stage: Calling stage ('researcher' or 'analyst').
+
+    Returns:
+        Merged summary string of search results, or error/placeholder message.
+    """
+    try:
+        from tavily import AsyncTavilyClient
+    except ImportError as e:
+        logger.warning("tavily-python not available: %s", e)
+        return f"Tavily unavailable: {e!s}"
+
+    api_key = ctx.deps.tavily_api_key or ""
+    if not api_key.strip():
+        return "Tavily API key not set. Set TAVILY_API_KEY in environment and pass it via ResearchContext."
+
+    unique: dict[str, str] = {}
+    for q in queries:
+        if q.strip():
+            unique.setdefault(normalize_query(q), q.strip())
+    batch = list(unique.values())[: int(os.environ.get("TAVILY_BATCH_MAX_QUERIES", "8"))]
+    if not batch:
+        return "No search queries given."
+
+    client = AsyncTavilyClient(api_key=api_key)
+    semaphore = asyncio.Semaphore(int(os.environ.get("TAVILY_BATCH_CONCURRENCY", "4")))
+
+    async def run(q: str) -> list[dict[str, object]]:
+        async with semaphore:
+            return await _search(ctx, client, q, max_results, search_depth)
+
+    outcomes = await asyncio.gather(*(run(q) for q in batch), return_exceptions=True)
+
+    merged: dict[str, dict[str, object]] = {}
+    matched: dict[str, list[str]] = {}
+    failures: list[str] = []
+    for q, outcome in zip(batch, outcomes):
+        if isinstance(outcome, BaseException):
+            logger.warning("Tavily search failed for %r: %s", q, outcome)
+            failures.append(f"{q} ({outcome!s})")
+            continue
+        for r in outcome[:max_results]:
+            url = str(_get(r, "url") or "")
+            key = canonical_url(url) if url else f"{q}:{_get(r, 'title')}"
+            kept = merged.get(key)
+            if kept is None or (_score(r) > _score(kept)):
+                merged[key] = r
+            if q not in matched.setdefault(key, []):
+                matched[key].append(q)
+
+    ranked = sorted(merged, key=lambda k: (-len(matched[k]), -_score(merged[k])))
+    dedup = stage_deduper(ctx.deps, stage)
+    before = dedup.suppressed
+    parts = []
+    for key in ranked:
+        r = merged[key]
+        title = _get(r, "title") or ""
+        url = _get(r, "url") or ""
+        content = _dedupe(dedup, r)
+        parts.append(f"## {title}\nURL: {url}\nMatched: {'; '.join(matched[key])}\n\n{content}")
+    await _report_dedup(ctx, dedup, before)
+    if failures:
+        parts.append("Failed queries: " + "; ".join(failures))
+    if not parts:
+        return "No results from Tavily for these queries."
+    return await _shape(ctx, "tavily_batch_search", "\n\n".join(parts))
+
+
+async def _search(
+    ctx: RunContext[ResearchContext],
+    client: object,
+    query: str,
+    max_results: int,
+    search_depth: str,
+) -> list[dict[str, object]]:
+    """One cached Tavily search, emitting the tool_call/tool_result events.
+
+    Cache misses go through the shared rate limiter and the `tavily` circuit
+    breaker; while the breaker is open, misses raise `CircuitOpen` at once.
+    """
+    # LLMs love to hallucinate search_depth values like "deep" or "thorough"
+    valid_depths = {"basic", "advanced"}
+    if search_depth not in valid_depths:
+        search_depth = "basic"
+
+    cache = get_search_cache()
+    await ctx.deps.add_event("tool_call", "Tavily", f"Searching: {query}")
+    results = None
+    if cache is not None:
+        results = await cache.get(query, max_results, search_depth)
+    if results is not None:
+        await ctx.deps.add_event(
+            "tool_result",
+            "Tavily",
+            f"Found {len(results)} results (cached)",
+            details={"cache": "hit", **cache.stats()},
+        )
+        return results
+
+    breaker = get_breaker("tavily")
+    before = breaker.state
+    try:
+        response, waited = await limited(
+            "tavily",
+            lambda: breaker.call(
+                lambda: client.search(  # type: ignore[attr-defined]
+                    query=query,
+                    max_results=max_results,
+                    search_depth=search_depth,
+                )
+            ),
+        )
+    finally:
+        await report_transition(ctx.deps, "Tavily", breaker, before)
+    # Tavily SDK returns a plain dict, not a dataclass/object.
+    results = [_to_plain(r) for r in (_get(response, "results") or [])]
+    if cache is not None and results:
+        await cache.set(query, max_results, search_depth, results)
+    details: dict[str, object] = {"cache": "miss", **cache.stats()} if cache is not None else {}
+    details["limiter_wait_ms"] = round(waited * 1000, 1)
+    await ctx.deps.add_event(
+        "tool_result",
+        "Tavily",
+        f"Found {len(results)} results",
+        details=details,
+    )
+    return results
+
+
+def _dedupe(dedup: ContentDeduper, result: object) -> str:
+    """The result's content, or a back-reference if the stage already saw it."""
+    url = str(_get(result, "url") or "")
+    content = str(_get(result, "content") or "")
+    original = dedup.check(url or str(_get(result, "title") or ""), content, url=url or None)
+    return back_reference(original) if original else content
+
+
+async def _report_dedup(ctx: RunContext[ResearchContext], dedup: ContentDeduper, before: int) -> None:
+    if dedup.suppressed > before:
+        await ctx.deps.add_event(
+            "info",
+            "Dedup",
+            f"Suppressed {dedup.suppressed - before} repeated Tavily results",
+            details=dedup.stats(),
+        )
+
+
+async def _shape(ctx: RunContext[ResearchContext], tool: str, text: str) -> str:
+    """Apply the tool's token budget, reporting the original size when it cuts."""
+    shaped = shape_text(tool, text)
+    if shaped.truncated:
+        await ctx.deps.add_event(
+            "info",
+            "Tavily",
+            f"Truncated results to ~{shaped.tokens} tokens (from ~{shaped.original_tokens})",
+            details=shaped.details(),
+        )
+    return shaped.text
+
+
+def _score(result: object) -> float:
+    try:
+        return float(_get(result, "score") or 0.0)
+    except (TypeError, ValueError):
+        return 0.0
 
 
 def _get(obj: object, key: str) -> object:
@@ -77,3 +265,8 @@ def _get(obj: object, key: str) -> object:
     if isinstance(obj, dict):
         return obj.get(key)
     return getattr(obj, key, None)
+
+
+def _to_plain(result: object) -> dict[str, object]:
+    """Reduce a Tavily result to the JSON-safe fields we format and cache."""
+    return {key: _get(result, key) for key in ("title", "url", "content", "score")}
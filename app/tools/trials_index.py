@@ -0,0 +1,363 @@
+"""Offline ClinicalTrials.gov index (SQLite FTS5) with incremental refresh.
+
+Live ClinicalTrials.gov lookups are the slowest and least reliable researcher
+tool call. This module keeps a local full-text index over title, condition,
+intervention, phase and status, loaded from a bulk dump (or a fixture subset)
+and kept current with delta refreshes against the v2 API:
+
+    python -m app.tools.trials_index import ./ctg-studies.json.zip
+    python -m app.tools.trials_index refresh            # since the last refresh
+    python -m app.tools.trials_index refresh 2025-01-01
+
+`search_clinical_trials` answers from the index when it has fresh matches and
+falls back to the live API for misses or stale records, writing live results
+back into the index. A record is as fresh as the later of its own write and
+the last import or refresh: a delta refresh only rewrites the studies that
+changed, but it vouches for every other record too.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import re
+import sys
+import time
+import zipfile
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import aiosqlite
+
+from app.schema import ClinicalTrialSummary
+
+logger = logging.getLogger(__name__)
+
+_NCT_RE = re.compile(r"^NCT\d{8}$", re.IGNORECASE)
+_TERM_RE = re.compile(r"[\w\-]+", re.UNICODE)
+
+# Rows per executemany batch during bulk import.
+_BATCH_SIZE = 500
+
+
+@dataclass
+class IndexLookup:
+    """Trials matched in the index, and whether every match is fresh."""
+
+    trials: list[ClinicalTrialSummary]
+    fresh: bool
+
+
+def fts_query(search_expr: str) -> str:
+    """Turn a free-text search into an FTS5 MATCH expression.
+
+    Each term is quoted (so hyphens and FTS operators in drug names are taken
+    literally) and terms are ANDed, mirroring how the live API treats
+    `query.term`.
+    """
+    terms = [t.replace('"', "") for t in _TERM_RE.findall(search_expr)]
+    return " ".join(f'"{t}"' for t in terms if t)
+
+
+class TrialsIndex:
+    """SQLite database holding trial summaries plus an FTS5 table over them."""
+
+    def __init__(self, path: Path, max_age_seconds: float = 7 * 86400.0) -> None:
+        self.path = Path(path)
+        self.max_age_seconds = max_age_seconds
+        self._initialized = False
+
+    def exists(self) -> bool:
+        """Whether an index has been imported at `path`."""
+        return self.path.is_file()
+
+    async def _connect(self) -> aiosqlite.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        db = await aiosqlite.connect(self.path)
+        if not self._initialized:
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS trials (
+                    nct_id        TEXT PRIMARY KEY,
+                    title         TEXT NOT NULL,
+                    phase         TEXT,
+                    status        TEXT,
+                    condition     TEXT,
+                    interventions TEXT,
+                    last_update   TEXT,
+                    indexed_at    REAL NOT NULL
+                )
+            """)
+            await db.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS trials_fts USING fts5(
+                    nct_id UNINDEXED, title, condition, interventions, phase, status
+                )
+            """)
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS index_meta (
+                    key   TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                )
+            """)
+            await db.commit()
+            self._initialized = True
+        return db
+
+    async def upsert(self, records: Iterable[tuple[ClinicalTrialSummary, str | None]]) -> int:
+        """Insert or replace (summary, last_update) records. Returns the row count."""
+        now = time.time()
+        count = 0
+        db = await self._connect()
+        try:
+            batch: list[tuple[ClinicalTrialSummary, str | None]] = []
+            for record in records:
+                batch.append(record)
+                if len(batch) >= _BATCH_SIZE:
+                    count += await self._write_batch(db, batch, now)
+                    batch = []
+            if batch:
+                count += await self._write_batch(db, batch, now)
+            await db.commit()
+        finally:
+            await db.close()
+        return count
+
+    @staticmethod
+    async def _write_batch(
+        db: aiosqlite.Connection,
+        batch: list[tuple[ClinicalTrialSummary, str | None]],
+        now: float,
+    ) -> int:
+        ids = [(t.nct_id,) for t, _ in batch]
+        await db.executemany("DELETE FROM trials_fts WHERE nct_id=?", ids)
+        await db.executemany(
+            """
+            INSERT OR REPLACE INTO trials
+                (nct_id, title, phase, status, condition, interventions, last_update, indexed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (t.nct_id, t.title, t.phase, t.status, t.condition, t.interventions, updated, now)
+                for t, updated in batch
+            ],
+        )
+        await db.executemany(
+            """
+            INSERT INTO trials_fts (nct_id, title, condition, interventions, phase, status)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (t.nct_id, t.title, t.condition or "", t.interventions or "", t.phase or "", t.status or "")
+                for t, _ in batch
+            ],
+        )
+        return len(batch)
+
+    async def search(self, search_expr: str, limit: int = 50) -> IndexLookup:
+        """Best-matching trials for a search expression (or exact NCT id), BM25-ranked."""
+        expr = search_expr.strip()
+        db = await self._connect()
+        try:
+            if _NCT_RE.match(expr):
+                sql = "SELECT * FROM trials WHERE nct_id=?"
+                params: tuple[Any, ...] = (expr.upper(),)
+            else:
+                match = fts_query(expr)
+                if not match:
+                    return IndexLookup([], fresh=False)
+                sql = """
+                    SELECT t.* FROM trials_fts f JOIN trials t ON t.nct_id = f.nct_id
+                    WHERE trials_fts MATCH ?
+                    ORDER BY bm25(trials_fts)
+                    LIMIT ?
+                """
+                params = (match, limit)
+            async with db.execute(sql, params) as cursor:
+                rows = await cursor.fetchall()
+        finally:
+            await db.close()
+
+        cutoff = time.time() - self.max_age_seconds
+        refreshed_at = float(await self.get_meta("refreshed_at") or 0)
+        trials = [
+            ClinicalTrialSummary(
+                nct_id=row[0],
+                title=row[1],
+                phase=row[2],
+                status=row[3],
+                condition=row[4],
+                interventions=row[5],
+            )
+            for row in rows
+        ]
+        fresh = bool(rows) and all(max(row[7], refreshed_at) >= cutoff for row in rows)
+        return IndexLookup(trials, fresh)
+
+    async def count(self) -> int:
+        """Number of indexed trials."""
+        db = await self._connect()
+        try:
+            async with db.execute("SELECT COUNT(*) FROM trials") as cursor:
+                row = await cursor.fetchone()
+            return int(row[0]) if row else 0
+        finally:
+            await db.close()
+
+    async def get_meta(self, key: str) -> str | None:
+        db = await self._connect()
+        try:
+            async with db.execute("SELECT value FROM index_meta WHERE key=?", (key,)) as cursor:
+                row = await cursor.fetchone()
+            return row[0] if row else None
+        finally:
+            await db.close()
+
+    async def set_meta(self, key: str, value: str) -> None:
+        db = await self._connect()
+        try:
+            await db.execute(
+                "INSERT OR REPLACE INTO index_meta (key, value) VALUES (?, ?)", (key, value)
+            )
+            await db.commit()
+        finally:
+            await db.close()
+
+
+def iter_dump(path: Path) -> Iterator[dict[str, Any]]:
+    """Yield raw v2 study records from a dump file or directory.
+
+    Accepts the official bulk download (`ctg-studies.json.zip`, one JSON file
+    per study), a directory of such files, a single JSON file holding a list
+    or an API page (`{"studies": [...]}`), or JSON Lines.
+    """
+
+    def from_payload(payload: Any) -> Iterator[dict[str, Any]]:
+        if isinstance(payload, dict) and "studies" in payload:
+            yield from payload["studies"]
+        elif isinstance(payload, list):
+            yield from payload
+        elif isinstance(payload, dict):
+            yield payload
+
+    path = Path(path)
+    if path.is_dir():
+        for child in sorted(path.rglob("*.json")):
+            yield from from_payload(json.loads(child.read_text()))
+    elif zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for name in sorted(archive.namelist()):
+                if name.endswith(".json"):
+                    yield from from_payload(json.loads(archive.read(name)))
+    elif path.suffix == ".jsonl":
+        with path.open() as fh:
+            for line in fh:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        yield from from_payload(json.loads(path.read_text()))
+
+
+def _records(studies: Iterable[dict[str, Any]]) -> Iterator[tuple[ClinicalTrialSummary, str | None]]:
+    from app.tools.clinical_trials_tool import study_last_update, study_to_summary
+
+    for study in studies:
+        try:
+            yield study_to_summary(study), study_last_update(study)
+        except Exception as e:
+            logger.warning("Skipping malformed study record: %s", e)
+
+
+async def _mark_refreshed(index: TrialsIndex, started: float) -> None:
+    """Record an import or refresh that started at `started` (epoch seconds).
+
+    `last_refresh` is the UTC date the next delta refresh starts from;
+    `refreshed_at` is when the whole index was last known current.
+    """
+    await index.set_meta("last_refresh", datetime.fromtimestamp(started, timezone.utc).date().isoformat())
+    await index.set_meta("refreshed_at", str(started))
+
+
+async def import_dump(index: TrialsIndex, path: Path) -> int:
+    """Bulk-load a dump into the index and mark it as refreshed as of now."""
+    started = time.time()
+    count = await index.upsert(_records(iter_dump(path)))
+    await _mark_refreshed(index, started)
+    return count
+
+
+async def refresh_index(index: TrialsIndex, since: str | None = None) -> int:
+    """Pull studies updated since `since` (ISO date) from the live API.
+
+    Defaults to the date of the previous import or refresh, so repeated runs
+    only transfer the delta.
+    """
+    from app.tools.clinical_trials_tool import iter_studies
+
+    since = since or await index.get_meta("last_refresh")
+    if not since:
+        raise ValueError("No previous import or refresh recorded; pass a start date")
+    started = time.time()
+    studies = [
+        study
+        async for study in iter_studies(f"AREA[LastUpdatePostDate]RANGE[{since},MAX]", None)
+    ]
+    count = await index.upsert(_records(studies))
+    await _mark_refreshed(index, started)
+    return count
+
+
+_UNSET: Any = object()
+_trials_index: TrialsIndex | None = _UNSET
+
+
+def get_trials_index() -> TrialsIndex | None:
+    """Return the process-wide trials index, building it from env on first use.
+
+    Environment variables:
+        TRIALS_INDEX_ENABLED: '0' always queries the live API (default '1').
+        TRIALS_INDEX_PATH: SQLite file (default ./data/trials_index.db).
+        TRIALS_INDEX_MAX_AGE: Seconds after its last write, import or refresh
+            before an indexed record counts as stale and is re-fetched live
+            (default 604800).
+    """
+    global _trials_index
+    if _trials_index is _UNSET:
+        if os.environ.get("TRIALS_INDEX_ENABLED", "1").strip() in {"0", "false", "no"}:
+            _trials_index = None
+        else:
+            _trials_index = TrialsIndex(
+                Path(os.environ.get("TRIALS_INDEX_PATH", "./data/trials_index.db")),
+                max_age_seconds=float(os.environ.get("TRIALS_INDEX_MAX_AGE", str(7 * 86400))),
+            )
+    return _trials_index
+
+
+def set_trials_index(index: TrialsIndex | None) -> None:
+    """Install a custom trials index, or None to disable it."""
+    global _trials_index
+    _trials_index = index
+
+
+async def _main(argv: list[str]) -> None:
+    index = get_trials_index()
+    if index is None:
+        print("Trials index is disabled (TRIALS_INDEX_ENABLED=0)")
+        return
+    if len(argv) >= 2 and argv[0] == "import":
+        count = await import_dump(index, Path(argv[1]))
+        print(f"Imported {count} studies into {index.path}")
+    elif argv and argv[0] == "refresh":
+        count = await refresh_index(index, argv[1] if len(argv) > 1 else None)
+        print(f"Refreshed {count} studies in {index.path}")
+    else:
+        print("Usage: python -m app.tools.trials_index import <dump> | refresh [YYYY-MM-DD]")
+        return
+    print(f"Index now holds {await index.count()} studies")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main(sys.argv[1:]))
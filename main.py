@@ -32,6 +32,7 @@ from app.history import (
     save_checkpoint,
     save_session,
 )
+from app.stage_history import dump_stage_history
 
 
 def _default_query() -> str:
@@ -110,6 +111,7 @@ def _save_failure_checkpoint(
         events=deps.events,
         stage_reached=stage,
         failure_reason=str(exc),
+        stage_history=dump_stage_history(deps),
     )
     saved = save_checkpoint(checkpoint)
 
@@ -18,6 +18,16 @@ def temp_db(tmp_path, monkeypatch):
     return test_db
 
 
+@pytest.fixture(autouse=True)
+def reset_circuit_breakers():
+    """Breakers are process-wide; keep one test's failures from tripping the next."""
+    from app.tools import circuit_breaker
+
+    circuit_breaker._breakers.clear()
+    yield
+    circuit_breaker._breakers.clear()
+
+
 @pytest_asyncio.fixture
 async def client(temp_db):
     """AsyncClient wired to the FastAPI app with a fresh DB."""
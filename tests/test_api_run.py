@@ -9,7 +9,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
 
 
-async def _fake_pipeline(session_id, query, ctx):
+async def _fake_pipeline(session_id, query, ctx, engine="lead", planner=True):
     """Simulate a fast pipeline completion without hitting an LLM."""
     from app.schema import MarketReport
 
@@ -52,6 +52,23 @@ async def test_post_run_returns_202(client):
     assert data["stream_url"].startswith("/run/")
 
 
+async def test_post_run_passes_engine_selection(client):
+    """POST /run forwards `engine` and `planner` to the background pipeline."""
+    pipeline_mock = AsyncMock(side_effect=_fake_pipeline)
+    with patch("api.routes.run._run_pipeline", new=pipeline_mock):
+        response = await client.post(
+            "/run",
+            json={"query": "GLP-1 market size", "engine": "pipeline", "planner": False},
+        )
+        await asyncio.sleep(0.01)
+
+    assert response.status_code == 202
+    assert pipeline_mock.await_args.args[3:] == ("pipeline", False)
+
+    response = await client.post("/run", json={"query": "q", "engine": "graph"})
+    assert response.status_code == 422
+
+
 async def test_post_run_missing_query(client):
     """POST /run without query should return 422."""
     response = await client.post("/run", json={})
@@ -122,6 +139,7 @@ async def _seed_failed_session(
     *,
     research_json: str | None = None,
     analyst_json: str | None = None,
+    **run_options,
 ) -> None:
     """Insert a failed session row, optionally with checkpoint findings."""
     from api.db_sessions import (
@@ -131,7 +149,7 @@ async def _seed_failed_session(
         save_research_checkpoint,
     )
 
-    await insert_session(session_id, "retry query")
+    await insert_session(session_id, "retry query", **run_options)
     if research_json is not None:
         await save_research_checkpoint(session_id, research_json)
     if analyst_json is not None:
@@ -160,6 +178,23 @@ async def test_retry_no_checkpoints_runs_full_pipeline(client):
     assert reporter_mock.await_count == 0
 
 
+async def test_retry_keeps_the_original_engine(client):
+    """A session started on the pipeline engine is retried on it, planner flag included."""
+    from api.db_sessions import get_session
+
+    await _seed_failed_session("sess_engine", engine="pipeline", planner=False)
+
+    pipeline_mock = AsyncMock(side_effect=_noop_async)
+    with patch("api.routes.run._run_pipeline", new=pipeline_mock):
+        response = await client.post("/run/sess_engine/retry")
+        await asyncio.sleep(0.01)
+
+    assert response.status_code == 202
+    assert pipeline_mock.await_args.args[3:] == ("pipeline", False)
+    retried = await get_session(response.json()["session_id"])
+    assert (retried["engine"], retried["planner"]) == ("pipeline", 0)
+
+
 async def test_retry_research_only_runs_full_pipeline(client):
     """E2: research_json present, analyst_json missing → _run_pipeline."""
     from app.schema import MarketAccessFindings
@@ -104,3 +104,4 @@ async def test_health_check(client):
     assert data["status"] == "ok"
     assert "llm_provider" in data
     assert "llm_model" in data
+    assert "output_repair" in data
@@ -0,0 +1,84 @@
+"""Tests for the shared Crawl4AI browser pool (fake crawlers, no Chromium)."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.tools.browser_pool import CrawlerPool, CrawlerPoolExhausted
+
+
+class FakeCrawler:
+    """Stand-in for AsyncWebCrawler that records lifecycle calls."""
+
+    instances: list["FakeCrawler"] = []
+
+    def __init__(self) -> None:
+        self.started = False
+        self.closed = False
+        FakeCrawler.instances.append(self)
+
+    async def start(self) -> None:
+        self.started = True
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture(autouse=True)
+def _reset_instances():
+    FakeCrawler.instances = []
+
+
+async def test_pool_reuses_warm_browser_across_leases():
+    pool = CrawlerPool(size=2, pages_per_browser=2, health_interval=0, factory=FakeCrawler)
+    await pool.start()
+    for _ in range(5):
+        async with pool.lease() as crawler:
+            assert crawler.started
+    await pool.close()
+
+    assert len(FakeCrawler.instances) == 1
+    assert pool.stats()["total_leases"] == 5
+    assert FakeCrawler.instances[0].closed
+
+
+async def test_pool_recycles_browser_after_max_uses():
+    pool = CrawlerPool(size=1, pages_per_browser=1, max_uses=2, health_interval=0, factory=FakeCrawler)
+    await pool.start()
+    for _ in range(4):
+        async with pool.lease():
+            pass
+    await pool.close()
+
+    assert len(FakeCrawler.instances) == 2
+    assert pool.recycled == 2
+    assert all(c.closed for c in FakeCrawler.instances)
+
+
+async def test_pool_rejects_when_wait_queue_is_full():
+    pool = CrawlerPool(
+        size=1, pages_per_browser=1, max_waiters=1, acquire_timeout=5,
+        health_interval=0, factory=FakeCrawler,
+    )
+    await pool.start()
+    release = asyncio.Event()
+
+    async def hold() -> None:
+        async with pool.lease():
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+
+    with pytest.raises(CrawlerPoolExhausted):
+        async with pool.lease():
+            pass
+
+    release.set()
+    await asyncio.gather(holder, waiter)
+    await pool.close()
+    assert pool.rejected == 1
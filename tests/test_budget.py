@@ -0,0 +1,150 @@
+"""Tests for query-complexity-aware stage budgets."""
+
+from __future__ import annotations
+
+import json
+from unittest.mock import patch
+
+from app.budget import allocate, apply_budget, classify_query, stage_budget, standard_budgets
+from app.context import ResearchContext
+from app.schema import MarketAccessFindings, ResearchPlan
+
+
+def test_single_drug_payer_question_is_simple():
+    archetype, complexity, signals = classify_query("Does UnitedHealthcare require prior authorization for Wegovy?")
+    assert (archetype, complexity) == ("coverage/formulary", "simple")
+    assert signals["matched_archetypes"] == ["coverage/formulary"]
+
+
+def test_multi_country_landscape_is_complex():
+    archetype, complexity, signals = classify_query(
+        "Compare GLP-1 market share and payer coverage across the US, EU5 and Japan"
+    )
+    assert (archetype, complexity) == ("multi-dimensional", "complex")
+    assert signals["geographies"] == ["eu5", "japan", "u.s."]
+    assert signals["comparison"] is True
+
+
+def test_keywords_match_whole_words_only():
+    # "email" is not the EMA; the FDA's full name is not a care-delivery cue.
+    assert classify_query("Email summary of Keytruda uptake")[0] == "volume/prescribing"
+    assert classify_query("Food and Drug Administration approval of Leqembi")[0] == "regulatory/pipeline"
+    assert classify_query("Site of administration for Ocrevus infusions")[0] == "care-delivery"
+    # The pronoun "us" is not a geography; "US" and "U.S." are.
+    assert classify_query("tell us Aetna coverage for Wegovy")[2]["geographies"] == []
+    assert classify_query("Aetna coverage for Wegovy in the U.S.")[2]["geographies"] == ["u.s."]
+
+
+def test_simple_budgets_shrink_and_favour_the_owning_stage(monkeypatch):
+    monkeypatch.setenv("AGENT_TIMEOUT", "100")
+    budget = allocate("Does Cigna cover Zepbound on formulary?")
+    standard = standard_budgets()
+
+    researcher, analyst = budget.stages["researcher"], budget.stages["analyst"]
+    assert researcher.request_limit == 6 and researcher.tool_calls_limit == 7
+    assert analyst.request_limit < researcher.request_limit
+    assert researcher.timeout == analyst.timeout == 60.0
+    assert budget.stages["lead"] == standard["lead"]
+    assert budget.stages["reporter"].tool_calls_limit == 0
+
+
+def test_token_caps_are_unset_unless_configured(monkeypatch):
+    monkeypatch.delenv("BUDGET_STAGE_TOKENS", raising=False)
+    assert all(b.total_tokens_limit is None for b in standard_budgets().values())
+    assert all(b.total_tokens_limit is None for b in allocate("Does Cigna cover Zepbound?").stages.values())
+
+    monkeypatch.setenv("BUDGET_STAGE_TOKENS", "200000")
+    budget = allocate("Does Cigna cover Zepbound on formulary?")
+    assert budget.stages["researcher"].total_tokens_limit == 120000
+    assert budget.stages["analyst"].total_tokens_limit == 84000
+
+
+def test_complex_budgets_grow():
+    budget = allocate("Compare GLP-1 market share and payer coverage across the US, EU5 and Japan")
+    standard = standard_budgets()
+    for stage in ("lead", "researcher", "analyst", "reporter"):
+        assert budget.stages[stage].request_limit > standard[stage].request_limit
+
+
+def test_planner_archetype_overrides_local_rules():
+    plan = ResearchPlan(question_archetype="market-sizing/competitive")
+    budget = allocate("Does Cigna cover Zepbound on formulary?", plan)
+    assert (budget.source, budget.archetype) == ("planner", "market-sizing/competitive")
+    assert budget.stages["researcher"].request_limit < budget.stages["analyst"].request_limit
+
+
+def test_allocator_off_uses_standard_budgets(monkeypatch):
+    monkeypatch.setenv("BUDGET_ALLOCATOR", "off")
+    budget = allocate("Does Cigna cover Zepbound on formulary?")
+    assert budget.source == "default"
+    assert budget.stages == standard_budgets()
+
+
+async def test_apply_budget_records_event_and_stages_use_it():
+    from app.agents.lead import market_access_stage
+    from app.agents.researcher import researcher_agent
+    from pydantic_ai.usage import RunUsage
+
+    deps = ResearchContext(tavily_api_key="")
+    assert stage_budget(deps, "researcher") == standard_budgets()["researcher"]
+    budget = await apply_budget(deps, "Does Cigna cover Zepbound on formulary?")
+    (event,) = [e for e in deps.events if e.source == "Budget"]
+    assert event.details["complexity"] == "simple"
+    assert event.details["stages"]["researcher"]["request_limit"] == 6
+
+    seen = {}
+
+    class _Result:
+        output = MarketAccessFindings()
+
+        def usage(self):
+            return RunUsage()
+
+    async def fake_run(prompt, **kwargs):
+        seen.update(kwargs)
+        return _Result()
+
+    with patch.object(researcher_agent, "run", new=fake_run):
+        await market_access_stage(deps, "briefing", RunUsage())
+
+    limits = seen["usage_limits"]
+    assert limits.request_limit == budget.stages["researcher"].request_limit
+    assert limits.total_tokens_limit == budget.stages["researcher"].total_tokens_limit
+
+
+async def test_reporter_budget_excludes_tokens_already_spent_on_the_run(monkeypatch):
+    from pydantic_ai.models.test import TestModel
+    from pydantic_ai.usage import RunUsage
+
+    from app.agents.lead import reporter_stage
+    from app.agents.reporter import reporter_agent
+
+    monkeypatch.setenv("BUDGET_REPORTER_TOKENS", "100000")
+    deps = ResearchContext(tavily_api_key="")
+    budget = await apply_budget(deps, "Does Cigna cover Zepbound on formulary?")
+    assert budget.stages["reporter"].total_tokens_limit == 60000
+    usage = RunUsage(requests=12, input_tokens=90000, output_tokens=5000)  # lead + research stages
+
+    report_args = {
+        "title": "Zepbound coverage",
+        "executive_summary": "Cigna covers Zepbound with prior authorization.",
+        "sections": [{"heading": "Coverage", "content": "Preferred brand tier."}],
+        "sources": ["https://example.com/cigna"],
+        "markdown_content": "# Zepbound coverage",
+    }
+    with reporter_agent.override(model=TestModel(call_tools=[], custom_output_args=report_args)):
+        report = await reporter_stage(deps, "synthesis prompt", usage)
+
+    assert report.title == "Zepbound coverage"
+    assert usage.requests == 13 and usage.input_tokens > 90000
+
+
+async def test_budget_is_saved_on_the_session(client):
+    from api.db_sessions import insert_session, save_budget
+
+    await insert_session("sess_budget", "Does Cigna cover Zepbound?")
+    budget = allocate("Does Cigna cover Zepbound?")
+    await save_budget("sess_budget", budget.model_dump_json())
+
+    data = (await client.get("/sessions/sess_budget")).json()
+    assert data["budget"] == json.loads(budget.model_dump_json())
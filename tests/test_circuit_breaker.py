@@ -0,0 +1,126 @@
+"""Tests for the per-tool circuit breakers."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from app.context import ResearchContext
+from app.tools import circuit_breaker, search_cache
+from app.tools.circuit_breaker import CircuitBreaker, CircuitOpen
+
+
+async def _fail():
+    raise RuntimeError("upstream down")
+
+
+async def _ok():
+    return "ok"
+
+
+async def test_opens_on_error_rate_and_recovers_through_half_open():
+    breaker = CircuitBreaker("svc", failure_rate=0.5, min_calls=4, cooldown_s=0.0)
+    for fn in (_ok, _fail, _ok, _fail):
+        try:
+            await breaker.call(fn)
+        except RuntimeError:
+            pass
+    # cooldown 0: an open breaker is immediately eligible for a probe
+    assert breaker.state == "half_open"
+    assert await breaker.call(_ok) == "ok"
+    assert breaker.state == "closed"
+    assert breaker.transitions == 2
+
+
+async def test_open_breaker_fails_fast_and_failed_probe_reopens():
+    breaker = CircuitBreaker("svc", min_calls=2, cooldown_s=60)
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            await breaker.call(_fail)
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpen):
+        await breaker.call(_ok)
+    assert breaker.stats()["rejected"] == 1
+
+    breaker.cooldown_s = 0
+    with pytest.raises(RuntimeError):
+        await breaker.call(_fail)
+    assert breaker.transitions == 2
+    assert breaker.state == "half_open"
+
+
+def test_slow_calls_count_as_failures():
+    breaker = CircuitBreaker("svc", min_calls=2, slow_call_s=1.0)
+    breaker.record(True, 5.0)
+    breaker.record(True, 5.0)
+    assert breaker.state == "open"
+
+
+@pytest.fixture
+def tavily_breaker():
+    search_cache.set_search_cache(None)
+    breaker = CircuitBreaker("tavily", min_calls=2, cooldown_s=60)
+    circuit_breaker.set_breaker("tavily", breaker)
+    yield breaker
+    circuit_breaker.set_breaker("tavily", None)
+    search_cache.set_search_cache(search_cache._UNSET)
+
+
+async def test_tavily_returns_unavailable_and_emits_transition(tavily_breaker):
+    from app.tools.tavily_tool import tavily_search
+
+    calls = []
+
+    class DownClient:
+        def __init__(self, api_key: str) -> None:
+            pass
+
+        async def search(self, query: str, **kwargs):
+            calls.append(query)
+            raise RuntimeError("502 Bad Gateway")
+
+    ctx = SimpleNamespace(deps=ResearchContext(tavily_api_key="key"))
+    with patch("tavily.AsyncTavilyClient", DownClient):
+        for q in ("a", "b", "c"):
+            result = await tavily_search(ctx, q, stage="researcher")
+
+    assert calls == ["a", "b"]
+    assert result.startswith("Tavily unavailable: tavily is temporarily unavailable")
+    transitions = [e for e in ctx.deps.events if e.message.startswith("Circuit")]
+    assert [e.message for e in transitions] == ["Circuit closed → open"]
+    assert transitions[0].details["state"] == "open"
+
+
+async def test_browser_breaker_ignores_page_failures_and_slow_renders():
+    from app.tools import crawl4ai_tool
+    from app.tools import scrape_cache as scrape_cache_module
+    from app.tools.crawl4ai_tool import ScrapeError, scrape_page
+
+    breaker = CircuitBreaker("crawl4ai", min_calls=2, cooldown_s=60, slow_call_s=None)
+    circuit_breaker.set_breaker("crawl4ai", breaker)
+    scrape_cache_module.set_scrape_cache(None)
+    outcomes = iter([ScrapeError("net::ERR_NAME_NOT_RESOLVED")] * 3 + [RuntimeError("browser failed to launch")] * 3)
+
+    async def render(url):
+        raise next(outcomes)
+
+    try:
+        with patch.dict("os.environ", {"SCRAPE_STATIC_FIRST": "0"}), patch.object(crawl4ai_tool, "_render", render):
+            for i in range(3):
+                assert not (await scrape_page(f"https://dead{i}.example.com")).ok
+            assert breaker.state == "closed"
+            for i in range(3):
+                await scrape_page(f"https://portal{i}.example.com")
+            assert breaker.state == "open"
+    finally:
+        circuit_breaker.set_breaker("crawl4ai", None)
+        scrape_cache_module.set_scrape_cache(scrape_cache_module._UNSET)
+
+    try:
+        assert circuit_breaker.get_breaker("crawl4ai").slow_call_s is None
+        assert circuit_breaker.get_breaker("tavily").slow_call_s == 15.0
+    finally:
+        circuit_breaker.set_breaker("crawl4ai", None)
+        circuit_breaker.set_breaker("tavily", None)
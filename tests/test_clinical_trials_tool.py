@@ -0,0 +1,166 @@
+"""Tests for the async ClinicalTrials.gov v2 client and offline index (mocked transport)."""
+
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.tools import clinical_trials_tool, trials_index
+from app.tools.clinical_trials_tool import search_clinical_trials
+
+
+@pytest.fixture(autouse=True)
+def _no_default_index():
+    """Keep tests off any real ./data/trials_index.db."""
+    trials_index.set_trials_index(None)
+    yield
+    trials_index.set_trials_index(trials_index._UNSET)
+
+
+def _study(nct: str) -> dict:
+    return {
+        "protocolSection": {
+            "identificationModule": {"nctId": nct, "briefTitle": f"Study {nct}"},
+            "statusModule": {"overallStatus": "RECRUITING"},
+            "designModule": {"phases": ["PHASE2", "PHASE3"]},
+            "conditionsModule": {"conditions": ["Obesity"]},
+            "armsInterventionsModule": {
+                "interventions": [
+                    {"type": "DRUG", "name": "Semaglutide"},
+                    {"type": "OTHER", "name": "Placebo"},
+                ]
+            },
+        }
+    }
+
+
+async def test_paginates_with_page_token_and_stops_at_max_studies():
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        token = request.url.params.get("pageToken")
+        if token is None:
+            return httpx.Response(200, json={"studies": [_study("NCT1"), _study("NCT2")], "nextPageToken": "p2"})
+        if token == "p2":
+            return httpx.Response(200, json={"studies": [_study("NCT3"), _study("NCT4")], "nextPageToken": "p3"})
+        raise AssertionError("fetched a page past max_studies")
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    with patch("app.tools.clinical_trials_tool.get_http_client", return_value=client):
+        results = await search_clinical_trials("semaglutide", max_studies=3)
+
+    assert [r.nct_id for r in results] == ["NCT1", "NCT2", "NCT3"]
+    assert len(requests) == 2
+    assert requests[0].url.params["query.term"] == "semaglutide"
+    assert "InterventionName" in requests[0].url.params["fields"]
+    assert results[0].phase == "PHASE2|PHASE3"
+    assert results[0].interventions == "DRUG: Semaglutide|OTHER: Placebo"
+
+
+async def test_http_error_returns_empty_list():
+    client = httpx.AsyncClient(transport=httpx.MockTransport(lambda r: httpx.Response(503)))
+    with patch("app.tools.clinical_trials_tool.get_http_client", return_value=client):
+        assert await search_clinical_trials("anything") == []
+
+
+# ---------------------------------------------------------------------------
+# Offline FTS5 index
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def index(tmp_path):
+    idx = trials_index.TrialsIndex(tmp_path / "trials.db")
+    trials_index.set_trials_index(idx)
+    yield idx
+    trials_index.set_trials_index(trials_index._UNSET)
+
+
+def _failing_client() -> httpx.AsyncClient:
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise AssertionError(f"unexpected live request: {request.url}")
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+async def test_import_dump_and_search_from_index(index, tmp_path):
+    dump = tmp_path / "studies.jsonl"
+    dump.write_text("\n".join(json.dumps(_study(f"NCT0000000{i}")) for i in range(3)))
+    assert await trials_index.import_dump(index, dump) == 3
+
+    with patch("app.tools.clinical_trials_tool.get_http_client", return_value=_failing_client()):
+        results = await search_clinical_trials("semaglutide obesity", max_studies=2)
+        by_id = await search_clinical_trials("nct00000001")
+
+    assert len(results) == 2
+    assert results[0].interventions == "DRUG: Semaglutide|OTHER: Placebo"
+    assert [r.nct_id for r in by_id] == ["NCT00000001"]
+
+
+async def test_index_miss_falls_back_to_live_and_writes_back(index):
+    await index.upsert([])  # create an empty index file
+    client = httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda r: httpx.Response(200, json={"studies": [_study("NCT00000009")]}))
+    )
+    with patch("app.tools.clinical_trials_tool.get_http_client", return_value=client):
+        live = await search_clinical_trials("semaglutide")
+    assert [r.nct_id for r in live] == ["NCT00000009"]
+
+    with patch("app.tools.clinical_trials_tool.get_http_client", return_value=_failing_client()):
+        again = await search_clinical_trials("semaglutide")
+    assert [r.nct_id for r in again] == ["NCT00000009"]
+
+
+async def test_stale_records_refresh_live_but_survive_outage(index):
+    await index.upsert([(clinical_trials_tool.study_to_summary(_study("NCT00000001")), None)])
+    index.max_age_seconds = 0
+
+    down = httpx.AsyncClient(transport=httpx.MockTransport(lambda r: httpx.Response(503)))
+    with patch("app.tools.clinical_trials_tool.get_http_client", return_value=down):
+        results = await search_clinical_trials("semaglutide")
+    assert [r.nct_id for r in results] == ["NCT00000001"]
+
+
+async def test_refresh_requests_delta_since_last_refresh(index):
+    await index.set_meta("last_refresh", "2025-03-01")
+    seen: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.url.params["query.term"])
+        return httpx.Response(200, json={"studies": [_study("NCT00000005")]})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    with patch("app.tools.clinical_trials_tool.get_http_client", return_value=client):
+        assert await trials_index.refresh_index(index) == 1
+    assert seen == ["AREA[LastUpdatePostDate]RANGE[2025-03-01,MAX]"]
+    assert await index.get_meta("last_refresh") != "2025-03-01"
+
+
+async def test_delta_refresh_keeps_unchanged_records_fresh(index, tmp_path):
+    dump = tmp_path / "studies.jsonl"
+    dump.write_text("\n".join(json.dumps(_study(f"NCT0000000{i}")) for i in range(3)))
+    await trials_index.import_dump(index, dump)
+    index.max_age_seconds = 3600
+    db = await index._connect()
+    try:  # the import was eight days ago
+        await db.execute("UPDATE trials SET indexed_at = indexed_at - 8 * 86400")
+        await db.execute("UPDATE index_meta SET value = CAST(value - 8 * 86400 AS TEXT) WHERE key = 'refreshed_at'")
+        await db.commit()
+    finally:
+        await db.close()
+    assert not (await index.search("semaglutide")).fresh
+
+    delta = httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda r: httpx.Response(200, json={"studies": [_study("NCT00000009")]}))
+    )
+    with patch("app.tools.clinical_trials_tool.get_http_client", return_value=delta):
+        assert await trials_index.refresh_index(index) == 1
+
+    lookup = await index.search("semaglutide")
+    assert lookup.fresh and len(lookup.trials) == 4
+    assert await index.get_meta("last_refresh") == datetime.now(timezone.utc).date().isoformat()
@@ -0,0 +1,91 @@
+"""Tests for stage-scoped tool-output de-duplication."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from app.context import ResearchContext
+from app.tools import search_cache
+from app.tools.dedup import ContentDeduper, canonical_url, hamming, simhash, stage_deduper
+
+_ARTICLE = (
+    "Eisai and Biogen announced today that the U.S. Food and Drug Administration has "
+    "granted traditional approval to lecanemab for the treatment of early Alzheimer's "
+    "disease, following confirmatory Phase 3 Clarity AD results showing a 27 percent "
+    "slowing of clinical decline on the CDR-SB at 18 months versus placebo."
+)
+
+
+def test_canonical_url_ignores_cosmetic_differences():
+    assert canonical_url("http://WWW.Example.com/news/a/?utm_source=x&b=2&a=1#top") == canonical_url(
+        "https://example.com/news/a?a=1&b=2"
+    )
+    assert canonical_url("https://example.com/a") != canonical_url("https://example.com/b")
+
+
+def test_simhash_is_close_for_syndicated_copies():
+    syndicated = _ARTICLE.replace("announced today", "said on Thursday") + " (Reuters)"
+    same_topic = (
+        _ARTICLE.replace("traditional approval", "accelerated approval")
+        .replace("27 percent", "35 percent")
+        .replace("18 months", "76 weeks")
+        .replace("early Alzheimer's disease", "mild cognitive impairment")
+    )
+    assert hamming(simhash(_ARTICLE), simhash(syndicated)) <= 3 < hamming(simhash(_ARTICLE), simhash(same_topic))
+
+
+def test_deduper_tracks_urls_near_duplicates_and_bytes():
+    dedup = ContentDeduper()
+    assert dedup.check("https://a.test/pr", _ARTICLE, url="https://a.test/pr") is None
+    assert dedup.check("x", "short", url="https://a.test/pr/?utm_medium=rss") == "https://a.test/pr"
+    copy = _ARTICLE.replace("announced today", "said Thursday")
+    assert dedup.check("https://b.test/story", copy, url="https://b.test/story") == "https://a.test/pr"
+    assert dedup.stats()["suppressed"] == 2
+    assert dedup.stats()["suppressed_bytes"] > 0
+
+
+@pytest.fixture
+def no_search_cache():
+    search_cache.set_search_cache(None)
+    yield
+    search_cache.set_search_cache(search_cache._UNSET)
+
+
+async def test_repeat_tavily_results_become_back_references(no_search_cache):
+    from app.tools.tavily_tool import tavily_search
+
+    class FakeClient:
+        def __init__(self, api_key: str) -> None:
+            pass
+
+        async def search(self, query: str, **kwargs):
+            return {
+                "results": [
+                    {"title": "PR", "url": f"https://{query}.test/pr", "content": _ARTICLE},
+                ]
+            }
+
+    ctx = SimpleNamespace(deps=ResearchContext(tavily_api_key="key"))
+    with patch("tavily.AsyncTavilyClient", FakeClient):
+        first = await tavily_search(ctx, "wire", stage="researcher")
+        second = await tavily_search(ctx, "syndicated", stage="researcher")
+
+    assert _ARTICLE in first
+    assert _ARTICLE not in second
+    assert "Duplicate of earlier result https://wire.test/pr" in second
+    info = [e for e in ctx.deps.events if e.source == "Dedup"]
+    assert info and info[-1].details["suppressed"] == 1
+
+
+def test_dedup_is_per_stage_and_reset_by_a_fresh_run():
+    deps = ResearchContext(tavily_api_key="")
+    url = "https://a.test/pr"
+    assert stage_deduper(deps, "researcher").check(url, _ARTICLE, url=url) is None
+    # The analyst never saw the researcher's tool output, so it gets the full article.
+    assert stage_deduper(deps, "analyst").check(url, _ARTICLE, url=url) is None
+    assert stage_deduper(deps, "researcher").check(url, _ARTICLE, url=url) == url
+    # A stage restarted from scratch has an empty history again.
+    assert stage_deduper(deps, "researcher", reset=True).check(url, _ARTICLE, url=url) is None
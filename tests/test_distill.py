@@ -0,0 +1,115 @@
+"""Tests for the findings distillation stage."""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import pytest
+
+from app.context import ResearchContext
+from app.distill import distill_findings, distill_stage, extract
+from app.schema import AnalystFindings, MarketAccessFindings
+from app.tools.shaping import estimate_tokens
+
+_FILLER = "The search also returned general background on obesity epidemiology and lifestyle programs. "
+_EVIDENCE = (
+    "Tirzepatide coverage under Medicare Part D remains excluded for weight loss (https://www.cms.gov/part-d). "
+    + _FILLER * 30
+    + "Commercial payers require prior authorization for tirzepatide with BMI documentation. "
+    + _FILLER * 10
+    + "Background source: https://www.example.com/obesity-overview."
+)
+
+
+class _FakeResult:
+    def __init__(self, output: str) -> None:
+        self.output = output
+
+    def usage(self):
+        from pydantic_ai.usage import RunUsage
+
+        return RunUsage(requests=1, input_tokens=100, output_tokens=20)
+
+
+@pytest.fixture
+def extractive(monkeypatch):
+    monkeypatch.setenv("FINDINGS_DISTILL", "extractive")
+    monkeypatch.setenv("FINDINGS_FIELD_BUDGET", "60")
+
+
+def test_extract_keeps_relevant_sentences_in_order_and_every_url():
+    condensed = extract(_EVIDENCE, 80, "tirzepatide prior authorization coverage")
+    assert condensed.startswith("Tirzepatide coverage under Medicare Part D")
+    assert "Commercial payers require prior authorization" in condensed
+    assert condensed.index("Medicare") < condensed.index("Commercial payers")
+    assert "https://www.cms.gov/part-d" in condensed
+    assert "https://www.example.com/obesity-overview" in condensed
+    assert "epidemiology" not in condensed
+    assert estimate_tokens(condensed) <= 80
+
+
+def test_extract_leaves_short_text_unchanged():
+    assert extract("Short note.", 60, "anything") == "Short note."
+
+
+async def test_distillation_is_off_by_default(monkeypatch):
+    monkeypatch.delenv("FINDINGS_DISTILL", raising=False)
+    findings = MarketAccessFindings(raw_evidence_summary=_EVIDENCE)
+    assert await distill_findings(findings, "research", "q", ResearchContext(tavily_api_key="")) is findings
+
+
+async def test_extractive_distillation_records_token_counts(extractive):
+    deps = ResearchContext(tavily_api_key="")
+    research = MarketAccessFindings(raw_evidence_summary=_EVIDENCE, access_hurdles_summary="PA and step edits.")
+    analyst = AnalystFindings(summary="Small.")
+
+    distilled, same = await distill_stage(deps, "tirzepatide coverage", research, analyst)
+
+    assert same is analyst
+    assert research.raw_evidence_summary == _EVIDENCE  # the original (checkpointed) findings are untouched
+    assert distilled.access_hurdles_summary == "PA and step edits."
+    assert estimate_tokens(distilled.raw_evidence_summary) <= 60
+    (event,) = [e for e in deps.events if e.source == "Distiller"]
+    assert event.details["mode"] == "extractive"
+    assert event.details["after_tokens"] < event.details["before_tokens"]
+    field = event.details["fields"]["raw_evidence_summary"]
+    assert field["before_tokens"] == estimate_tokens(_EVIDENCE) and field["after_tokens"] <= 60
+
+
+async def test_llm_distillation_restores_dropped_urls(extractive, monkeypatch):
+    from app.agents.distiller import distiller_agent
+    from pydantic_ai.usage import RunUsage
+
+    monkeypatch.setenv("FINDINGS_DISTILL", "llm")
+    usage = RunUsage()
+
+    async def fake_run(prompt, **kwargs):
+        assert "FIELD: raw_evidence_summary" in prompt
+        return _FakeResult("Part D excludes tirzepatide for weight loss; commercial plans require PA.")
+
+    with patch.object(distiller_agent, "run", new=fake_run):
+        distilled = await distill_findings(
+            MarketAccessFindings(raw_evidence_summary=_EVIDENCE), "research", "q", ResearchContext(tavily_api_key=""), usage
+        )
+
+    assert distilled.raw_evidence_summary == (
+        "Part D excludes tirzepatide for weight loss; commercial plans require PA.\n"
+        "Sources: https://www.cms.gov/part-d https://www.example.com/obesity-overview"
+    )
+    assert usage.requests == 1
+
+
+async def test_llm_distillation_falls_back_to_extractive(extractive, monkeypatch):
+    from app.agents.distiller import distiller_agent
+
+    monkeypatch.setenv("FINDINGS_DISTILL", "llm")
+
+    async def failing_run(prompt, **kwargs):
+        raise RuntimeError("model offline")
+
+    with patch.object(distiller_agent, "run", new=failing_run):
+        distilled = await distill_findings(
+            MarketAccessFindings(raw_evidence_summary=_EVIDENCE), "research", "tirzepatide", ResearchContext(tavily_api_key="")
+        )
+
+    assert distilled.raw_evidence_summary == extract(_EVIDENCE, 60, "tirzepatide")
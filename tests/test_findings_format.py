@@ -0,0 +1,84 @@
+"""Tests for the compact findings serialization used in synthesis prompts."""
+
+from __future__ import annotations
+
+from app.findings_format import compare, format_data, format_findings
+from app.schema import (
+    AnalystFindings,
+    CareDeliveryProfile,
+    ClinicalTrialSummary,
+    CompetitorEntry,
+    MarketAccessFindings,
+    MarketSize,
+    PayerCoverageEntry,
+    RegulatorySnapshot,
+)
+
+
+def _research() -> MarketAccessFindings:
+    return MarketAccessFindings(
+        regulatory_snapshots=[
+            RegulatorySnapshot(authority="FDA", status="Approved", approval_date="2023-11-08", indication="Obesity"),
+            RegulatorySnapshot(authority="EMA", status="Approved", notes="Conditional | label update pending"),
+        ],
+        clinical_trial_summaries=[
+            ClinicalTrialSummary(
+                nct_id=f"NCT0{4184622 + i}",
+                title=f"SURMOUNT-{i}: tirzepatide in adults with obesity",
+                phase="Phase 3",
+                status="Completed",
+                condition="Obesity",
+            )
+            for i in range(1, 6)
+        ],
+        payer_coverage=[
+            PayerCoverageEntry(
+                payer_name=name,
+                coverage_status="restricted",
+                formulary_tier="Tier 3",
+                prior_auth_required=True,
+                notes="BMI >= 30 documented",
+            )
+            for name in ("UnitedHealthcare", "CVS Caremark", "Express Scripts", "Cigna", "Aetna")
+        ],
+        care_delivery=CareDeliveryProfile(administration_route="SC", specialty_pharmacy_required=False),
+        raw_evidence_summary="Sources: https://www.fda.gov/a, https://www.cms.gov/b",
+    )
+
+
+def test_scalars_are_unquoted_and_empty_fields_are_listed():
+    text = format_data({"summary": "Strong uptake", "value": 12.0, "notes": None, "items": []})
+    assert text.splitlines() == ["summary: Strong uptake", "value: 12", "not found: notes, items"]
+
+
+def test_lists_of_models_become_tables_with_only_populated_columns():
+    text = format_findings(
+        AnalystFindings(
+            market_sizes=[MarketSize(value_usd=5.2e9, region="US", year=2024)],
+            competitive_landscape=[
+                CompetitorEntry(name="Wegovy", share_or_notes="~55%"),
+                CompetitorEntry(name="Zepbound", channel="retail"),
+            ],
+        )
+    )
+    lines = text.splitlines()
+    start = lines.index("competitive_landscape:")
+    assert lines[start + 1 : start + 4] == ["|name|share_or_notes|channel|", "|Wegovy|~55%||", "|Zepbound||retail|"]
+    assert "|5200000000|US|2024|" in lines
+    assert lines[-1] == "not found: summary, prescription_metrics, analogue_launches, channel_mix_summary"
+
+
+def test_nested_models_are_compact_json_and_cells_are_escaped():
+    text = format_findings(_research())
+    assert 'care_delivery: {"administration_route":"SC","specialty_pharmacy_required":false}' in text
+    assert "|EMA|Approved|||Conditional \\| label update pending|" in text
+    assert "reimbursement_notes" in text.splitlines()[-1]
+
+
+def test_missing_findings():
+    assert format_findings(None) == "Not available"
+
+
+def test_compact_format_saves_prompt_tokens():
+    before, after = compare(_research())
+    assert after < before * 0.6
@@ -0,0 +1,139 @@
+"""Tests for local repair of almost-valid structured output."""
+
+from __future__ import annotations
+
+import pytest
+from pydantic_ai.messages import ModelResponse, TextPart, ToolCallPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+from app.output_repair import RepairingModel, repair_args, repair_json, repair_stats, reset_repair_stats
+from app.schema import AnalystFindings, MarketReportContent, ResearchPlan
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats():
+    reset_repair_stats()
+    yield
+    reset_repair_stats()
+
+
+def test_repair_json_fixes_common_syntax_slips():
+    data, fixes = repair_json("{title: 'Wegovy access', 'sources': ['https://cms.gov',], // note\n 'done': True,}")
+    assert data == {"title": "Wegovy access", "sources": ["https://cms.gov"], "done": True}
+    assert fixes == ["comments", "python_literals", "single_quotes", "trailing_commas", "unquoted_keys"]
+
+
+def test_repair_json_closes_truncated_output():
+    data, fixes = repair_json(
+        '```json\n{"summary": "GLP-1 demand", "market_sizes": [{"region": "US", "value_usd": 1.2e10}, {"region": "E'
+    )
+    assert data == {"summary": "GLP-1 demand", "market_sizes": [{"region": "US", "value_usd": 1.2e10}, {"region": "E"}]}
+    assert "truncated" in fixes and "code_fence" in fixes
+
+    data, _ = repair_json('{"summary": "s", "competitive_landscape": [{"name": "Zepbound"}], "channel_mix')
+    assert data == {"summary": "s", "competitive_landscape": [{"name": "Zepbound"}]}
+
+
+def test_schema_coercions_fix_enums_numbers_and_nesting():
+    outcome, args, fixes = repair_args(
+        '{"question_archetype": "Coverage / Formulary", "primary_dimensions": "payer coverage"}', ResearchPlan
+    )
+    assert outcome == "repaired"
+    assert args == {"question_archetype": "coverage/formulary", "primary_dimensions": ["payer coverage"]}
+    assert fixes == ["enum_values", "scalar_to_list"]
+
+    outcome, args, fixes = repair_args(
+        {"market_sizes": [{"value_usd": "$3.2 billion", "region": "US"}], "competitive_landscape": '[{"name": "Wegovy"}]'},
+        AnalystFindings,
+    )
+    assert outcome == "repaired"
+    assert args["market_sizes"][0]["value_usd"] == 3.2e9
+    assert args["competitive_landscape"] == [{"name": "Wegovy"}]
+
+
+def test_valid_and_unrepairable_outputs_are_left_alone():
+    assert repair_args('{"summary": "fine"}', AnalystFindings) == ("valid", None, [])
+    outcome, args, _ = repair_args('{"sections": []}', MarketReportContent)  # title is required
+    assert (outcome, args) == ("failed", None)
+
+
+async def test_agent_run_succeeds_without_a_retry_round_trip():
+    from app.agents.planner import planner_agent
+
+    requests = []
+
+    def model(messages, info: AgentInfo) -> ModelResponse:
+        requests.append(messages)
+        return ModelResponse(
+            parts=[ToolCallPart(info.output_tools[0].name, "{question_archetype: 'Market sizing / competitive', key_product: 'Wegovy',}")]
+        )
+
+    with planner_agent.override(model=RepairingModel(FunctionModel(model))):
+        result = await planner_agent.run("How big is the GLP-1 market?")
+
+    assert result.output == ResearchPlan(question_archetype="market-sizing/competitive", key_product="Wegovy")
+    assert len(requests) == 1
+    (stats,) = repair_stats().values()
+    assert (stats["outputs"], stats["repaired"], stats["repair_success_rate"]) == (1, 1, 1.0)
+    assert stats["fixes"]["enum_values"] == 1
+
+
+async def test_json_answered_as_text_becomes_the_output_call():
+    from app.agents.planner import planner_agent
+
+    def model(messages, info: AgentInfo) -> ModelResponse:
+        return ModelResponse(parts=[TextPart('Plan:\n```json\n{question_archetype: "Care delivery",}\n```')])
+
+    with planner_agent.override(model=RepairingModel(FunctionModel(model))):
+        result = await planner_agent.run("Where is Leqembi infused?")
+
+    assert result.output.question_archetype == "care-delivery"
+    (stats,) = repair_stats().values()
+    assert stats["fixes"]["text_to_tool_call"] == 1
+
+
+async def test_streamed_report_is_repaired_when_the_stream_ends():
+    from pydantic_ai.models.function import DeltaToolCall
+
+    from api.stream import StreamingResearchContext
+    from app.agents.reporter import reporter_agent, stream_report
+
+    calls = []
+    broken = (
+        "{title: 'Zepbound access', 'executive_summary': 'Covered with PA.',"
+        " 'sections': [{'heading': 'Coverage', 'content': 'Preferred tier.'},],}"
+    )
+
+    async def stream(messages, info: AgentInfo):
+        calls.append(messages)
+        for i in range(0, len(broken), 20):
+            yield {0: DeltaToolCall(name=info.output_tools[0].name if i == 0 else None, json_args=broken[i : i + 20])}
+
+    def unused(messages, info: AgentInfo) -> ModelResponse:
+        raise AssertionError("the reporter streams")
+
+    ctx = StreamingResearchContext(tavily_api_key="")
+    with reporter_agent.override(model=RepairingModel(FunctionModel(unused, stream_function=stream))):
+        report = await stream_report("synthesis prompt", ctx)
+
+    assert report.title == "Zepbound access" and report.sections[0].content == "Preferred tier."
+    assert len(calls) == 1
+    (stats,) = repair_stats().values()
+    assert (stats["outputs"], stats["repaired"]) == (1, 1)
+    assert stats["fixes"]["single_quotes"] == 1
+
+
+async def test_repair_can_be_turned_off(monkeypatch):
+    from pydantic_ai.exceptions import UnexpectedModelBehavior
+
+    from app.agents.planner import planner_agent
+
+    monkeypatch.setenv("OUTPUT_REPAIR", "off")
+
+    def model(messages, info: AgentInfo) -> ModelResponse:
+        return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, '{"question_archetype": "Coverage",}')])
+
+    with planner_agent.override(model=RepairingModel(FunctionModel(model))):
+        with pytest.raises(UnexpectedModelBehavior):
+            await planner_agent.run("q")
+    assert repair_stats() == {}
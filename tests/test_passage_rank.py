@@ -0,0 +1,60 @@
+"""Tests for query-focused passage ranking of scraped pages."""
+
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, patch
+
+from app.tools import crawl4ai_tool
+from app.tools.crawl4ai_tool import ScrapeResult
+from app.tools.passage_rank import chunk_markdown, rank_passages
+
+_FILLER = "General background on the therapy area and company history. " * 30
+
+_POLICY = "\n\n".join(
+    [
+        "# Medical Policy: Drug X",
+        "## Background",
+        _FILLER,
+        "## Coverage Criteria",
+        "### Prior Authorization",
+        "Prior authorization is required. Patients must have failed step therapy "
+        "with two TNF inhibitors before Drug X is covered.",
+        "## Billing Codes",
+        _FILLER,
+        "## References",
+        _FILLER,
+    ]
+)
+
+
+def test_chunks_carry_heading_trail():
+    passages = chunk_markdown(_POLICY)
+    pa = next(p for p in passages if "Prior authorization is required" in p.text)
+    assert pa.headings == ["Medical Policy: Drug X", "Coverage Criteria", "Prior Authorization"]
+
+
+def test_rank_keeps_relevant_passages_under_budget():
+    ranked = rank_passages(_POLICY, "prior authorization step therapy", top_k=2, char_budget=1500)
+
+    assert "Prior authorization is required" in ranked.text
+    assert "[Medical Policy: Drug X > Coverage Criteria > Prior Authorization]" in ranked.text
+    assert len(ranked.text) <= 1500
+    assert ranked.compression_ratio < 0.5
+
+
+def test_short_pages_are_returned_unchanged():
+    ranked = rank_passages("# Short\n\nTiny page.", "anything", char_budget=1000)
+    assert ranked.text == "# Short\n\nTiny page."
+    assert ranked.compression_ratio == 1.0
+
+
+async def test_scrape_page_focuses_on_query_and_reports_compression():
+    full = ScrapeResult(url="https://x.test", markdown=_POLICY, tier="http")
+    with patch.object(crawl4ai_tool, "fetch_page", new=AsyncMock(return_value=full)):
+        with patch.dict("os.environ", {"SCRAPE_CHAR_BUDGET": "1500"}):
+            result = await crawl4ai_tool.scrape_page("https://x.test", "prior authorization")
+
+    details = result.details()
+    assert details["original_chars"] == len(_POLICY)
+    assert details["compression_ratio"] < 1.0
+    assert "Prior authorization is required" in result.markdown
@@ -0,0 +1,190 @@
+"""Tests for the deterministic pipeline engine (app.pipeline)."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from pydantic_ai.models.test import TestModel
+
+from app.context import ResearchContext
+from app.pipeline import Stage, run_dag, run_pipeline
+from app.schema import AnalystFindings, MarketAccessFindings, MarketReport
+
+
+class _FakeResult:
+    def __init__(self, output) -> None:
+        self.output = output
+
+    def usage(self):
+        from pydantic_ai.usage import RunUsage
+
+        return RunUsage(input_tokens=3, output_tokens=2)
+
+
+def _report_args() -> dict:
+    return {
+        "title": "Pipeline Report",
+        "executive_summary": "Executive summary for the pipeline report.",
+        "sections": [{"heading": "Findings", "content": "Section content"}],
+        "sources": ["https://example.com/source"],
+        "markdown_content": "# Pipeline Report\n\nFindings...",
+    }
+
+
+async def test_dag_runs_stages_once_dependencies_finish():
+    order: list[str] = []
+
+    def stage(name: str, delay: float):
+        async def run(done):
+            order.append(f"start:{name}")
+            await asyncio.sleep(delay)
+            order.append(f"end:{name}")
+            return name.upper() + "".join(sorted(done.values()))
+
+        return run
+
+    results = await run_dag(
+        [
+            Stage("a", stage("a", 0)),
+            Stage("b", stage("b", 0.05), after=("a",)),
+            Stage("c", stage("c", 0.01), after=("a",)),
+            Stage("d", stage("d", 0), after=("b", "c")),
+        ]
+    )
+
+    assert results == {"a": "A", "b": "BA", "c": "CA", "d": "DBACA"}
+    # b and c overlap; d waits for both
+    assert order.index("start:c") < order.index("end:b")
+    assert order[-2:] == ["start:d", "end:d"]
+
+
+async def test_dag_rejects_unknown_dependencies_and_cancels_on_failure():
+    async def noop(done):
+        return None
+
+    with pytest.raises(ValueError):
+        await run_dag([Stage("b", noop, after=("a",)), Stage("a", noop)])
+
+    cancelled = []
+
+    async def slow(done):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def boom(done):
+        raise RuntimeError("stage failed")
+
+    with pytest.raises(RuntimeError):
+        await run_dag([Stage("slow", slow), Stage("boom", boom), Stage("after", noop, after=("slow",))])
+    assert cancelled == [True]
+
+
+async def test_pipeline_runs_stages_from_the_plan_without_the_lead():
+    from app.agents.analyst import analyst_agent
+    from app.agents.lead import lead_agent
+    from app.agents.planner import planner_agent
+    from app.agents.reporter import reporter_agent
+    from app.agents.researcher import researcher_agent
+
+    prompts: dict[str, str] = {}
+
+    def fake_run(name: str, output):
+        async def run(prompt, *args, **kwargs):
+            prompts[name] = prompt
+            return _FakeResult(output)
+
+        return run
+
+    async def lead_must_not_run(*args, **kwargs):
+        raise AssertionError("pipeline engine must not call the lead agent")
+
+    reporter_model = TestModel(call_tools=[], custom_output_args=_report_args())
+    plan_args = {
+        "question_archetype": "coverage/formulary",
+        "key_product": "semaglutide",
+        "primary_dimensions": ["payer coverage", "step therapy"],
+    }
+    deps = ResearchContext(tavily_api_key="test")
+    checkpoints: list[str] = []
+
+    async def on_stage_complete(stage, findings):
+        checkpoints.append(stage)
+
+    deps.on_stage_complete = on_stage_complete
+    with patch.object(
+        researcher_agent, "run", new=fake_run("research", MarketAccessFindings(raw_evidence_summary="formulary data"))
+    ), patch.object(analyst_agent, "run", new=fake_run("analyst", AnalystFindings(summary="share data"))), patch.object(
+        lead_agent, "run", new=lead_must_not_run
+    ):
+        with planner_agent.override(model=TestModel(call_tools=[], custom_output_args=plan_args)):
+            with reporter_agent.override(model=reporter_model):
+                report, usage = await run_pipeline("GLP-1 coverage in the US", deps)
+
+    assert isinstance(report, MarketReport)
+    assert report.title == "Pipeline Report"
+    for name in ("research", "analyst"):
+        assert "QUESTION: GLP-1 coverage in the US" in prompts[name]
+        assert "QUESTION TYPE: coverage/formulary" in prompts[name]
+        assert "KEY PRODUCT/DRUG CLASS: semaglutide" in prompts[name]
+    assert sorted(checkpoints) == ["analyst", "research"]
+
+    assert [e.source for e in deps.events if e.event_type == "agent_end"][0] == "Planner"
+    assert usage.input_tokens >= 6
+
+
+async def test_pipeline_without_planner_uses_default_plan():
+    from app.agents.analyst import analyst_agent
+    from app.agents.planner import planner_agent
+    from app.agents.reporter import reporter_agent
+    from app.agents.researcher import researcher_agent
+
+    synthesis: list[str] = []
+
+    async def planner_must_not_run(*args, **kwargs):
+        raise AssertionError("planner disabled")
+
+    async def fake_reporter(prompt, *args, **kwargs):
+        synthesis.append(prompt)
+        return _FakeResult(MarketReport(**_report_args()))
+
+    async def fake_stage(*args, **kwargs):
+        return _FakeResult(MarketAccessFindings(raw_evidence_summary="evidence"))
+
+    async def fake_analyst(*args, **kwargs):
+        return _FakeResult(AnalystFindings(summary="analysis"))
+
+    deps = ResearchContext(tavily_api_key="test")
+    with patch.object(planner_agent, "run", new=planner_must_not_run), patch.object(
+        researcher_agent, "run", new=fake_stage
+    ), patch.object(analyst_agent, "run", new=fake_analyst), patch.object(reporter_agent, "run", new=fake_reporter):
+        report, _ = await run_pipeline("NSCLC landscape", deps, planner=False)
+
+    assert report.title == "Pipeline Report"
+    (prompt,) = synthesis
+    assert prompt.startswith("RESEARCH QUESTION: NSCLC landscape")
+    assert "QUESTION ARCHETYPE: multi-dimensional" in prompt
+    assert "raw_evidence_summary: evidence" in prompt
+    assert "summary: analysis" in prompt
+    assert not any(e.source == "Planner" for e in deps.events)
+
+
+async def test_planner_failure_falls_back_to_default_plan():
+    from app.agents.planner import planner_agent
+    from app.pipeline import plan_stage
+    from pydantic_ai.usage import RunUsage
+
+    async def broken(*args, **kwargs):
+        raise RuntimeError("model offline")
+
+    deps = ResearchContext(tavily_api_key="test")
+    with patch.object(planner_agent, "run", new=broken):
+        plan = await plan_stage(deps, "query", RunUsage())
+
+    assert plan.question_archetype == "multi-dimensional"
+    assert deps.events[-1].event_type == "agent_limit"
+    assert "default plan" in deps.events[-1].message
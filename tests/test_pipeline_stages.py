@@ -15,6 +15,7 @@ Scenarios mapped to acceptance criteria:
 - D: lead orchestration (all three tools called → MarketReport; Limited
   researcher findings do not stop pipeline; reporter failure degrades)
 - F: STAGE_RETRIES retry wrapper for the lead's sub-agent tools
+- G: researcher and analyst run concurrently, checkpointing as each finishes
 """
 
 from __future__ import annotations
@@ -491,7 +492,7 @@ async def test_d3_reporter_failure_degrades_to_market_report_not_exception():
 
 async def test_f1_researcher_retries_on_unexpected_model_behavior():
     """F1: When researcher_agent.run raises UnexpectedModelBehavior, the
-    lead's run_market_access_research wrapper retries up to _STAGE_RETRIES
+    lead's run_market_access_research wrapper retries up to STAGE_RETRIES
     additional times and emits an `info` event for each retry."""
     import app.agents.lead as lead_module
     from app.agents.analyst import analyst_agent
@@ -506,7 +507,7 @@ async def test_f1_researcher_retries_on_unexpected_model_behavior():
         raise UnexpectedModelBehavior("mock unexpected behavior")
 
     # Force retries=2 (default) so we expect 3 total attempts (initial + 2).
-    with patch.object(lead_module, "_STAGE_RETRIES", 2):
+    with patch.dict("os.environ", {"STAGE_RETRIES": "2", "STAGE_RETRY_BACKOFF_BASE": "0"}):
         with patch.object(researcher_agent, "run", new=fake_run):
             with analyst_agent.override(
                 model=TestModel(call_tools=[], custom_output_args={"summary": "ok"})
@@ -555,7 +556,7 @@ async def test_f2_analyst_retries_on_unexpected_model_behavior():
         call_count["n"] += 1
         raise UnexpectedModelBehavior("analyst unexpected")
 
-    with patch.object(lead_module, "_STAGE_RETRIES", 2):
+    with patch.dict("os.environ", {"STAGE_RETRIES": "2", "STAGE_RETRY_BACKOFF_BASE": "0"}):
         with researcher_agent.override(
             model=TestModel(
                 call_tools=[], custom_output_args={"raw_evidence_summary": "x"}
@@ -600,7 +601,7 @@ async def test_f3_usage_limit_exceeded_is_not_retried_in_researcher():
         call_count["n"] += 1
         raise UsageLimitExceeded("limit hit")
 
-    with patch.object(lead_module, "_STAGE_RETRIES", 5):  # generous budget
+    with patch.dict("os.environ", {"STAGE_RETRIES": "5"}):  # generous budget
         with patch.object(researcher_agent, "run", new=fake_run):
             with analyst_agent.override(
                 model=TestModel(call_tools=[], custom_output_args={"summary": "y"})
@@ -641,8 +642,8 @@ async def test_f4_asyncio_timeout_is_not_retried_in_researcher():
         call_count["n"] += 1
         await asyncio.sleep(10)
 
-    with patch.object(lead_module, "_AGENT_TIMEOUT", 0.001):
-        with patch.object(lead_module, "_STAGE_RETRIES", 5):
+    with patch.dict("os.environ", {"AGENT_TIMEOUT": "0.001"}):
+        with patch.dict("os.environ", {"STAGE_RETRIES": "5"}):
             with patch.object(researcher_agent, "run", new=slow_run):
                 with analyst_agent.override(
                     model=TestModel(
@@ -676,3 +677,93 @@ async def test_f4_asyncio_timeout_is_not_retried_in_researcher():
         and "Timeout" in e.message
     ]
     assert timeout_events, "Expected a Researcher timeout agent_limit event"
+
+
+# ---------------------------------------------------------------------------
+# Scenario G — Concurrent research stages
+# ---------------------------------------------------------------------------
+
+
+class _FakeResult:
+    """Minimal stand-in for an AgentRunResult."""
+
+    def __init__(self, output) -> None:
+        self.output = output
+
+    def usage(self):
+        from pydantic_ai.usage import RunUsage
+
+        return RunUsage(input_tokens=1, output_tokens=1)
+
+
+async def test_g1_research_and_analysis_run_concurrently_and_checkpoint_on_finish():
+    """G1: run_research_and_analysis overlaps the two sub-agents and hands each
+    stage's findings to on_stage_complete as soon as that stage finishes."""
+    import asyncio
+
+    from app.agents.analyst import analyst_agent
+    from app.agents.lead import lead_agent
+    from app.agents.reporter import reporter_agent
+    from app.agents.researcher import researcher_agent
+
+    running: set[str] = set()
+    overlapped: list[bool] = []
+    checkpoints: list[str] = []
+
+    def fake_run(name: str, delay: float, output):
+        async def run(*args, **kwargs):
+            running.add(name)
+            await asyncio.sleep(delay)
+            overlapped.append(len(running) == 2)
+            running.discard(name)
+            return _FakeResult(output)
+
+        return run
+
+    async def on_stage_complete(stage, findings):
+        checkpoints.append(stage)
+
+    ctx = _make_ctx()
+    ctx.on_stage_complete = on_stage_complete
+    with patch.object(
+        researcher_agent, "run", new=fake_run("r", 0.2, MarketAccessFindings(raw_evidence_summary="r"))
+    ), patch.object(analyst_agent, "run", new=fake_run("a", 0.05, AnalystFindings(summary="a"))):
+        with reporter_agent.override(model=TestModel(call_tools=[], custom_output_args=_report_args())):
+            with lead_agent.override(
+                model=TestModel(
+                    call_tools=["run_research_and_analysis", "run_reporter"],
+                    custom_output_args=_report_args(),
+                )
+            ):
+                result = await lead_agent.run("query", deps=ctx)
+
+    assert isinstance(result.output, MarketReport)
+    assert overlapped == [True, False]
+    assert checkpoints == ["analyst", "research"]
+    assert ctx.research_findings.raw_evidence_summary == "r"
+    assert ctx.analyst_findings.summary == "a"
+
+
+async def test_g2_failing_stage_cancels_its_sibling():
+    """G2: shared cancellation — an exception in one stage cancels the other."""
+    import asyncio
+
+    from app.agents.lead import run_stages_concurrently
+
+    cancelled = asyncio.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("stage crashed")
+
+    with pytest.raises(RuntimeError):
+        await run_stages_concurrently(slow(), boom())
+    assert cancelled.is_set()
+
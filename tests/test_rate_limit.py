@@ -0,0 +1,123 @@
+"""Tests for the shared per-service / per-domain rate limiter."""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.tools import rate_limit
+from app.tools import scrape_cache as scrape_cache_module
+from app.tools.crawl4ai_tool import scrape_page
+from app.tools.rate_limit import RateLimited, RateLimiter, TokenBucket, parse_limits, parse_retry_after
+
+
+@pytest.fixture
+def limiter():
+    lim = RateLimiter(backoff_base=0.01, backoff_max=0.05)
+    rate_limit.set_rate_limiter(lim)
+    yield lim
+    rate_limit.set_rate_limiter(rate_limit._UNSET)
+
+
+def test_bucket_allows_burst_then_paces():
+    bucket = TokenBucket(rate=10.0, burst=2)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    assert 0.09 < bucket.reserve() <= 0.1
+    bucket.pause(5)
+    assert bucket.reserve() > 4.9
+
+
+def test_config_parsing():
+    assert parse_limits("tavily=5:10, domain:fda.gov=1,bad=x") == {
+        "tavily": (5.0, 10),
+        "domain:fda.gov": (1.0, 2),
+    }
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+
+
+async def test_throttled_calls_retry_and_honor_retry_after(limiter):
+    attempts = []
+
+    async def call():
+        attempts.append(1)
+        if len(attempts) < 3:
+            request = httpx.Request("GET", "https://clinicaltrials.gov/api/v2/studies")
+            response = httpx.Response(429, headers={"retry-after": "0.02"}, request=request)
+            raise httpx.HTTPStatusError("429", request=request, response=response)
+        return "ok"
+
+    result, waited = await limiter.run("clinicaltrials", call)
+    assert result == "ok"
+    assert len(attempts) == 3
+    assert waited >= 0.04
+    stats = limiter.stats()["clinicaltrials"]
+    assert stats["throttled"] == 2 and stats["retries"] == 2 and stats["calls"] == 3
+
+
+async def test_gives_up_after_max_retries_and_passes_other_errors_through(limiter):
+    limiter.max_retries = 1
+
+    async def throttled():
+        raise RateLimited("slow down")
+
+    async def broken():
+        raise ValueError("nope")
+
+    with pytest.raises(RateLimited):
+        await limiter.run("tavily", throttled)
+    with pytest.raises(ValueError):
+        await limiter.run("tavily", broken)
+    assert limiter.stats()["tavily"]["calls"] == 3
+
+
+async def test_throttled_host_fails_fast_without_browser(limiter):
+    limiter.max_retries = 0
+    scrape_cache_module.set_scrape_cache(None)
+    client = httpx.AsyncClient(transport=httpx.MockTransport(lambda r: httpx.Response(429)))
+
+    async def boom(url):
+        raise AssertionError("a throttling host must not be retried in the browser")
+
+    try:
+        with patch("app.tools.http_client.get_http_client", return_value=client), patch(
+            "app.tools.crawl4ai_tool._render", boom
+        ):
+            result = await scrape_page("https://www.example.com/policy")
+    finally:
+        scrape_cache_module.set_scrape_cache(scrape_cache_module._UNSET)
+
+    assert not result.ok
+    assert "rate limited" in result.markdown
+    assert result.tiers[-1]["outcome"] == "throttled"
+    assert "domain:example.com" in limiter.stats()
+
+
+async def test_bare_503_escalates_to_the_browser(limiter):
+    scrape_cache_module.set_scrape_cache(None)
+    statuses = []
+
+    def respond(request):
+        statuses.append(503)
+        return httpx.Response(503, text="<html>Just a moment...</html>", headers={"content-type": "text/html"})
+
+    async def render(url):
+        return "# Rendered past the interstitial", {}
+
+    try:
+        with patch(
+            "app.tools.http_client.get_http_client",
+            return_value=httpx.AsyncClient(transport=httpx.MockTransport(respond)),
+        ), patch("app.tools.crawl4ai_tool._render", render):
+            result = await scrape_page("https://www.example.com/policy")
+    finally:
+        scrape_cache_module.set_scrape_cache(scrape_cache_module._UNSET)
+
+    assert result.ok and result.tier == "browser"
+    assert result.tiers[0]["outcome"] == "escalated: HTTP 503"
+    assert statuses == [503]  # not retried as throttling
+    assert rate_limit.is_host_throttle(503, "5") and not rate_limit.is_host_throttle(503, None)
@@ -0,0 +1,75 @@
+"""Tests for the local Markdown renderer and the reporter's render mode."""
+
+from __future__ import annotations
+
+from pydantic_ai.models.test import TestModel
+
+from app.context import ResearchContext
+from app.report_markdown import render_markdown
+from app.schema import CountryMixEntry, MarketReport, ReportSection, ScenarioEntry
+
+
+def _report(**overrides) -> MarketReport:
+    fields = {
+        "title": "GLP-1 Access",
+        "executive_summary": "Headline answer.",
+        "sections": [
+            ReportSection(heading="Payer Coverage", content="- Broad commercial coverage [1]"),
+            ReportSection(heading="Gaps & Data Confidence", content="No Medicaid data."),
+        ],
+        "sources": ["https://example.com/a", "https://example.com/b"],
+    }
+    fields.update(overrides)
+    return MarketReport(**fields)
+
+
+def test_renders_sections_and_numbered_sources():
+    md = render_markdown(_report())
+    assert md == (
+        "# GLP-1 Access\n\nHeadline answer.\n\n"
+        "## Payer Coverage\n\n- Broad commercial coverage [1]\n\n"
+        "## Gaps & Data Confidence\n\nNo Medicaid data.\n\n"
+        "## Sources\n\n1. https://example.com/a\n2. https://example.com/b"
+    )
+    assert md.startswith(render_markdown(_report(), appendices=False))
+
+
+def test_renders_country_mix_and_scenario_tables():
+    md = render_markdown(
+        _report(
+            country_mix=[
+                CountryMixEntry(country="US", share_2024=61.5, spend_2024="$1.2B", notes="Part D | commercial"),
+                CountryMixEntry(country="DE"),
+            ],
+            scenario_probabilities=[ScenarioEntry(scenario="Base case", probability_pct=60, impact="neutral")],
+        )
+    )
+    assert (
+        "## Country Mix\n\n"
+        "| Country | Share 2024 | Share 2030 | Spend 2024 | Spend 2030 | Notes |\n"
+        "|---|---|---|---|---|---|\n"
+        "| US | 61.5% | — | $1.2B | — | Part D \\| commercial |\n"
+        "| DE | — | — | — | — | — |"
+    ) in md
+    assert "| Base case | 60% | — | neutral |" in md
+    assert md.index("## Country Mix") < md.index("## Scenario Probabilities") < md.index("## Sources")
+
+
+async def test_reporter_renders_markdown_instead_of_asking_the_model():
+    from app.agents.reporter import reporter_agent
+
+    model = TestModel(
+        call_tools=[],
+        custom_output_args={
+            "title": "GLP-1 Access",
+            "executive_summary": "Headline answer.",
+            "sections": [{"heading": "Payer Coverage", "content": "Covered."}],
+            "sources": ["https://example.com/a"],
+        },
+    )
+    with reporter_agent.override(model=model):
+        result = await reporter_agent.run("prompt", deps=ResearchContext(tavily_api_key="test"))
+
+    output_schema = model.last_model_request_parameters.output_tools[0].parameters_json_schema
+    assert "markdown_content" not in output_schema["properties"]
+    assert result.output.markdown_content == render_markdown(result.output)
@@ -7,14 +7,15 @@ Acceptance criteria covered (from `iteration_plan.md`):
   followed by a terminal `event: done` frame; existing `workflow_event` frames
   continue to fire unaffected.
 - AC2: Both `_run_pipeline` and `_run_reporter_only` paths emit `reporter_token`
-  frames; the four-branch exception discrimination in `lead.py` is preserved.
+  frames from a single streamed reporter call; the four-branch exception
+  discrimination in `lead.py` is preserved.
 - AC3: `MarketReport` schema extension is backward-compatible — pre-Part-4 JSON
   blobs deserialize with `country_mix is None` and `scenario_probabilities is None`.
 
 All tests use pydantic-ai's `TestModel` so the suite runs fully offline.
 Footgun: `agent.override(model=TestModel(...))` is a *sync* context manager;
-`agent.run_stream(...)` is an *async* context manager. We use plain `with` for
-overrides and `async with` for run_stream.
+`agent.iter(...)` is an *async* context manager. We use plain `with` for
+overrides and `async with` for iter.
 """
 
 from __future__ import annotations
@@ -144,7 +145,7 @@ async def test_ac1_sse_emits_reporter_token_frames_during_reporter_phase():
     # close. This simulates what `_run_pipeline` / `_run_reporter_only` push.
     async def drive_queue() -> None:
         await ctx.add_event("agent_start", "Reporter", "Starting report synthesis")
-        # Several token chunks (out of `stream_reporter_text`'s loop).
+        # Several token chunks (out of `stream_report`'s loop).
         ctx.put_token("Headline ")
         ctx.put_token("answer. ")
         ctx.put_token("Key findings.")
@@ -195,33 +196,32 @@ async def test_ac1_sse_emits_reporter_token_frames_during_reporter_phase():
 
 
 # ---------------------------------------------------------------------------
-# AC1/AC2 — stream_reporter_text helper emits chunks into the SSE queue
+# AC1/AC2 — stream_report streams the structured report in one call
 # ---------------------------------------------------------------------------
 
 
-async def test_stream_reporter_text_enqueues_tokens_and_closes():
-    """The streaming helper places chunks on the ctx queue and idempotently
-    closes the token stream in `finally`.
-
-    Uses pydantic-ai's TestModel with `custom_output_text` — note that
-    `agent.override()` is a *sync* context manager (plain `with`), while
-    `agent.run_stream()` is *async* (handled internally by the helper).
+async def test_stream_report_enqueues_draft_and_returns_report():
+    """The single-pass helper forwards the growing draft to the ctx queue,
+    returns the validated report from the same call, and idempotently closes
+    the token stream in `finally`.
     """
     from api.stream import StreamingResearchContext
-    from app.agents.reporter import _reporter_stream_agent, stream_reporter_text
+    from app.agents.reporter import draft_markdown, reporter_agent, stream_report
 
     ctx = StreamingResearchContext(
         tavily_api_key="", db_connection=None, session_state=None
     )
 
-    with _reporter_stream_agent.override(
-        model=TestModel(custom_output_text="Hello streaming world")
-    ):
-        accumulated = await stream_reporter_text("synthesis prompt", ctx)
+    model = TestModel(call_tools=[], custom_output_args=_report_args())
+    with reporter_agent.override(model=model):
+        report = await stream_report("synthesis prompt", ctx)
 
-    assert accumulated, "stream_reporter_text should return accumulated text"
+    # markdown_content is rendered locally, not taken from the model output.
+    assert report.model_dump(exclude={"markdown_content"}) == MarketReport(
+        **_report_args()
+    ).model_dump(exclude={"markdown_content"})
 
-    # Drain the queue and confirm at least one `str` chunk was enqueued.
+    # Drain the queue and confirm the chunks reproduce the rendered draft.
     collected: list[object] = []
     while True:
         try:
@@ -231,25 +231,46 @@ async def test_stream_reporter_text_enqueues_tokens_and_closes():
 
     string_items = [c for c in collected if isinstance(c, str)]
     assert string_items, f"Expected at least one str chunk in queue, got {collected}"
-    # Concatenated chunks should reproduce the test model's full output.
-    assert "".join(string_items) == "Hello streaming world"
+    assert "".join(string_items) == draft_markdown(report)
+    assert report.markdown_content.startswith("".join(string_items))
+    assert "".join(string_items).startswith("# Streaming Test Report\n\nHeadline answer.")
 
     # Token stream marked closed; further put_token calls are silently dropped.
     assert ctx._token_stream_closed is True
     ctx.put_token("post-close should be ignored")
-    # Queue size remains unchanged after a post-close put_token.
     assert ctx._queue.qsize() == 0
 
 
+def test_draft_markdown_only_grows_by_appending():
+    """Each partial rendering is a prefix of the next, so deltas can be streamed."""
+    from app.agents.reporter import draft_markdown
+    from app.schema import ReportSection
+
+    partials = [
+        MarketReport(title="Tit", executive_summary=""),
+        MarketReport(title="Title", executive_summary="Head"),
+        MarketReport(title="Title", executive_summary="Headline.", sections=[ReportSection(heading="Acc", content="")]),
+        MarketReport(
+            title="Title",
+            executive_summary="Headline.",
+            sections=[ReportSection(heading="Access", content="Covered")],
+        ),
+    ]
+    drafts = [draft_markdown(p) for p in partials]
+    for before, after in zip(drafts, drafts[1:]):
+        assert after.startswith(before)
+    assert drafts[-1] == "# Title\n\nHeadline.\n\n## Access\n\nCovered"
+
+
 # ---------------------------------------------------------------------------
 # AC2 — _run_reporter_only retry path also emits reporter_token frames
 # ---------------------------------------------------------------------------
 
 
 async def test_ac2_run_reporter_only_emits_reporter_token_frames(client):
-    """AC2 retry path: `_run_reporter_only` streams tokens before running the
-    structured `reporter_agent`. We capture the queue contents after the
-    background task completes and assert at least one `str` chunk appeared.
+    """AC2 retry path: `_run_reporter_only` streams the structured
+    `reporter_agent` run. We capture the queue contents after the background
+    task completes and assert at least one `str` chunk appeared.
     """
     from api.db_sessions import (
         insert_session,
@@ -259,7 +280,7 @@ async def test_ac2_run_reporter_only_emits_reporter_token_frames(client):
     )
     from api.routes import run as run_module
     from api.stream import StreamingResearchContext
-    from app.agents.reporter import _reporter_stream_agent, reporter_agent
+    from app.agents.reporter import reporter_agent
     from app.schema import AnalystFindings, MarketAccessFindings
 
     # Seed a failed session with both checkpoints so the retry route
@@ -299,13 +320,10 @@ async def test_ac2_run_reporter_only_emits_reporter_token_frames(client):
 
         drain_task = asyncio.create_task(drain())
         try:
-            with _reporter_stream_agent.override(
-                model=TestModel(custom_output_text="Streaming retry draft text")
+            with reporter_agent.override(
+                model=TestModel(call_tools=[], custom_output_args=_report_args())
             ):
-                with reporter_agent.override(
-                    model=TestModel(call_tools=[], custom_output_args=_report_args())
-                ):
-                    await real_reporter_only(session_id, query, ctx)
+                await real_reporter_only(session_id, query, ctx)
         finally:
             await drain_task
         captured_ctx["drained"] = drained  # type: ignore[assignment]
@@ -335,8 +353,8 @@ async def test_ac2_run_reporter_only_emits_reporter_token_frames(client):
 
 def test_ac2_four_branch_exception_discrimination_preserved():
     """AC2: the four-branch exception discrimination remains in `lead.py`
-    `run_reporter` (TimeoutError / UnexpectedModelBehavior / UsageLimitExceeded
-    / generic Exception). This is a source-level grep — if the branches are
+    `reporter_stage`, the body behind the `run_reporter` tool (TimeoutError /
+    UnexpectedModelBehavior / UsageLimitExceeded / generic Exception). This is a source-level grep — if the branches are
     renamed or merged, the test must be updated atomically.
     """
     import pathlib
@@ -344,18 +362,18 @@ def test_ac2_four_branch_exception_discrimination_preserved():
     lead_src = pathlib.Path(__file__).parent.parent / "app" / "agents" / "lead.py"
     src = lead_src.read_text()
 
-    # Slice the `run_reporter` function body: from the `async def run_reporter`
+    # Slice the `reporter_stage` function body: from the `async def reporter_stage`
     # line through the end of the file (or the next top-level def). The body
     # spans multiple blank lines internally, so we can't terminate on \n\n.
     m = re.search(
-        r"async def run_reporter\(.*?(?=\n(?:async )?def |\Z)",
+        r"async def reporter_stage\(.*?(?=\n(?:async )?def |\Z)",
         src,
         flags=re.DOTALL,
     )
-    assert m, "run_reporter not found in app/agents/lead.py"
+    assert m, "reporter_stage not found in app/agents/lead.py"
     body = m.group(0)
 
-    # All four discriminated exception classes must appear in `run_reporter`.
+    # All four discriminated exception classes must appear in `reporter_stage`.
     assert "asyncio.TimeoutError" in body or "TimeoutError" in body
     assert "UsageLimitExceeded" in body
     assert "UnexpectedModelBehavior" in body
@@ -0,0 +1,180 @@
+"""Tests for the stage retry policy."""
+
+from __future__ import annotations
+
+import json
+
+from unittest.mock import patch
+
+import pytest
+from pydantic_ai.exceptions import UnexpectedModelBehavior, UsageLimitExceeded
+
+from app.context import ResearchContext
+from app.retry import RetryPolicy, stage_retry_policy
+from app.schema import MarketAccessFindings
+
+
+async def test_retries_with_backoff_and_records_each_attempt():
+    deps = ResearchContext(tavily_api_key="")
+    policy = RetryPolicy(retries=2, backoff_base=0.01, backoff_max=0.01)
+    outcomes = [UnexpectedModelBehavior("bad output"), "ok"]
+
+    async def attempt(model):
+        assert model is None
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert await policy.run(deps, "Researcher", attempt) == "ok"
+
+    failed, succeeded = policy.attempts
+    assert failed["outcome"] == "UnexpectedModelBehavior" and 0 <= failed["retry_delay_s"] <= 0.01
+    assert succeeded["outcome"] == "ok" and succeeded["attempt"] == 2
+    (event,) = deps.events
+    assert (event.event_type, event.source) == ("info", "Researcher")
+    assert event.message.startswith("Retry 1/2") and event.details["error"] == "bad output"
+
+
+async def test_other_errors_are_not_retried():
+    policy = RetryPolicy(retries=3, backoff_base=0)
+    calls = []
+
+    async def attempt(model):
+        calls.append(model)
+        raise UsageLimitExceeded("limit")
+
+    with pytest.raises(UsageLimitExceeded):
+        await policy.run(ResearchContext(tavily_api_key=""), "Analyst", attempt)
+    assert len(calls) == 1 and policy.attempts[0]["outcome"] == "UsageLimitExceeded"
+
+
+async def test_time_budget_stops_retrying():
+    policy = RetryPolicy(retries=5, backoff_base=10, backoff_max=10, budget=0.001)
+    calls = []
+
+    async def attempt(model):
+        calls.append(model)
+        raise UnexpectedModelBehavior("bad output")
+
+    with patch("app.retry.random.uniform", return_value=10.0), pytest.raises(UnexpectedModelBehavior):
+        await policy.run(ResearchContext(tavily_api_key=""), "Analyst", attempt)
+    assert len(calls) == 1 and policy.attempts[0]["budget_exhausted"] is True
+
+
+async def test_last_attempt_fails_over_to_the_fallback_model(monkeypatch):
+    from pydantic_ai.usage import RunUsage
+
+    from app.agents.lead import market_access_stage
+    from app.agents.researcher import researcher_agent
+
+    monkeypatch.setenv("STAGE_RETRIES", "2")
+    monkeypatch.setenv("STAGE_RETRY_BACKOFF_BASE", "0")
+    monkeypatch.setenv("FALLBACK_MODEL", "llama3.2:3b")
+    models = []
+
+    class _Result:
+        output = MarketAccessFindings(raw_evidence_summary="evidence")
+
+        def usage(self):
+            return RunUsage()
+
+    async def fake_run(prompt, **kwargs):
+        models.append(kwargs["model"])
+        if kwargs["model"] is None:
+            raise UnexpectedModelBehavior("bad output")
+        return _Result()
+
+    deps = ResearchContext(tavily_api_key="")
+    with patch.object(researcher_agent, "run", new=fake_run):
+        findings = await market_access_stage(deps, "briefing", RunUsage())
+
+    assert findings.raw_evidence_summary == "evidence"
+    assert models[:2] == [None, None] and models[2].model_name == "llama3.2:3b"
+    (end,) = [e for e in deps.events if e.event_type == "agent_end" and e.source == "Researcher"]
+    assert [a["model"] for a in end.details["attempts"]] == ["primary", "primary", "fallback:llama3.2:3b"]
+
+
+def test_policy_reads_environment(monkeypatch):
+    monkeypatch.setenv("STAGE_RETRIES", "1")
+    monkeypatch.setenv("STAGE_RETRY_BUDGET", "0")
+    monkeypatch.delenv("FALLBACK_MODEL", raising=False)
+    policy = stage_retry_policy()
+    assert (policy.retries, policy.budget, policy.fallback_model) == (1, None, None)
+    assert policy.model_for(1) is None
+
+
+
+_SKELETON = {"title": "Zepbound coverage", "executive_summary": "Covered with prior authorization."}
+_REPORT = {**_SKELETON, "sections": [{"heading": "Coverage", "content": "Preferred brand tier."}]}
+
+
+async def _run_lead_reporter(monkeypatch, deps, reporter_model, request_limit=5):
+    from pydantic_ai.models.test import TestModel
+
+    from app.agents.lead import lead_agent
+    from app.agents.reporter import reporter_agent
+    from app.budget import apply_budget
+
+    monkeypatch.setenv("STAGE_RETRIES", "1")
+    monkeypatch.setenv("STAGE_RETRY_BACKOFF_BASE", "0")
+    budget = await apply_budget(deps, "Does Cigna cover Zepbound on formulary?")
+    budget.stages["reporter"].request_limit = request_limit
+    with (
+        reporter_agent.override(model=reporter_model),
+        lead_agent.override(model=TestModel(call_tools=["run_reporter"], custom_output_args=_REPORT)),
+    ):
+        await lead_agent.run("query", deps=deps)
+    (end,) = [e for e in deps.events if e.event_type == "agent_end" and e.source == "Reporter"]
+    return [a["outcome"] for a in end.details["attempts"]]
+
+
+async def test_reporter_retry_under_the_lead_gets_a_fresh_request_budget(monkeypatch):
+    from pydantic_ai.messages import ModelResponse, ToolCallPart
+    from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+    requests = []
+
+    def model(messages, info: AgentInfo) -> ModelResponse:
+        # The first attempt spends its whole request budget on skeleton reports.
+        requests.append(messages)
+        args = _SKELETON if len(requests) <= 4 else _REPORT
+        return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, args)])
+
+    outcomes = await _run_lead_reporter(
+        monkeypatch, ResearchContext(tavily_api_key=""), FunctionModel(model), request_limit=4
+    )
+
+    assert outcomes == ["UnexpectedModelBehavior", "ok"]
+    assert len(requests) == 5
+
+
+async def test_reporter_retry_keeps_streaming_past_the_failed_draft(monkeypatch):
+    from pydantic_ai.messages import ModelResponse, ToolCallPart
+    from pydantic_ai.models.function import AgentInfo, DeltaToolCall, FunctionModel
+
+    from api.stream import StreamingResearchContext
+
+    attempts = []
+
+    async def stream(messages, info: AgentInfo):
+        attempts.append(messages)
+        args = _SKELETON if len(attempts) == 1 else _REPORT
+        yield {0: DeltaToolCall(name=info.output_tools[0].name, json_args=json.dumps(args))}
+
+    def unused(messages, info: AgentInfo) -> ModelResponse:
+        return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, _REPORT)])
+
+    deps = StreamingResearchContext(tavily_api_key="")
+    outcomes = await _run_lead_reporter(monkeypatch, deps, FunctionModel(unused, stream_function=stream))
+
+    assert outcomes[-1] == "ok" and len(outcomes) == 2
+    tokens = []
+    while not deps._queue.empty():
+        item = deps._queue.get_nowait()
+        if isinstance(item, str):
+            tokens.append(item)
+    assert "".join(tokens) == deps.streamed_draft
+    assert deps.streamed_draft.startswith("# Zepbound coverage")
+    assert "Preferred brand tier." in deps.streamed_draft  # streamed by the retry
+    assert deps._token_stream_closed
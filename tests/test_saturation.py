@@ -0,0 +1,91 @@
+"""Tests for evidence-saturation early stopping."""
+
+from __future__ import annotations
+
+import json
+
+from app.context import ResearchContext
+from app.tools.saturation import SaturationMonitor, observe_result, stage_monitor
+
+_PAGE = (
+    "## Wegovy coverage\nURL: https://www.cms.gov/wegovy\n\n"
+    "Medicare Part D plans exclude anti-obesity medications unless the indication is cardiovascular "
+    "risk reduction, in which case coverage follows the plan formulary and prior authorization rules."
+)
+_OTHER = (
+    "## Zepbound payer policy\nURL: https://www.uhc.com/zepbound\n\n"
+    "UnitedHealthcare lists tirzepatide for chronic weight management on a specialty tier with step "
+    "therapy through a preferred GLP-1 agent and reauthorization every twelve months."
+)
+
+
+def test_repeated_results_saturate_after_patience():
+    monitor = SaturationMonitor(patience=2, min_calls=3)
+    assert monitor.observe("tavily_search", _PAGE)["new_sources"] == 1
+    repeat = monitor.observe("tavily_search", _PAGE.replace("https://www.cms.gov", "http://cms.gov"))
+    assert repeat == {"tool": "tavily_search", "new_sources": 0, "new_content": 0.0, "low_novelty": True}
+    assert not monitor.saturated
+    monitor.observe("deep_scrape", "[Duplicate of earlier result https://www.cms.gov/wegovy — omitted]")
+    assert monitor.saturated
+
+    # A genuinely new result lifts saturation.
+    monitor.observe("tavily_search", _OTHER)
+    assert not monitor.saturated and monitor.streak == 0
+
+
+def test_min_calls_protects_the_first_calls():
+    monitor = SaturationMonitor(patience=1, min_calls=3)
+    monitor.observe("tavily_search", "No results from Tavily for this query.")
+    monitor.observe("tavily_search", "No results from Tavily for this query.")
+    assert not monitor.saturated
+    monitor.observe("tavily_search", "No results from Tavily for this query.")
+    assert monitor.saturated
+
+
+async def test_observe_result_tells_the_agent_to_finalize(monkeypatch):
+    monkeypatch.setenv("SATURATION_MIN_CALLS", "2")
+    monkeypatch.setenv("SATURATION_PATIENCE", "1")
+    deps = ResearchContext(tavily_api_key="")
+
+    assert await observe_result(deps, "researcher", "tavily_search", _PAGE) == _PAGE
+    noted = await observe_result(deps, "researcher", "tavily_search", _PAGE)
+    assert noted.startswith(_PAGE) and "Stop calling tools and return your findings now" in noted
+    await observe_result(deps, "researcher", "tavily_search", _PAGE)
+
+    (event,) = [e for e in deps.events if e.source == "Saturation"]
+    assert event.details["stage"] == "researcher" and event.details["calls"] == 2
+    # Stages are tracked separately: the analyst has seen nothing yet.
+    assert await observe_result(deps, "analyst", "tavily_search", _PAGE) == _PAGE
+
+
+async def test_off_mode_passes_results_through(monkeypatch):
+    monkeypatch.setenv("SATURATION_MODE", "off")
+    deps = ResearchContext(tavily_api_key="")
+    for _ in range(5):
+        assert await observe_result(deps, "researcher", "tavily_search", _PAGE) == _PAGE
+    assert deps.saturation is None
+
+
+async def test_refuse_mode_withdraws_tools_once_saturated(monkeypatch):
+    from pydantic_ai.messages import ModelResponse, ToolCallPart
+    from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+    from app.agents.researcher import researcher_agent
+
+    monkeypatch.setenv("SATURATION_MODE", "refuse")
+    offered: list[list[str]] = []
+
+    def model(messages, info: AgentInfo) -> ModelResponse:
+        offered.append(sorted(t.name for t in info.function_tools))
+        output_tool = info.output_tools[0].name
+        return ModelResponse(parts=[ToolCallPart(output_tool, json.dumps({"raw_evidence_summary": "done"}))])
+
+    deps = ResearchContext(tavily_api_key="")
+    with researcher_agent.override(model=FunctionModel(model)):
+        await researcher_agent.run("q", deps=deps)
+        monitor = stage_monitor(deps, "researcher")
+        monitor.calls, monitor.streak = 5, 5
+        await researcher_agent.run("q", deps=deps)
+
+    assert "tavily_search_tool" in offered[0]
+    assert offered[1] == []
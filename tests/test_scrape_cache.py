@@ -0,0 +1,129 @@
+"""Tests for the on-disk scrape cache and conditional-GET revalidation."""
+
+from __future__ import annotations
+
+import time
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.tools import crawl4ai_tool
+from app.tools import scrape_cache as scrape_cache_module
+from app.tools.scrape_cache import ScrapeCache, parse_domain_ttls
+
+
+@pytest.fixture
+def cache(tmp_path):
+    c = ScrapeCache(tmp_path / "scrape_cache", default_ttl=60)
+    scrape_cache_module.set_scrape_cache(c)
+    yield c
+    scrape_cache_module.set_scrape_cache(scrape_cache_module._UNSET)
+
+
+def test_domain_ttl_policy_matches_longest_suffix(cache):
+    cache.domain_ttls.update(parse_domain_ttls("accessdata.fda.gov=10, bad=x"))
+    assert cache.ttl_for("https://accessdata.fda.gov/label.pdf") == 10
+    assert cache.ttl_for("https://www.fda.gov/drugs") == 7 * 86400
+    assert cache.ttl_for("https://notfda.gov/x") == 60
+
+
+async def test_fresh_entry_is_served_without_rendering(cache):
+    await cache.put("https://example.com/a", "# Cached page", {"ETag": '"v1"'})
+
+    async def boom(url):
+        raise AssertionError("should not render a fresh page")
+
+    with patch.object(crawl4ai_tool, "_render", new=boom):
+        assert await crawl4ai_tool.deep_scrape("https://example.com/a") == "# Cached page"
+    assert cache.hits == 1
+
+
+async def test_stale_entry_revalidated_with_304(cache):
+    entry = await cache.put("https://example.com/b", "# Old", {"ETag": '"v1"'})
+    entry.fetched_at = time.time() - 3600
+    await cache._write(entry)
+    seen_headers = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen_headers.update(request.headers)
+        return httpx.Response(304, headers={"ETag": '"v1"'})
+
+    async def boom(url):
+        raise AssertionError("should not render an unchanged page")
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    with patch("app.tools.http_client.get_http_client", return_value=client):
+        with patch.object(crawl4ai_tool, "_render", new=boom):
+            assert await crawl4ai_tool.deep_scrape("https://example.com/b") == "# Old"
+
+    assert seen_headers["if-none-match"] == '"v1"'
+    assert cache.revalidated == 1
+    assert cache.is_fresh(await cache.get("https://example.com/b"))
+
+
+async def test_changed_page_is_rerendered_and_stored(cache):
+    entry = await cache.put("https://example.com/c", "# Old", {"Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"})
+    entry.fetched_at = 0
+    await cache._write(entry)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(lambda r: httpx.Response(200, text="new")))
+
+    async def render(url):
+        return "# New", {"etag": '"v2"'}
+
+    with patch("app.tools.http_client.get_http_client", return_value=client):
+        with patch.object(crawl4ai_tool, "_render", new=render):
+            assert await crawl4ai_tool.deep_scrape("https://example.com/c") == "# New"
+
+    stored = await cache.get("https://example.com/c")
+    assert stored.markdown == "# New"
+    assert stored.etag == '"v2"'
+
+
+_ARTICLE = "<html><body><h1>Policy</h1>" + "<p>Prior authorization is required for all members.</p>" * 20 + "</body></html>"
+
+
+async def _stale(cache, url):
+    entry = await cache.put(url, "# Old", {"ETag": '"v1"'})
+    entry.fetched_at = 0
+    await cache._write(entry)
+    return entry
+
+
+async def test_changed_page_reuses_the_revalidation_body(cache):
+    await _stale(cache, "https://example.com/d")
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, text=_ARTICLE, headers={"content-type": "text/html", "etag": '"v2"'})
+
+    async def boom(url):
+        raise AssertionError("a static page should not need a browser")
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    with patch("app.tools.http_client.get_http_client", return_value=client):
+        with patch.object(crawl4ai_tool, "_render", new=boom):
+            result = await crawl4ai_tool.fetch_page("https://example.com/d")
+
+    assert len(requests) == 1 and "if-none-match" in requests[0].headers
+    assert result.tier == "http" and "# Policy" in result.markdown
+    assert [t["outcome"] for t in result.tiers] == ["changed", "ok"]
+    assert (await cache.get("https://example.com/d")).etag == '"v2"'
+
+
+async def test_unchanged_content_is_not_rewritten(cache):
+    entry = await _stale(cache, "https://example.com/e")
+    client = httpx.AsyncClient(transport=httpx.MockTransport(lambda r: httpx.Response(200, text="new")))
+
+    async def render(url):
+        return "# Old", {"etag": '"v3"'}
+
+    with patch("app.tools.http_client.get_http_client", return_value=client):
+        with patch.object(crawl4ai_tool, "_render", new=render), patch.object(cache, "put", side_effect=AssertionError):
+            assert await crawl4ai_tool.deep_scrape("https://example.com/e") == "# Old"
+
+    stored = await cache.get("https://example.com/e")
+    assert cache.is_fresh(stored) and stored.etag == '"v3"'
+    assert stored.content_hash == entry.content_hash
@@ -0,0 +1,68 @@
+"""Tests for the parallel multi-URL scrape tool (scrape_page faked, no network)."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from app.context import ResearchContext
+from app.tools.crawl4ai_tool import ScrapeResult, deep_scrape_many_with_events
+
+_DELAYS = {
+    "https://a.test/1": 0.05,
+    "https://a.test/2": 0.05,
+    "https://a.test/3": 0.05,
+    "https://b.test/1": 0.01,
+    "https://slow.test/x": 5.0,
+}
+
+
+def _fake_scrape():
+    active: Counter[str] = Counter()
+    peak: Counter[str] = Counter()
+
+    async def scrape_page(url: str, query: str | None = None) -> ScrapeResult:
+        host = url.split("/")[2]
+        active[host] += 1
+        peak[host] = max(peak[host], active[host])
+        try:
+            await asyncio.sleep(_DELAYS[url])
+        finally:
+            active[host] -= 1
+        return ScrapeResult(url=url, markdown=f"# Page {url}\n\nBody of {url} " * 3, tier="http")
+
+    return scrape_page, peak
+
+
+async def test_parallel_scrape_respects_domain_limit_and_deadline(monkeypatch):
+    monkeypatch.setenv("SCRAPE_DOMAIN_CONCURRENCY", "2")
+    monkeypatch.setenv("SCRAPE_MANY_DEADLINE", "0.5")
+    fake, peak = _fake_scrape()
+    ctx = SimpleNamespace(deps=ResearchContext(tavily_api_key=""))
+    urls = [*_DELAYS, "https://A.test/1/"]
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    with patch("app.tools.crawl4ai_tool.scrape_page", fake):
+        out = await deep_scrape_many_with_events(ctx, urls, stage="researcher")
+    elapsed = loop.time() - started
+
+    assert elapsed < 1.0
+    assert peak["a.test"] == 2
+    for url in ("https://a.test/1", "https://a.test/3", "https://b.test/1"):
+        assert f"Body of {url}" in out
+    assert "## https://slow.test/x\n\n[Not finished within 0.5s — omitted]" in out
+    assert out.count("## https://a.test/1") == 1
+
+    result = ctx.deps.events[-1]
+    assert result.message == "Scraped 4/5 pages (1 timed out, 0 failed)"
+    outcomes = {p["url"]: p["outcome"] for p in result.details["pages"]}
+    assert outcomes["https://slow.test/x"] == "timeout"
+    assert outcomes["https://b.test/1"] == "ok"
+
+
+async def test_empty_url_list():
+    ctx = SimpleNamespace(deps=ResearchContext(tavily_api_key=""))
+    assert await deep_scrape_many_with_events(ctx, ["  "], stage="researcher") == "No URLs given."
@@ -0,0 +1,74 @@
+"""Tests for deep_scrape's plain-HTTP fast path and browser escalation."""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.tools import crawl4ai_tool
+from app.tools import scrape_cache as scrape_cache_module
+from app.tools.crawl4ai_tool import js_shell_reason, scrape_page
+
+_ARTICLE = (
+    "<html><head><title>Label</title><script>var x = 1;</script></head><body>"
+    "<nav>Home | Drugs</nav><h1>Prescribing Information</h1>"
+    + "<p>Indicated for the treatment of adults with moderate to severe disease.</p>" * 20
+    + "</body></html>"
+)
+_SHELL = (
+    "<html><body><noscript>You need to enable JavaScript to run this app.</noscript>"
+    '<div id="root"></div><script src="/bundle.js"></script></body></html>'
+)
+
+
+@pytest.fixture(autouse=True)
+def no_scrape_cache():
+    scrape_cache_module.set_scrape_cache(None)
+    yield
+    scrape_cache_module.set_scrape_cache(scrape_cache_module._UNSET)
+
+
+def _client(html: str) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        transport=httpx.MockTransport(
+            lambda r: httpx.Response(200, text=html, headers={"content-type": "text/html"})
+        )
+    )
+
+
+def test_js_shell_heuristics():
+    assert js_shell_reason(_ARTICLE) is None
+    assert js_shell_reason(_SHELL) == "empty body"
+    padded = _SHELL.replace("</noscript>", "</noscript><p>" + "cookie notice " * 60 + "</p>")
+    assert js_shell_reason(padded) == "noscript marker"
+
+
+async def test_static_page_served_by_http_tier():
+    async def boom(url):
+        raise AssertionError("static page should not need a browser")
+
+    with patch("app.tools.http_client.get_http_client", return_value=_client(_ARTICLE)):
+        with patch.object(crawl4ai_tool, "_render", new=boom):
+            result = await scrape_page("https://www.fda.gov/label")
+
+    assert result.tier == "http"
+    assert "# Prescribing Information" in result.markdown
+    assert "var x" not in result.markdown
+    assert [t["tier"] for t in result.details()["tiers"]] == ["http"]
+
+
+async def test_js_shell_escalates_to_browser():
+    async def render(url):
+        return "# Rendered portal", {}
+
+    with patch("app.tools.http_client.get_http_client", return_value=_client(_SHELL)):
+        with patch.object(crawl4ai_tool, "_render", new=render):
+            result = await scrape_page("https://portal.example.com/policy")
+
+    assert result.tier == "browser"
+    assert result.markdown == "# Rendered portal"
+    tiers = result.details()["tiers"]
+    assert tiers[0]["outcome"] == "escalated: empty body"
+    assert tiers[1] == {**tiers[1], "tier": "browser", "outcome": "ok"}
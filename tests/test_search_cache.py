@@ -0,0 +1,79 @@
+"""Tests for the persistent Tavily search-result cache."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from app.context import ResearchContext
+from app.tools import search_cache as search_cache_module
+from app.tools.search_cache import SqliteSearchCache, normalize_query
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """A fresh SQLite cache installed as the process-wide cache."""
+    c = SqliteSearchCache(tmp_path / "search_cache.db", ttl_seconds=60, max_entries=3)
+    search_cache_module.set_search_cache(c)
+    yield c
+    search_cache_module.set_search_cache(search_cache_module._UNSET)
+
+
+def test_normalize_query_ignores_case_order_and_punctuation():
+    assert normalize_query("GLP-1 market size 2030") == normalize_query(
+        "market  size glp-1 2030?"
+    )
+
+
+async def test_cache_hit_and_miss_counters(cache):
+    assert await cache.get("q", 5, "basic") is None
+    await cache.set("q", 5, "basic", [{"title": "t", "url": "u", "content": "c"}])
+    assert await cache.get("Q ", 5, "basic") == [{"title": "t", "url": "u", "content": "c"}]
+    # Different search parameters are a different key.
+    assert await cache.get("q", 10, "basic") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+async def test_expired_entries_are_misses(cache):
+    await cache.set("q", 5, "basic", [{"url": "u"}], ttl=-1)
+    assert await cache.get("q", 5, "basic") is None
+
+
+async def test_lru_eviction_respects_max_entries(cache):
+    for q in ("a", "b", "c"):
+        await cache.set(q, 5, "basic", [{"url": q}])
+    # Touch "a" so "b" becomes least recently used.
+    assert await cache.get("a", 5, "basic") is not None
+    await cache.set("d", 5, "basic", [{"url": "d"}])
+
+    assert await cache.size() == 3
+    assert await cache.get("b", 5, "basic") is None
+    assert await cache.get("a", 5, "basic") is not None
+
+
+async def test_tavily_search_serves_repeat_query_from_cache(cache):
+    from app.tools.tavily_tool import tavily_search
+
+    calls = {"n": 0}
+
+    class FakeClient:
+        def __init__(self, api_key: str) -> None:
+            pass
+
+        async def search(self, **kwargs):
+            calls["n"] += 1
+            return {"results": [{"title": "T", "url": "https://x.test", "content": "body"}]}
+
+    # Separate sessions, so the second run is not collapsed by the stage's dedup.
+    ctx = SimpleNamespace(deps=ResearchContext(tavily_api_key="key"))
+    rerun = SimpleNamespace(deps=ResearchContext(tavily_api_key="key"))
+    with patch("tavily.AsyncTavilyClient", FakeClient):
+        first = await tavily_search(ctx, "Leqembi payer coverage", stage="researcher")
+        second = await tavily_search(rerun, "leqembi  payer coverage", stage="researcher")
+
+    assert calls["n"] == 1
+    assert first == second
+    assert rerun.deps.events[-1].details["cache"] == "hit"
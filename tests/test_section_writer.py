@@ -0,0 +1,156 @@
+"""Tests for the sectioned (parallel per-section) reporter mode."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from app.agents import section_writer
+from app.agents.section_writer import collect_sources, write_sectioned_report
+from app.context import ResearchContext
+from app.schema import ReportSection
+
+
+class _FakeResult:
+    def __init__(self, output) -> None:
+        self.output = output
+
+    def usage(self):
+        from pydantic_ai.usage import RunUsage
+
+        return RunUsage(requests=1, input_tokens=10, output_tokens=5)
+
+
+def _prompt(archetype: str) -> str:
+    return (
+        "RESEARCH QUESTION: GLP-1 coverage\n\n"
+        f"QUESTION ARCHETYPE: {archetype}\n\n"
+        "MARKET ACCESS FINDINGS (from Researcher Agent):\n"
+        '{"sources": ["https://cms.gov/a", "https://example.com/b."]}\n\n'
+        'ANALYST FINDINGS (from Analyst Agent):\n{"sources": ["https://cms.gov/a"]}'
+    )
+
+
+@pytest.fixture
+def fake_agents(monkeypatch):
+    """Stand-ins for the four sub-agents that record prompts and concurrency."""
+    monkeypatch.setenv("REPORTER_SECTION_CONCURRENCY", "2")
+    calls: dict[str, list[str]] = {"outline": [], "section": [], "tables": [], "summary": []}
+    state = {"running": 0, "peak": 0}
+
+    async def section_run(prompt, **kwargs):
+        calls["section"].append(prompt)
+        state["kwargs"] = kwargs
+        heading = prompt.rsplit('"', 2)[-2]
+        state["running"] += 1
+        state["peak"] = max(state["peak"], state["running"])
+        await asyncio.sleep(0.02)
+        state["running"] -= 1
+        if heading == "Clinical Pipeline":
+            raise RuntimeError("model offline")
+        return _FakeResult(ReportSection(heading="ignored", content=f"Body of {heading} [1]"))
+
+    async def outline_run(prompt, **kwargs):
+        calls["outline"].append(prompt)
+        return _FakeResult(section_writer.ReportOutline(headings=["Payer Coverage", "Executive Summary", "Market Size"]))
+
+    async def tables_run(prompt, **kwargs):
+        calls["tables"].append(prompt)
+        return _FakeResult(section_writer.ReportTables())
+
+    async def summary_run(prompt, **kwargs):
+        calls["summary"].append(prompt)
+        return _FakeResult(section_writer.ReportSummary(title="GLP-1 Report", executive_summary="Headline."))
+
+    with patch.object(section_writer.section_agent, "run", new=section_run), patch.object(
+        section_writer.outline_agent, "run", new=outline_run
+    ), patch.object(section_writer.tables_agent, "run", new=tables_run), patch.object(
+        section_writer.summary_agent, "run", new=summary_run
+    ):
+        yield calls, state
+
+
+def test_collect_sources_dedupes_in_order():
+    assert collect_sources(_prompt("x")) == ["https://cms.gov/a", "https://example.com/b"]
+
+
+async def test_single_archetype_uses_menu_and_writes_sections_concurrently(fake_agents):
+    calls, state = fake_agents
+    from pydantic_ai.usage import RunUsage
+
+    usage = RunUsage()
+    report = await write_sectioned_report(_prompt("regulatory/pipeline"), ResearchContext(tavily_api_key="t"), usage)
+
+    assert calls["outline"] == []
+    assert [s.heading for s in report.sections] == [
+        "Regulatory Status (FDA/EMA/other)",
+        "Clinical Pipeline",
+        "HEOR & Real-World Evidence",
+        "Market Access & Payer Readiness",
+        "Competitive Regulatory Landscape",
+        "Gaps & Data Confidence",
+        "Key Takeaways & Implications",
+    ]
+    assert state["peak"] == 2
+    assert report.sections[1].content == "_This section could not be generated._"
+    assert report.sections[0].content == "Body of Regulatory Status (FDA/EMA/other) [1]"
+    assert "NUMBERED SOURCES:\n1. https://cms.gov/a\n2. https://example.com/b" in calls["section"][0]
+    assert report.sources == ["https://cms.gov/a", "https://example.com/b"]
+
+    # Summary is written last, from digests of the finished sections only.
+    (summary_prompt,) = calls["summary"]
+    assert "## Market Access & Payer Readiness\nBody of Market Access" in summary_prompt
+    assert "MARKET ACCESS FINDINGS" not in summary_prompt
+    assert report.title == "GLP-1 Report" and report.executive_summary == "Headline."
+    assert report.markdown_content.startswith("# GLP-1 Report\n\nHeadline.\n\n## Regulatory Status")
+    assert usage.requests == 8  # 6 successful sections + tables + summary
+
+
+async def test_multi_dimensional_plans_outline_and_streams_sections_in_order(fake_agents):
+    calls, _ = fake_agents
+    from api.stream import StreamingResearchContext
+
+    ctx = StreamingResearchContext(tavily_api_key="", db_connection=None, session_state=None)
+    report = await write_sectioned_report(_prompt("multi-dimensional"), ctx)
+
+    assert len(calls["outline"]) == 1
+    assert [s.heading for s in report.sections] == [
+        "Payer Coverage",
+        "Market Size",
+        "Gaps & Data Confidence",
+        "Key Takeaways & Implications",
+    ]
+    tokens = []
+    while not ctx._queue.empty():
+        item = ctx._queue.get_nowait()
+        if isinstance(item, str):
+            tokens.append(item)
+    assert "".join(tokens) == "\n\n".join(f"## {s.heading}\n\n{s.content}" for s in report.sections)
+
+
+async def test_write_report_dispatches_to_sectioned_mode(fake_agents, monkeypatch):
+    from app.agents import reporter
+
+    monkeypatch.setattr(reporter, "_REPORTER_MODE", "sectioned")
+    report = await reporter.write_report(_prompt("coverage/formulary"), ResearchContext(tavily_api_key="t"))
+    assert report.sections[0].heading == "Payer Coverage Landscape"
+
+
+async def test_failed_section_hides_the_error_and_calls_follow_the_reporter_budget(fake_agents):
+    _, state = fake_agents
+    from pydantic_ai import UsageLimits
+
+    deps = ResearchContext(tavily_api_key="t")
+    stage_limits = UsageLimits(request_limit=8, tool_calls_limit=0, total_tokens_limit=40000)
+    report = await write_sectioned_report(
+        _prompt("regulatory/pipeline"), deps, usage_limits=stage_limits, model="fallback-model"
+    )
+
+    assert "model offline" not in report.markdown_content
+    failure = [e for e in deps.events if e.event_type == "agent_limit"]
+    assert failure and "model offline" in failure[0].message
+    assert state["kwargs"]["model"] == "fallback-model"
+    limits = state["kwargs"]["usage_limits"]
+    assert (limits.request_limit, limits.total_tokens_limit) == (3, 40000)
@@ -0,0 +1,56 @@
+"""Tests for per-tool token budgets on tool results."""
+
+from __future__ import annotations
+
+from app.schema import ClinicalTrialSummary
+from app.tools.shaping import estimate_tokens, parse_budgets, shape_items, tool_budget, truncate_markdown
+
+_PAGE = (
+    "# Prior Authorization Policy\n\n"
+    + "Coverage criteria apply to all commercial members. " * 60
+    + "\n\n## Step therapy\n\n"
+    + "| Product | Tier | PA |\n|---|---|---|\n| Drug A | 3 | Yes |\n| Drug B | 2 | No |\n\n"
+    + "## Appendix\n\n"
+    + "Historical revisions and legal boilerplate. " * 200
+)
+
+
+def test_short_text_is_untouched():
+    shaped = truncate_markdown("# Title\n\nA short page.", 1000)
+    assert shaped.text == "# Title\n\nA short page."
+    assert not shaped.truncated
+
+
+def test_truncation_keeps_headings_and_tables_and_cuts_the_tail():
+    shaped = truncate_markdown(_PAGE, 300)
+    assert shaped.truncated
+    assert estimate_tokens(shaped.text) <= 300
+    assert "# Prior Authorization Policy" in shaped.text
+    assert "## Appendix" in shaped.text
+    assert "| Drug B | 2 | No |" in shaped.text
+    assert "Historical revisions" not in shaped.text
+    assert shaped.text.endswith("blocks omitted]")
+    assert shaped.details()["original_chars"] == len(_PAGE)
+    assert shaped.details()["original_tokens"] > 300
+
+
+def test_budgets_come_from_env(monkeypatch):
+    assert parse_budgets("deep_scrape=100, bad=x,tavily_search=50") == {"deep_scrape": 100, "tavily_search": 50}
+    monkeypatch.setenv("TOOL_TOKEN_BUDGETS", "deep_scrape=0,tavily_search=50")
+    monkeypatch.setenv("TOOL_TOKEN_BUDGET", "123")
+    assert tool_budget("deep_scrape") is None
+    assert tool_budget("tavily_search") == 50
+    assert tool_budget("some_new_tool") == 123
+
+
+def test_list_results_keep_leading_items_within_budget(monkeypatch):
+    trials = [
+        ClinicalTrialSummary(nct_id=f"NCT{i:08d}", title="A Phase 3 study of lecanemab " * 5, phase="PHASE3")
+        for i in range(50)
+    ]
+    monkeypatch.setenv("TOOL_TOKEN_BUDGETS", "search_clinical_trials=400")
+    kept, shaped = shape_items("search_clinical_trials", trials)
+    assert 0 < len(kept) < len(trials)
+    assert kept == trials[: len(kept)]
+    assert shaped.tokens <= 400 < shaped.original_tokens
+    assert shaped.omitted_blocks == len(trials) - len(kept)
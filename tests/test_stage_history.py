@@ -0,0 +1,99 @@
+"""Tests for resuming sub-agent stages from their message history."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, patch
+
+from pydantic_ai.messages import (
+    ModelRequest,
+    ModelResponse,
+    RetryPromptPart,
+    ToolCallPart,
+    ToolReturnPart,
+    UserPromptPart,
+)
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+from app.context import ResearchContext
+from app.history import CheckpointSession
+from app.retry import RetryPolicy
+from app.stage_history import (
+    dump_stage_history,
+    load_stage_history,
+    resume_point,
+    run_resumable,
+    stage_resume_point,
+)
+
+_HISTORY = [
+    ModelRequest(parts=[UserPromptPart("Research market access for: q")]),
+    ModelResponse(parts=[ToolCallPart("tavily_search_tool", {"query": "a"}, tool_call_id="1")]),
+    ModelRequest(parts=[ToolReturnPart("tavily_search_tool", "result a", tool_call_id="1")]),
+    ModelResponse(parts=[ToolCallPart("final_result", {}, tool_call_id="2")]),
+    ModelRequest(parts=[RetryPromptPart("findings are empty", tool_name="final_result", tool_call_id="2")]),
+]
+
+
+def test_resume_point_keeps_completed_tool_calls_only():
+    assert resume_point(_HISTORY) == _HISTORY[:3]
+    assert resume_point(_HISTORY[:1]) == []
+
+
+async def test_stage_retry_continues_after_completed_tool_calls():
+    from app.agents.researcher import researcher_agent
+
+    searches: list[str] = []
+    bad_outputs = {"left": 4}  # one more than the agent's output retries: the first run fails
+
+    def model(messages, info: AgentInfo) -> ModelResponse:
+        done = sum(isinstance(p, ToolReturnPart) for m in messages for p in m.parts)
+        if done < 3:
+            searches.append(f"q{done}")
+            return ModelResponse(parts=[ToolCallPart("tavily_search_tool", {"query": f"q{done}"})])
+        output_tool = info.output_tools[0].name
+        if bad_outputs["left"]:
+            bad_outputs["left"] -= 1
+            return ModelResponse(parts=[ToolCallPart(output_tool, {})])
+        return ModelResponse(parts=[ToolCallPart(output_tool, {"raw_evidence_summary": "evidence"})])
+
+    deps = ResearchContext(tavily_api_key="")
+    with researcher_agent.override(model=FunctionModel(model)):
+        result = await RetryPolicy(retries=1, backoff_base=0).run(
+            deps, "Researcher", lambda model: run_resumable(researcher_agent, deps, "researcher", "q", model=model)
+        )
+
+    assert result.output.raw_evidence_summary == "evidence"
+    assert searches == ["q0", "q1", "q2"]  # not repeated by the retry
+    (resumed,) = [e for e in deps.events if e.message.startswith("Resuming after")]
+    assert resumed.source == "Researcher" and "3 completed tool results" in resumed.message
+    assert stage_resume_point(deps, "researcher") == []
+
+
+def test_resume_points_round_trip_through_a_checkpoint():
+    deps = ResearchContext(tavily_api_key="")
+    assert dump_stage_history(deps) == {}
+    deps.stage_history = {"researcher": _HISTORY[:3]}
+    checkpoint = CheckpointSession(session_id="s", query="q", stage_history=dump_stage_history(deps))
+    restored = ResearchContext(tavily_api_key="")
+    load_stage_history(restored, CheckpointSession.model_validate_json(checkpoint.model_dump_json()).stage_history)
+    assert stage_resume_point(restored, "researcher") == _HISTORY[:3]
+
+
+async def test_api_retry_loads_saved_resume_points(client):
+    from api.db_sessions import insert_session, mark_error, save_stage_history
+
+    deps = ResearchContext(tavily_api_key="", stage_history={"analyst": _HISTORY[:3]})
+    await insert_session("sess_history", "retry query")
+    await save_stage_history("sess_history", json.dumps(dump_stage_history(deps)))
+    await mark_error("sess_history", "earlier failure", "[]", failed_stage="pipeline")
+
+    pipeline_mock = AsyncMock(return_value=None)
+    with patch("api.routes.run._run_pipeline", new=pipeline_mock):
+        response = await client.post("/run/sess_history/retry")
+        await asyncio.sleep(0.01)
+
+    assert response.status_code == 202
+    ctx = pipeline_mock.await_args.args[2]
+    assert stage_resume_point(ctx, "analyst") == _HISTORY[:3]
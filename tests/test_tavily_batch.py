@@ -0,0 +1,89 @@
+"""Tests for the concurrent multi-query Tavily tool (fake client, no network)."""
+
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from app.context import ResearchContext
+from app.tools import search_cache
+from app.tools.tavily_tool import tavily_batch_search
+
+_RESULTS = {
+    "leqembi fda approval": [
+        {"title": "FDA label", "url": "https://fda.gov/leqembi", "content": "approved", "score": 0.9},
+        {"title": "News", "url": "https://news.test/a", "content": "approval news", "score": 0.4},
+    ],
+    "leqembi payer coverage": [
+        {"title": "News", "url": "https://news.test/a/", "content": "coverage news", "score": 0.7},
+        {"title": "CMS NCD", "url": "https://cms.gov/ncd", "content": "registry", "score": 0.8},
+    ],
+}
+
+
+@pytest.fixture(autouse=True)
+def _no_cache():
+    search_cache.set_search_cache(None)
+    yield
+    search_cache.set_search_cache(search_cache._UNSET)
+
+
+class FakeClient:
+    active = 0
+    peak = 0
+    calls: list[str] = []
+
+    def __init__(self, api_key: str) -> None:
+        pass
+
+    async def search(self, query: str, **kwargs):
+        FakeClient.calls.append(query)
+        FakeClient.active += 1
+        FakeClient.peak = max(FakeClient.peak, FakeClient.active)
+        await asyncio.sleep(0.01)
+        FakeClient.active -= 1
+        if query == "boom":
+            raise RuntimeError("quota exceeded")
+        return {"results": _RESULTS.get(query.lower(), [])}
+
+
+@pytest.fixture(autouse=True)
+def _reset_fake():
+    FakeClient.active = FakeClient.peak = 0
+    FakeClient.calls = []
+
+
+async def test_runs_concurrently_and_merges_by_url(monkeypatch):
+    monkeypatch.setenv("TAVILY_BATCH_CONCURRENCY", "2")
+    ctx = SimpleNamespace(deps=ResearchContext(tavily_api_key="key"))
+    with patch("tavily.AsyncTavilyClient", FakeClient):
+        out = await tavily_batch_search(
+            ctx,
+            ["Leqembi FDA approval", "leqembi payer coverage", "coverage payer Leqembi", "unrelated"],
+            stage="researcher",
+        )
+
+    # Near-duplicate query collapsed; concurrency bounded by the semaphore.
+    assert len(FakeClient.calls) == 3
+    assert FakeClient.peak == 2
+    # The URL found by both queries appears once, ranked first, listing both queries.
+    assert out.count("URL: https://news.test/a") == 1
+    assert out.index("## News") < out.index("## FDA label")
+    assert "Matched: Leqembi FDA approval; leqembi payer coverage" in out
+    assert len([e for e in ctx.deps.events if e.event_type == "tool_call"]) == 3
+
+
+async def test_failed_query_is_reported_without_dropping_others():
+    ctx = SimpleNamespace(deps=ResearchContext(tavily_api_key="key"))
+    with patch("tavily.AsyncTavilyClient", FakeClient):
+        out = await tavily_batch_search(ctx, ["boom", "Leqembi FDA approval"], stage="researcher")
+    assert "## FDA label" in out
+    assert "Failed queries: boom (quota exceeded)" in out
+
+
+async def test_missing_key_short_circuits():
+    ctx = SimpleNamespace(deps=ResearchContext(tavily_api_key=""))
+    assert "not set" in await tavily_batch_search(ctx, ["q"], stage="researcher")